@@ -9,9 +9,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
 from flask_wtf.csrf import CSRFProtect
+from .replica import RoutingSession
 
 # Core instances
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 csrf = CSRFProtect()
 
 try:
@@ -90,6 +91,14 @@ def create_app(config_name=None):
 
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Optional read replica for analytics, exports and history (see replica.py)
+    replica_url = os.environ.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        if replica_url.startswith('postgres://'):
+            replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+        app.config['SQLALCHEMY_BINDS'] = {'replica': replica_url}
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
     
     # PostgreSQL connection pool settings
     if database_url.startswith('postgresql'):
@@ -121,6 +130,19 @@ def create_app(config_name=None):
     if migrate:
         migrate.init_app(app, db)
     
+    # Keep the materialized room_status, professional_stats, asset_health and
+    # ticket_daily_rollup tables in step with writes
+    from .materialized import register_materialized_listeners
+    register_materialized_listeners()
+
+    # Full-text search indexes are created and dropped with the tables
+    from .search import register_search_listeners
+    register_search_listeners()
+
+    # Sessions that have written stop reading from the replica
+    from .replica import register_replica_listeners
+    register_replica_listeners()
+    
     # Initialize Cache
     from .cache import init_cache
     init_cache(app)
@@ -162,6 +184,10 @@ def create_app(config_name=None):
 
     # Pusher is initialized lazily in realtime.py
     
+    # Pre-build floor map caches (lazily, per request, on Vercel)
+    from .warmer import init_warmer
+    init_warmer(app)
+    
     # Start background scheduler for automated alerts (disabled on Vercel)
     if not os.environ.get('VERCEL'):
         from .scheduler import start_scheduler
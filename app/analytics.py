@@ -2,60 +2,128 @@
 Analytics Engine for FixLink - Predictive Maintenance & Performance Tracking
 """
 from datetime import datetime, timedelta
+import numpy as np
 from sqlalchemy import func
 from . import db
 from .models import Ticket, Asset, Professional
+from .replica import reads_from_replica
+
+# Health score weights (see _compute_score_logic)
+HEALTH_WINDOW_DAYS = 60
+DEPRECIATION_CONSTANT = 5
+STATUS_PENALTIES = {Asset.STATUS_BROKEN: 50, Asset.STATUS_MAINTENANCE: 20}
+REPAIR_PENALTY = 10
+COMPLEXITY_PENALTIES = {Ticket.COMPLEXITY_HIGH: 10, Ticket.COMPLEXITY_MEDIUM: 5}
 
 def calculate_asset_health(asset_id):
     """
-    Calculate a health score (0-100) for a specific asset.
-    (Individual calculation - uses DB)
+    Health score (0-100) of a specific asset, as stored in asset_health.
     """
-    asset = Asset.query.get(asset_id)
-    if not asset:
-        return 0
-    
-    sixty_days_ago = datetime.utcnow() - timedelta(days=60)
-    recent_tickets = Ticket.query.filter(
-        Ticket.asset_id == asset_id,
-        Ticket.created_at >= sixty_days_ago
-    ).all()
-    
-    return _compute_score_logic(asset, recent_tickets)
+    from .asset_health import asset_health_score
+    return asset_health_score(asset_id)
+
+def depreciation_penalty(installation_date, now):
+    """Lifecycle depreciation (age-based) at `now`."""
+    if not installation_date:
+        return 0.0
+    age_years = (now - installation_date).days / 365.25
+    return age_years * DEPRECIATION_CONSTANT
 
-def _compute_score_logic(asset, recent_tickets):
+def _compute_score_logic(asset, recent_tickets, now=None):
     """
     Core scoring algorithm.
     Decoupled from DB for bulk processing.
     """
     score = 100
-    
+
     # 1. Lifecycle Depreciation (Age-based)
     if asset.installation_date:
-        age_delta = datetime.utcnow() - asset.installation_date
-        age_years = age_delta.days / 365.25
-        DEPRECIATION_CONSTANT = 5
-        depreciation_penalty = age_years * DEPRECIATION_CONSTANT
-        score -= depreciation_penalty
-    
+        score -= depreciation_penalty(asset.installation_date, now or datetime.utcnow())
+
     # 2. Current Status Penalty
-    if asset.status == Asset.STATUS_BROKEN:
-        score -= 50
-    elif asset.status == Asset.STATUS_MAINTENANCE:
-        score -= 20
-        
+    if asset.status in STATUS_PENALTIES:
+        score -= STATUS_PENALTIES[asset.status]
+
     # 3. Repair Frequency Penalty (Last 60 days)
-    score -= (len(recent_tickets) * 10)
-    
+    score -= (len(recent_tickets) * REPAIR_PENALTY)
+
     # 4. Complexity Penalty
     for ticket in recent_tickets:
-        if ticket.complexity == Ticket.COMPLEXITY_HIGH:
-            score -= 10
-        elif ticket.complexity == Ticket.COMPLEXITY_MEDIUM:
-            score -= 5
-            
+        if ticket.complexity in COMPLEXITY_PENALTIES:
+            score -= COMPLEXITY_PENALTIES[ticket.complexity]
+
     return max(0, min(100, score))
 
+# Columns returned by score_assets_bulk, in asset_health order
+HEALTH_COLUMNS = ('asset_id', 'depreciation', 'status_penalty', 'recent_ticket_count', 'ticket_penalty', 'score')
+
+def score_assets_bulk(assets, tickets, now=None):
+    """
+    Score many assets at once. `assets` yields (asset_id, installation_date,
+    status); `tickets` yields (asset_id, complexity, count) for the tickets
+    in the window, grouped or one row per ticket with count 1. Returns
+    {column: list} for HEALTH_COLUMNS, in `assets` order.
+
+    Vectorized with NumPy, subtracting the penalties in the order
+    _compute_score_logic does, so every score is bit-for-bit the scalar one.
+    """
+    now = now or datetime.utcnow()
+    assets = list(assets)
+    tickets = list(tickets)
+    ids = np.array([row[0] for row in assets], dtype=np.int64)
+    installed = np.array([row[1] for row in assets], dtype='datetime64[us]')  # None -> NaT
+    statuses = np.array([row[2] for row in assets], dtype=object)
+    size = len(ids)
+
+    # 1. Lifecycle depreciation: whole days of age (floored, like timedelta.days) / 365.25 * constant
+    depreciation = np.zeros(size, dtype=np.float64)
+    known = ~np.isnat(installed)
+    days = (np.datetime64(now, 'us') - installed[known]) // np.timedelta64(1, 'D')
+    depreciation[known] = days.astype(np.float64) / 365.25 * DEPRECIATION_CONSTANT
+
+    # 2. Current status penalty
+    status_penalty = np.zeros(size, dtype=np.int64)
+    for status, penalty in STATUS_PENALTIES.items():
+        status_penalty[statuses == status] = penalty
+
+    # 3 + 4. Repair frequency and complexity penalties, summed per asset
+    recent_count = np.zeros(size, dtype=np.int64)
+    complexity_penalty = np.zeros(size, dtype=np.int64)
+    if size and tickets:
+        ticket_ids = np.array([row[0] for row in tickets], dtype=np.int64)
+        complexities = np.array([row[1] for row in tickets], dtype=object)
+        counts = np.array([row[2] for row in tickets], dtype=np.int64)
+        per_ticket = np.zeros(len(ticket_ids), dtype=np.int64)
+        for complexity, penalty in COMPLEXITY_PENALTIES.items():
+            per_ticket[complexities == complexity] = penalty
+
+        order = np.argsort(ids, kind='stable')
+        position = np.minimum(np.searchsorted(ids[order], ticket_ids), size - 1)
+        matched = ids[order][position] == ticket_ids
+        index = order[position[matched]]
+        # Integer sums stay exact in float64 weights far beyond any real ticket count
+        recent_count = np.bincount(index, weights=counts[matched], minlength=size).astype(np.int64)
+        complexity_penalty = np.bincount(
+            index, weights=counts[matched] * per_ticket[matched], minlength=size
+        ).astype(np.int64)
+    repair_penalty = recent_count * REPAIR_PENALTY
+
+    # Same order as _compute_score_logic: depreciation, status, repairs, then
+    # complexity. Taking whole numbers off the score is exact while it stays
+    # non-negative, and a negative score clamps to 0, so subtracting the
+    # complexity penalties as one sum gives the bits of the per-ticket loop.
+    score = 100.0 - depreciation - status_penalty - repair_penalty - complexity_penalty
+    score = np.clip(score, 0.0, 100.0)
+    return {
+        'asset_id': ids.tolist(),
+        'depreciation': depreciation.tolist(),
+        'status_penalty': status_penalty.tolist(),
+        'recent_ticket_count': recent_count.tolist(),
+        'ticket_penalty': (repair_penalty + complexity_penalty).tolist(),
+        'score': score.tolist(),
+    }
+
+@reads_from_replica
 def get_technician_efficiency():
     """
     Calculate performance metrics for all professionals.
@@ -104,65 +172,199 @@ def get_technician_efficiency():
         
     return sorted(stats, key=lambda x: x['fixed_count'], reverse=True)
 
+@reads_from_replica
 def get_system_trends(days=7):
     """
-    Get ticket volume trends for the last X days.
+    Get ticket volume trends for the last X days, counted per day in the database.
     """
-    start_date = datetime.utcnow() - timedelta(days=days)
-    tickets = Ticket.query.filter(Ticket.created_at >= start_date).all()
-    
-    trend_data = {}
-    for i in range(days):
-        date_str = (datetime.utcnow() - timedelta(days=i)).strftime('%Y-%m-%d')
-        trend_data[date_str] = 0
-        
-    for t in tickets:
-        date_str = t.created_at.strftime('%Y-%m-%d')
-        if date_str in trend_data:
-            trend_data[date_str] += 1
-            
-    # Sort by date
-    sorted_labels = sorted(trend_data.keys())
-    sorted_values = [trend_data[k] for k in sorted_labels]
-    
+    from .date_buckets import date_bucket
+    from .models import TicketDailyRollup as Rollup
+
+    today = datetime.utcnow().date()
+    labels = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days - 1, -1, -1)]
+    label = date_bucket(Rollup.day, 'daily')
+    counts = dict(db.session.query(label, func.sum(Rollup.created_count)).filter(
+        Rollup.day > today - timedelta(days=days)
+    ).group_by(label).all())
+
     return {
-        'labels': sorted_labels,
-        'values': sorted_values
+        'labels': labels,
+        'values': [int(counts.get(day) or 0) for day in labels]
     }
 
+def _empty_summary():
+    return {'total_tickets': 0, 'fixed_count': 0, 'category_counts': {},
+            'resolution_count': 0, 'resolution_seconds': 0.0, 'trend': {}}
+
+def _summarize_units(units, period):
+    """
+    Mergeable totals of each (start_day, end_day) unit of rollup days, the
+    last end may be None for no end: {unit: summary}, in one query grouped
+    by day, trend bucket, status and issue type.
+    """
+    from bisect import bisect_right
+    from .date_buckets import date_bucket
+    from .models import TicketDailyRollup as Rollup
+
+    units = sorted(units)
+    criteria = [Rollup.day >= units[0][0]]
+    if units[-1][1] is not None:
+        criteria.append(Rollup.day < units[-1][1])
+    label = date_bucket(Rollup.day, period)
+    # Ordered like the grouping so SQLite reuses the GROUP BY sort
+    groups = (Rollup.day, label, Rollup.status, Rollup.issue_type)
+    rows = db.session.query(
+        *groups, func.sum(Rollup.created_count),
+        func.sum(Rollup.resolution_count), func.sum(Rollup.resolution_seconds)
+    ).filter(*criteria).group_by(*groups).order_by(*groups).all()
+
+    starts = [start for start, _ in units]
+    summaries = {unit: _empty_summary() for unit in units}
+    for day, bucket, status, issue_type, created, resolved, seconds in rows:
+        unit = units[bisect_right(starts, day) - 1]
+        if unit[1] is not None and day >= unit[1]:
+            continue  # between two units that are not adjacent
+        created = int(created or 0)
+        _merge_summary(summaries[unit], {
+            'total_tickets': created,
+            'fixed_count': created if status == Ticket.STATUS_FIXED else 0,
+            'category_counts': {issue_type: created},
+            'resolution_count': int(resolved or 0),
+            'resolution_seconds': float(seconds or 0),
+            'trend': {bucket: created},
+        })
+    return summaries
+
+def _merge_summary(summary, other):
+    """Add the totals of `other` into `summary`; trend buckets keep their order."""
+    for key in ('total_tickets', 'fixed_count', 'resolution_count', 'resolution_seconds'):
+        summary[key] += other[key]
+    for key in ('category_counts', 'trend'):
+        for name, count in other[key].items():
+            summary[key][name] = summary[key].get(name, 0) + count
+    return summary
+
+def _bucket_bounds(day, period):
+    """(first day, day after the last) of the trend bucket `day` falls in."""
+    if period == 'daily':
+        return day, day + timedelta(days=1)
+    if period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+def _closed_units(start_day, end_day, period):
+    """
+    Split [start_day, end_day) into the units cached on their own: whole
+    trend buckets, and single days of the buckets it only partly covers,
+    so a window rolling forward a day reuses every unit but the new day.
+    """
+    units = []
+    bucket, bucket_end = _bucket_bounds(start_day, period)
+    while bucket < end_day:
+        if bucket >= start_day and bucket_end <= end_day:
+            units.append((bucket, bucket_end))
+        else:
+            day = max(bucket, start_day)
+            while day < min(bucket_end, end_day):
+                units.append((day, day + timedelta(days=1)))
+                day += timedelta(days=1)
+        bucket, bucket_end = _bucket_bounds(bucket_end, period)
+    return units
+
+def _closed_summary(start_day, end_day, period):
+    """
+    Totals of the days from `start_day` up to `end_day` (all before today),
+    from the units cached for `period`, one entry each without expiry. A
+    unit is reused while the versions of its days are unchanged, so a late
+    edit recomputes only the units covering that day; missing units are
+    computed in one query.
+    """
+    from .cache import cache
+    from .ticket_rollup import day_versions, versions_digest
+
+    units = _closed_units(start_day, end_day, period)
+    # Read before the totals, so a write landing in between only causes a miss next time
+    versions = day_versions(start_day, end_day)
+    keys = {unit: f'analytics_unit_{period}_{unit[0].isoformat()}_{unit[1].isoformat()}' for unit in units}
+
+    summaries, missing = {}, {}
+    for unit in units:
+        digest = versions_digest(versions, *unit)
+        entry = cache.get(keys[unit])
+        if isinstance(entry, dict) and entry.get('versions') == digest:
+            summaries[unit] = entry['summary']
+        else:
+            missing[unit] = digest
+    if missing:
+        for unit, summary in _summarize_units(list(missing), period).items():
+            # The days are closed: only a version change replaces the entry
+            cache.set(keys[unit], {'versions': missing[unit], 'summary': summary}, timeout=0)
+            summaries[unit] = summary
+
+    summary = _empty_summary()
+    for unit in units:
+        _merge_summary(summary, summaries[unit])
+    return summary
+
+@reads_from_replica
+def get_ticket_summary(start_date, end_date=None, period='monthly'):
+    """
+    Totals for tickets created from `start_date`'s day up to `end_date`'s
+    (exclusive; None for no end), summed from ticket_daily_rollup: counts
+    by status and issue type, average resolution hours and the trend,
+    bucketed by `period` in the database. Days before today come from the
+    result cache; only the part of the range from today on is recomputed.
+    """
+    from .date_buckets import PERIODS
+
+    period = period if period in PERIODS else 'monthly'
+    start_day = start_date.date()
+    end_day = end_date.date() if end_date is not None else None
+    today = datetime.utcnow().date()
+
+    summary = _empty_summary()
+    closed_end = today if end_day is None else min(end_day, today)
+    if start_day < closed_end:
+        _merge_summary(summary, _closed_summary(start_day, closed_end, period))
+    if end_day is None or end_day > today:
+        today_unit = (max(start_day, today), end_day)
+        _merge_summary(summary, _summarize_units([today_unit], period)[today_unit])
+
+    resolution_count = summary['resolution_count']
+    return {
+        'total_tickets': summary['total_tickets'],
+        'fixed_count': summary['fixed_count'],
+        'category_counts': summary['category_counts'],
+        'avg_resolution_hours': round(summary['resolution_seconds'] / resolution_count / 3600, 1) if resolution_count else 0,
+        'trend': [[label, count] for label, count in summary['trend'].items() if count],
+    }
+
+@reads_from_replica
 def get_critical_assets(limit=5):
     """
-    Find assets with lowest health scores using optimized batch processing.
-    Eliminates N+1 query issue by pre-fetching tickets.
+    Find assets with lowest health scores, read off the asset_health index.
+    Any asset not working scores below 95, so the score alone selects them.
+    Cached until asset_health, an asset or a room changes.
     """
-    from sqlalchemy.orm import joinedload
-    assets = Asset.query.options(joinedload(Asset.room)).all()
-    
-    # 1. Fetch ALL relevant tickets in ONE query
-    sixty_days_ago = datetime.utcnow() - timedelta(days=60)
-    all_recent_tickets = Ticket.query.filter(Ticket.created_at >= sixty_days_ago).all()
-    
-    # 2. Map tickets to assets in memory
-    ticket_map = {}
-    for t in all_recent_tickets:
-        if t.asset_id:
-            if t.asset_id not in ticket_map:
-                ticket_map[t.asset_id] = []
-            ticket_map[t.asset_id].append(t)
-            
-    # 3. Calculate scores
-    health_list = []
-    for a in assets:
-        score = _compute_score_logic(a, ticket_map.get(a.id, []))
-        # Flag anything with issues or low score
-        if score < 95 or a.status != Asset.STATUS_WORKING:
-            health_list.append({
-                'id': a.id,
-                'name': a.name,
-                'room': a.room.number if a.room else 'N/A',
-                'type': a.asset_type,
-                'score': round(score, 1),
-                'status': a.status
-            })
-            
-    return sorted(health_list, key=lambda x: x['score'])[:limit]
+    from .cache import ASSET_HEALTH_TAG, MAP_TAG, cached_tagged
+    from .models import AssetHealth, Room
+
+    def build():
+        rows = db.session.query(AssetHealth.score, Asset, Room.number).join(
+            Asset, Asset.id == AssetHealth.asset_id
+        ).outerjoin(Room, Room.id == Asset.room_id).filter(
+            AssetHealth.score < 95
+        ).order_by(AssetHealth.score, AssetHealth.asset_id).limit(limit).all()
+
+        return [{
+            'id': a.id,
+            'name': a.name,
+            'room': room_number or 'N/A',
+            'type': a.asset_type,
+            'score': round(score, 1),
+            'status': a.status
+        } for score, a, room_number in rows]
+
+    return cached_tagged(f'analytics_critical_assets_{limit}', [ASSET_HEALTH_TAG, MAP_TAG], build)
@@ -5,7 +5,7 @@ import os
 import traceback
 import logging
 from functools import wraps
-from flask import jsonify, request
+from flask import jsonify, request, g, make_response, current_app
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +52,30 @@ def handle_api_errors(f):
             
     return decorated_function
 
+def conditional_etag(version_func):
+    """
+    Decorator for cacheable GET endpoints. `version_func(**view_args)` returns
+    a token that changes whenever the response would; it is sent as a strong
+    ETag and a matching If-None-Match is answered with 304 before the view
+    (and the database) is touched.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = str(version_func(*args, **kwargs))
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                # A stale-while-revalidate body must not be pinned to the new version
+                if response.status_code != 200 or g.get('cache_served_stale'):
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
 def validate_json(required_fields):
     """
     Helper to check if required fields are present in the JSON request body.
@@ -0,0 +1,129 @@
+"""
+Ticket Archive for FixLink.
+Keeps the tickets table (and its indexes) down to the rows the hot paths
+use by moving fixed tickets older than TICKET_ARCHIVE_AFTER_DAYS into
+tickets_archive, in batches of TICKET_ARCHIVE_BATCH_SIZE.
+
+- Only fixed tickets move. A 'cancelled' ticket is one a professional
+  handed back for reassignment, and tickets with help requests stay
+  where their help requests point.
+- Each batch copies the rows and deletes them from tickets in one
+  transaction. Fixed tickets are not counted by room_status, and
+  professional_stats and ticket_daily_rollup keep their contribution, so
+  none of those tables change.
+- History readers call ticket_source(): while nothing archived can fall in
+  their range they get Ticket itself, otherwise Ticket mapped onto
+  UNION ALL of both tables, so callers keep using ticket attributes.
+"""
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import DateTime, delete, exists, func, insert, inspect, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the TICKET_ARCHIVE_AFTER_DAYS / TICKET_ARCHIVE_BATCH_SIZE settings
+ARCHIVE_AFTER_DAYS = 365
+BATCH_SIZE = 500
+
+
+def ticket_columns():
+    """Column names shared by tickets and tickets_archive, in tickets order."""
+    from .models import Ticket
+    return [column.name for column in Ticket.__table__.columns]
+
+
+def closed_at_expression(model):
+    return func.coalesce(model.fixed_at, model.job_completed_at, model.updated_at, model.created_at)
+
+
+def _archivable(model, cutoff):
+    from .models import HelpRequest, Ticket
+    return [
+        model.status == Ticket.STATUS_FIXED,
+        closed_at_expression(model) < cutoff,
+        ~exists().where(HelpRequest.ticket_id == model.id),
+    ]
+
+
+def archive_closed_tickets(older_than_days=None, batch_size=None, max_batches=None):
+    """Move fixed tickets closed more than `older_than_days` ago to tickets_archive; returns how many moved."""
+    from . import db
+    from .models import Ticket, TicketArchive
+
+    config = current_app.config
+    if older_than_days is None:
+        older_than_days = config.get('TICKET_ARCHIVE_AFTER_DAYS', ARCHIVE_AFTER_DAYS)
+    batch_size = batch_size or config.get('TICKET_ARCHIVE_BATCH_SIZE', BATCH_SIZE)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    names = ticket_columns()
+    tickets = Ticket.__table__
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.session.execute(
+            select(Ticket.id).where(*_archivable(Ticket, cutoff)).order_by(Ticket.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        rows = select(
+            *(tickets.c[name] for name in names), closed_at_expression(tickets.c), literal(datetime.utcnow(), DateTime)
+        ).where(tickets.c.id.in_(ids))
+        connection = db.session.connection()
+        connection.execute(insert(TicketArchive.__table__).from_select([*names, 'closed_at', 'archived_at'], rows))
+        connection.execute(delete(tickets).where(tickets.c.id.in_(ids)))
+
+        # Drop any copies of the moved tickets the session still holds
+        moved_ids = set(ids)
+        for obj in list(db.session.identity_map.values()):
+            if isinstance(obj, Ticket) and inspect(obj).identity[0] in moved_ids:
+                db.session.expunge(obj)
+        db.session.commit()
+        moved += len(ids)
+        batches += 1
+
+    if moved:
+        logger.info(f"Archived {moved} tickets closed before {cutoff:%Y-%m-%d}.")
+    return moved
+
+
+def archive_watermark():
+    """Latest closed_at in tickets_archive, or None while it is empty."""
+    from . import db
+    from .models import TicketArchive
+    return db.session.execute(select(func.max(TicketArchive.closed_at))).scalar()
+
+
+def ticket_union(where=None):
+    """Subquery of every ticket, live and archived, each side filtered by `where(model)`."""
+    from .models import Ticket, TicketArchive
+
+    names = ticket_columns()
+    sides = []
+    for model in (Ticket, TicketArchive):
+        table = model.__table__
+        side = select(*(table.c[name] for name in names))
+        if where is not None:
+            side = side.where(*where(model))
+        sides.append(side)
+    return union_all(*sides).subquery('tickets_all')
+
+
+def ticket_source(since=None, where=None):
+    """
+    (entity, criteria) to read ticket history through. `since` is the
+    earliest created/closed time the caller needs, None for all time;
+    `where(model)` returns filters that hold for Ticket and TicketArchive.
+    Query the entity filtered by the criteria:
+
+        source, criteria = ticket_source(where=lambda t: [t.status == 'fixed'])
+        db.session.query(source).filter(*criteria)
+    """
+    from .models import Ticket
+
+    watermark = archive_watermark()
+    if watermark is None or (since is not None and since > watermark):
+        return Ticket, list(where(Ticket)) if where is not None else []
+    return aliased(Ticket, ticket_union(where), name='tickets_all'), []
@@ -0,0 +1,175 @@
+"""
+Asset Health for FixLink.
+Maintains the asset_health table: per asset, the terms of its health score
+(see analytics._compute_score_logic) and the score itself, indexed, so the
+critical asset list is an ORDER BY score LIMIT n instead of rescoring every
+asset against 60 days of tickets on each analytics load, export and
+scheduler run.
+
+- Every flush that creates, moves or deletes a ticket on an asset, changes
+  a ticket's complexity, or adds an asset or changes its status or
+  installation date rescores the assets involved. The listeners, rebuild
+  and ensure are materialized.py's.
+- Two terms move with the clock alone: age depreciation and tickets leaving
+  the 60-day window. decay_asset_health() rescores rows last evaluated more
+  than ASSET_HEALTH_DECAY_HOURS ago; the scheduler runs it, so a stored
+  score is at most that stale. For the same reason the consistency check
+  only compares the status term and which assets have a row.
+- Committed changes bump the ASSET_HEALTH_TAG cache tag, which the cached
+  critical asset list (analytics.get_critical_assets) depends on.
+"""
+import itertools
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, inspect, select
+from .materialized import MaterializedTable, committed_value
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the ASSET_HEALTH_DECAY_HOURS / ASSET_HEALTH_BATCH_SIZE settings
+DECAY_HOURS = 24
+BATCH_SIZE = 1000
+
+# Attributes a ticket's / an asset's contribution to the score depends on
+TICKET_FIELDS = ('asset_id', 'complexity', 'created_at')
+ASSET_FIELDS = ('status', 'installation_date')
+
+
+def count_asset_health(connection, asset_ids=None, now=None):
+    """Score {asset_id: row} from assets and their tickets in the window, for all assets or just `asset_ids`."""
+    from .analytics import HEALTH_COLUMNS, HEALTH_WINDOW_DAYS, score_assets_bulk
+    from .models import Asset, Ticket
+
+    now = now or datetime.utcnow()
+    assets = select(Asset.id, Asset.installation_date, Asset.status)
+    tickets = select(Ticket.asset_id, Ticket.complexity, func.count()).where(
+        Ticket.asset_id.isnot(None),
+        Ticket.created_at >= now - timedelta(days=HEALTH_WINDOW_DAYS)
+    ).group_by(Ticket.asset_id, Ticket.complexity)
+    if asset_ids is not None:
+        asset_ids = list(asset_ids)
+        assets = assets.where(Asset.id.in_(asset_ids))
+        tickets = tickets.where(Ticket.asset_id.in_(asset_ids))
+
+    columns = score_assets_bulk(connection.execute(assets).all(), connection.execute(tickets).all(), now)
+    rows = {}
+    for values in zip(*(columns[name] for name in HEALTH_COLUMNS)):
+        row = dict(zip(HEALTH_COLUMNS, values), decayed_at=now)
+        rows[row['asset_id']] = row
+    return rows
+
+
+def _write(connection, asset_ids, now=None):
+    """Rescore `asset_ids` and replace their rows; assets that no longer exist lose theirs."""
+    table = ASSET_HEALTH.table
+
+    asset_ids = list(asset_ids)
+    rows = count_asset_health(connection, asset_ids, now)
+    connection.execute(delete(table).where(table.c.asset_id.in_(asset_ids)))
+    ASSET_HEALTH.insert_rows(connection, rows, now)
+    return len(rows)
+
+
+# ==================== TRANSACTIONAL MAINTENANCE ====================
+
+def _changed(state, fields):
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _touched_assets(session):
+    """asset_ids whose score this flush can change."""
+    from .models import Ticket, Asset
+
+    touched = set()
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        state = inspect(obj)
+        if isinstance(obj, Ticket):
+            if obj in session.new or obj in session.deleted or _changed(state, TICKET_FIELDS):
+                touched.update((committed_value(state, 'asset_id'), state.dict.get('asset_id')))
+        elif isinstance(obj, Asset):
+            if obj in session.new or obj in session.deleted or _changed(state, ASSET_FIELDS):
+                touched.add(state.dict.get('id'))
+    touched.discard(None)
+    return touched
+
+
+def _apply_flush(session, connection):
+    from .cache import ASSET_HEALTH_TAG, invalidate_tags_after_commit
+    from .models import Asset
+
+    # Cached critical asset lists also show asset names and statuses
+    if any(isinstance(obj, Asset) for obj in itertools.chain(session.new, session.dirty, session.deleted)):
+        invalidate_tags_after_commit(session, ASSET_HEALTH_TAG)
+    asset_ids = _touched_assets(session)
+    if asset_ids:
+        # The rescore runs on this connection, so it already sees this flush
+        _write(connection, asset_ids)
+        invalidate_tags_after_commit(session, ASSET_HEALTH_TAG)
+    return asset_ids
+
+
+def _invalidate_scores(session, connection, asset_ids):
+    from .cache import ASSET_HEALTH_TAG, invalidate_tags_after_commit
+    invalidate_tags_after_commit(session, ASSET_HEALTH_TAG)
+
+
+# ==================== DECAY ====================
+
+def decay_asset_health(max_age_hours=None, batch_size=None):
+    """
+    Rescore rows last evaluated more than `max_age_hours` ago, and score
+    assets that have no row, in batches; returns how many were rescored.
+    """
+    from . import db
+    from .cache import ASSET_HEALTH_TAG, invalidate_tags
+    from .models import Asset, AssetHealth
+
+    config = current_app.config
+    if max_age_hours is None:
+        max_age_hours = config.get('ASSET_HEALTH_DECAY_HOURS', DECAY_HOURS)
+    batch_size = batch_size or config.get('ASSET_HEALTH_BATCH_SIZE', BATCH_SIZE)
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=max_age_hours)
+
+    stale = select(AssetHealth.asset_id).where(AssetHealth.decayed_at < cutoff).order_by(AssetHealth.asset_id)
+    unscored = select(Asset.id).outerjoin(AssetHealth, AssetHealth.asset_id == Asset.id).where(
+        AssetHealth.asset_id.is_(None)
+    ).order_by(Asset.id)
+
+    rescored = 0
+    for query in (stale, unscored):
+        while True:
+            ids = db.session.execute(query.limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            _write(db.session.connection(), ids, now)
+            db.session.commit()
+            rescored += len(ids)
+            if len(ids) < batch_size:
+                break
+
+    if rescored:
+        invalidate_tags(ASSET_HEALTH_TAG)
+        logger.info(f"Rescored asset_health for {rescored} assets.")
+    return rescored
+
+
+def asset_health_score(asset_id):
+    """Stored health score of an asset; scored on the fly if it has no row yet, 0 if it does not exist."""
+    from . import db
+    from .models import AssetHealth
+
+    score = db.session.execute(select(AssetHealth.score).where(AssetHealth.asset_id == asset_id)).scalar()
+    if score is None:
+        row = count_asset_health(db.session.connection(), [asset_id]).get(asset_id)
+        score = row['score'] if row else 0
+    return score
+
+
+ASSET_HEALTH = MaterializedTable(
+    'asset_health', 'AssetHealth', source='Asset', columns=('status_penalty',),
+    recount=count_asset_health, apply=_apply_flush, load={'Ticket': ('asset_id',)},
+    written=_invalidate_scores, stamp='decayed_at', decay=decay_asset_health
+)
+rebuild_asset_health = ASSET_HEALTH.rebuild
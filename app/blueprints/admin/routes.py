@@ -4,13 +4,18 @@ Admin Routes Blueprint - Maintenance Dashboard
 from functools import wraps
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, flash
-from sqlalchemy import or_, func, case
+from sqlalchemy import func, case
 from ... import db
 from ...models import Building, Floor, Room, Asset, Ticket, User, Professional, HelpRequest, ChatMessage
 from ...utils import send_ticket_email
 from ...decorators import admin_required
-from ...analytics import get_technician_efficiency, get_system_trends, get_critical_assets
+from ...analytics import get_technician_efficiency, get_system_trends, get_critical_assets, get_ticket_summary
 from ...api_utils import handle_api_errors, api_response
+from ...serializers import TICKET_DETAIL, PROFESSIONAL_HISTORY_JOB, ADMIN_DASHBOARD_TICKET
+from ...pagination import keyset_paginate
+from ...search import search_filter, ranked_search
+from ...replica import reads_from_replica
+from ...archive import ticket_source
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -46,8 +51,8 @@ def dashboard():
     page = request.args.get('page', 1, type=int)
     per_page = 20
     
-    # Base query
-    query = Ticket.query
+    # Base query, eager-loading what admin.html renders for each ticket
+    query = Ticket.query.options(*ADMIN_DASHBOARD_TICKET.load_options())
     
     if status_filter != 'all':
         if status_filter == 'open':
@@ -116,16 +121,16 @@ def dashboard():
     ]
     
     # Separate full-list queries for the three status boxes (not affected by filter/pagination)
-    from sqlalchemy.orm import joinedload
-    open_tickets = Ticket.query.options(joinedload(Ticket.room), joinedload(Ticket.assigned_professional)).filter(
+    box_query = Ticket.query.options(*ADMIN_DASHBOARD_TICKET.load_options())
+    open_tickets = box_query.filter(
         Ticket.status.in_([Ticket.STATUS_OPEN, Ticket.STATUS_CANCELLED])
     ).order_by(Ticket.created_at.desc()).all()
 
-    assigned_tickets = Ticket.query.options(joinedload(Ticket.room), joinedload(Ticket.assigned_professional)).filter(
+    assigned_tickets = box_query.filter(
         Ticket.status == Ticket.STATUS_ASSIGNED
     ).order_by(Ticket.created_at.desc()).all()
 
-    in_progress_tickets = Ticket.query.options(joinedload(Ticket.room), joinedload(Ticket.assigned_professional)).filter(
+    in_progress_tickets = box_query.filter(
         Ticket.status == Ticket.STATUS_IN_PROGRESS
     ).order_by(Ticket.created_at.desc()).all()
 
@@ -154,7 +159,8 @@ def status_map():
     vyas = Building.query.filter_by(name='Vyas').first()
     floors = []
     selected_floor = None
-    rooms = []
+    rooms_data = []
+    floor_version = None
     
     if vyas:
         floors = Floor.query.filter(Floor.building_id == vyas.id, Floor.level != 6).order_by(Floor.level).all()
@@ -165,49 +171,42 @@ def status_map():
             selected_floor = floors[0]
         
         if selected_floor:
-            from sqlalchemy.orm import joinedload
-            from ...models import RoomBooking, Timetable
-            rooms = Room.query.options(
-                joinedload(Room.tickets),
-                joinedload(Room.assets),
-                joinedload(Room.room_bookings).joinedload(RoomBooking.faculty),
-                joinedload(Room.timetables).joinedload(Timetable.faculty)
-            ).filter_by(floor_id=selected_floor.id).all()
-            
-    rooms_data = [room.to_map_dict() for room in rooms] if rooms else []
+            # Same versioned snapshot served by /admin/floor-data
+            from ...floor_changes import get_floor_snapshot
+            floor_version, rooms_data = get_floor_snapshot(selected_floor.id)
     
     return render_template('status_map.html',
                          floors=floors,
                          selected_floor=selected_floor,
-                         rooms=rooms,
-                         rooms_data=rooms_data)
+                         rooms=rooms_data,
+                         rooms_data=rooms_data,
+                         floor_version=floor_version)
 
 
 @admin_bp.route('/history')
 @admin_required
+@reads_from_replica
 def history():
     """Admin history page - view fixed tickets with search filtering."""
     search_query = request.args.get('search', '').strip()
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 15
     
-    # Base query for all fixed tickets
+    # All fixed tickets, archived ones included
     from sqlalchemy.orm import joinedload
-    query = Ticket.query.options(joinedload(Ticket.room).joinedload(Room.floor)).filter_by(status=Ticket.STATUS_FIXED)
-    
-    if search_query:
-        search_filter = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                Ticket.reporter_name.ilike(search_filter),
-                Ticket.prn.ilike(search_filter),
-                Ticket.reporter_email.ilike(search_filter)
-            )
-        )
+    def fixed_tickets(model):
+        criteria = [model.status == Ticket.STATUS_FIXED]
+        if search_query:
+            criteria.append(search_filter('tickets', search_query, model=model))
+        return criteria
+
+    source, criteria = ticket_source(where=fixed_tickets)
+    query = db.session.query(source).options(joinedload(source.room).joinedload(Room.floor)).filter(*criteria)
     
-    # Order by fixed date descending and paginate
-    pagination = query.order_by(Ticket.fixed_at.desc(), Ticket.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False)
+    # Newest fixes first, paged on (fixed_at, id)
+    pagination = keyset_paginate(query, [(source.fixed_at, True), (source.id, True)],
+                                 cursor=cursor, per_page=per_page, scope='history',
+                                 filters=(search_query,))
     
     tickets = pagination.items
     
@@ -221,10 +220,12 @@ def history():
 def booking_history():
     """Admin view for faculty classroom bookings."""
     from ...models import RoomBooking
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
-    query = RoomBooking.query.order_by(RoomBooking.slot_start.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    from sqlalchemy.orm import joinedload
+    query = RoomBooking.query.options(joinedload(RoomBooking.faculty), joinedload(RoomBooking.room).joinedload(Room.floor))
+    pagination = keyset_paginate(query, [(RoomBooking.slot_start, True), (RoomBooking.id, True)],
+                                 cursor=cursor, per_page=per_page, scope='booking_history')
     return render_template('admin_booking_history.html', 
                           bookings=pagination.items, 
                           pagination=pagination)
@@ -238,20 +239,13 @@ def users():
     role_filter = request.args.get('role', 'all')
     status_filter = request.args.get('status', 'all')
     sort_filter = request.args.get('sort', 'newest')
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
 
     query = User.query
 
     if search_query:
-        search = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                User.name.ilike(search),
-                User.email.ilike(search),
-                User.prn.ilike(search)
-            )
-        )
+        query = query.filter(search_filter('users', search_query))
     
     if role_filter == 'admin':
         query = query.filter_by(is_admin=True)
@@ -263,22 +257,33 @@ def users():
     elif status_filter == 'unverified':
         query = query.filter_by(is_verified=False)
         
-    if sort_filter == 'newest':
-        query = query.order_by(User.created_at.desc())
-    elif sort_filter == 'oldest':
-        query = query.order_by(User.created_at.asc())
+    if sort_filter == 'oldest':
+        keys = [(User.created_at, False), (User.id, False)]
     elif sort_filter == 'name':
-        query = query.order_by(User.name.asc())
-        
-    total = query.count()
-    users_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    
+        keys = [(User.name, False), (User.id, False)]
+    else:
+        sort_filter = 'newest'
+        keys = [(User.created_at, True), (User.id, True)]
+
+    pagination = keyset_paginate(query, keys, cursor=cursor, per_page=per_page,
+                                 scope=f'users_{sort_filter}',
+                                 filters=(search_query, role_filter, status_filter))
+
+    # Tickets reported by each listed user, archived ones included, read off the reporter index in one query per table
+    from collections import Counter
+    from ...models import TicketArchive
+    user_ids = [user.id for user in pagination.items]
+    ticket_counts = Counter()
+    for model in (Ticket, TicketArchive):
+        ticket_counts.update(db.session.execute(
+            db.select(model.reporter_id).where(model.reporter_id.in_(user_ids))
+        ).scalars())
+
     return render_template('admin_users.html',
-                           users=users_paginated.items,
-                           total=total,
-                           page=page,
-                           pages=users_paginated.pages,
-                           per_page=per_page,
+                           users=pagination.items,
+                           ticket_counts=ticket_counts,
+                           total=pagination.total,
+                           pagination=pagination,
                            search_query=search_query,
                            role_filter=role_filter,
                            status_filter=status_filter,
@@ -288,6 +293,7 @@ def users():
 @admin_bp.route('/analytics')
 @admin_bp.route('/api/analytics', endpoint='api_analytics')
 @admin_required
+@reads_from_replica
 def analytics():
     """Admin analytics and insights dashboard with dynamic filtering."""
     # Get filters from request
@@ -295,40 +301,30 @@ def analytics():
     start_date_str = request.args.get('start_date')
     end_date_str = request.args.get('end_date')
     
-    # Base Filters
-    query = Ticket.query
-    
     # 1. Date Range Handling
     now = datetime.utcnow()
+    end_date = None
     if start_date_str and end_date_str:
         try:
             start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Ticket.created_at.between(start_date, end_date))
         except ValueError:
             start_date = now - timedelta(days=180)
     elif period == 'daily':
         # Default to last 14 days for daily
         start_date = now - timedelta(days=14)
-        query = query.filter(Ticket.created_at >= start_date)
     elif period == 'weekly':
         # Default to last 12 weeks
         start_date = now - timedelta(weeks=12)
-        query = query.filter(Ticket.created_at >= start_date)
     else: # Default monthly
         start_date = now - timedelta(days=180)
-        query = query.filter(Ticket.created_at >= start_date)
 
-    # 2. Total/Fixed Stats (Respecting filters)
-    total_tickets = query.count()
-    fixed_tickets_count = query.filter(Ticket.status == Ticket.STATUS_FIXED).count()
+    # 2. Totals, categories, resolution time and trend, summed from ticket_daily_rollup
+    summary = get_ticket_summary(start_date, end_date, period)
+    total_tickets = summary['total_tickets']
+    fixed_tickets_count = summary['fixed_count']
     
     # 3. Tickets by Category (Respecting filters)
-    raw_category_counts = db.session.query(
-        Ticket.issue_type, func.count(Ticket.id)
-    ).filter(Ticket.created_at >= start_date).group_by(Ticket.issue_type).all()
-    
-    # Re-use your consolidated grouping logic
     category_map = {
         'electrical': 'Electrical & Utilities', 'ac': 'Electrical & Utilities', 
         'lighting': 'Electrical & Utilities', 'light_broken': 'Electrical & Utilities',
@@ -339,7 +335,7 @@ def analytics():
     }
     
     consolidated_data = {}
-    for issue_type, count in raw_category_counts:
+    for issue_type, count in summary['category_counts'].items():
         group_name = category_map.get(issue_type, 'Other')
         consolidated_data[group_name] = consolidated_data.get(group_name, 0) + count
     
@@ -347,52 +343,10 @@ def analytics():
     success_rate = round((fixed_tickets_count / total_tickets * 100), 1) if total_tickets > 0 else 0
     
     # 5. Average Resolution Time (Filtered)
-    avg_res_time = 0
-    try:
-        # Fast SQL Aggregation (PostgreSQL)
-        avg_res_seconds = query.filter(
-            Ticket.status == Ticket.STATUS_FIXED,
-            Ticket.job_completed_at.isnot(None)
-        ).with_entities(
-            func.avg(func.extract('epoch', Ticket.job_completed_at) - func.extract('epoch', Ticket.created_at))
-        ).scalar()
-        if avg_res_seconds:
-            avg_res_time = round(float(avg_res_seconds) / 3600, 1)
-    except Exception:
-        # Fallback for SQLite / Testing
-        fixed_tickets_q = query.filter(
-            Ticket.status == Ticket.STATUS_FIXED,
-            Ticket.job_completed_at.isnot(None)
-        ).all()
-        
-        if fixed_tickets_q:
-            durations = [
-                (t.job_completed_at - t.created_at).total_seconds() 
-                for t in fixed_tickets_q 
-                if t.job_completed_at and t.created_at
-            ]
-            if durations:
-                avg_res_time = round(sum(durations) / (3600 * len(durations)), 1) # in hours
-
-    # 6. Trend Grouping Based on Period (Fallback gracefully on SQLite in testing)
-    trend_data = []
-    try:
-        if period == 'daily':
-            fmt = 'YYYY-MM-DD'
-        elif period == 'weekly':
-            fmt = 'IYYY-"W"IW'
-        else:
-            fmt = 'YYYY-MM'
-            
-        trend_query = db.session.query(
-            func.to_char(Ticket.created_at, fmt).label('label'),
-            func.count(Ticket.id)
-        ).filter(Ticket.created_at >= start_date).group_by('label').order_by('label').all()
-        
-        trend_data = [list(row) for row in trend_query]
-    except Exception:
-        # Graceful fallback for SQLite / testing where func.to_char is unavailable
-        pass
+    avg_res_time = summary['avg_resolution_hours']
+
+    # 6. Trend Grouping Based on Period
+    trend_data = summary['trend']
 
     # Current Risks (Always current)
     critical_assets = get_critical_assets(5)
@@ -506,13 +460,6 @@ def update_ticket_status(ticket_id):
     
     db.session.commit()
     
-    # Invalidate map cache for affected floor
-    if ticket.room_id:
-        room = Room.query.get(ticket.room_id)
-        if room:
-            from ...cache import invalidate_floor_cache
-            invalidate_floor_cache(room.floor_id)
-    
     # Trigger EmailJS notification for ticket update
     send_ticket_email(ticket, action=new_status)
     
@@ -531,8 +478,15 @@ def update_ticket_status(ticket_id):
 @handle_api_errors
 def get_ticket_detail(ticket_id):
     """Get ticket details for modal (AJAX)."""
-    ticket = Ticket.query.get_or_404(ticket_id)
-    return api_response(success=True, data={'ticket': ticket.to_dict()})
+    ticket = TICKET_DETAIL.first(TICKET_DETAIL.select().where(Ticket.id == ticket_id))
+    if ticket is None:
+        # History links to archived tickets too
+        source, _ = ticket_source(where=lambda t: [t.id == ticket_id])
+        if source is not Ticket:
+            ticket = TICKET_DETAIL.first(TICKET_DETAIL.select(source))
+    if ticket is None:
+        return api_response(success=False, error='Ticket not found.', status=404)
+    return api_response(success=True, data={'ticket': ticket})
 
 
 @admin_bp.route('/floor-data/<int:floor_id>')
@@ -540,31 +494,20 @@ def get_ticket_detail(ticket_id):
 @handle_api_errors
 def get_floor_data(floor_id):
     """Get floor data with room statuses for map (AJAX) - Optimized."""
-    from ...cache import cache
+    from ...cache import get_cached_floor_info
+    from ...floor_changes import get_floor_snapshot
     
-    cache_key = f'admin_floor_{floor_id}'
-    cached = cache.get(cache_key)
-    if cached:
-        return api_response(success=True, data={**cached})
+    floor = get_cached_floor_info(floor_id)
+    if floor is None:
+        return api_response(success=False, error='Floor not found.', status=404)
     
-    floor = Floor.query.get_or_404(floor_id)
-    
-    from sqlalchemy.orm import joinedload
-    from ...models import RoomBooking, Timetable
-    rooms = Room.query.options(
-        joinedload(Room.tickets),
-        joinedload(Room.assets),
-        joinedload(Room.room_bookings).joinedload(RoomBooking.faculty),
-        joinedload(Room.timetables).joinedload(Timetable.faculty)
-    ).filter_by(floor_id=floor_id).all()
-    
-    result = {
-        'floor': floor.to_dict(),
-        'rooms': [room.to_map_dict() for room in rooms]
-    }
-    
-    cache.set(cache_key, result, timeout=3600)  # 60 minutes
-    return api_response(success=True, data={**result})
+    # Rooms come from the versioned snapshot so the live map can ask for deltas
+    version, rooms = get_floor_snapshot(floor_id)
+    return api_response(success=True, data={
+        'floor': floor,
+        'rooms': rooms,
+        'version': version
+    })
 
 
 @admin_bp.route('/api/room-status/<room_number>')
@@ -572,13 +515,18 @@ def get_floor_data(floor_id):
 @handle_api_errors
 def api_room_status(room_number):
     """Detailed room status for the interactive map (AJAX)."""
-    room = Room.query.filter(Room.number.ilike(room_number)).first_or_404()
-    
-    # Get active ticket (open, assigned, or in-progress)
-    active_ticket = Ticket.query.filter(
-        Ticket.room_id == room.id,
-        Ticket.status.in_([Ticket.STATUS_OPEN, Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS])
-    ).order_by(Ticket.created_at.desc()).first()
+    from sqlalchemy.orm import joinedload
+    room = Room.query.options(
+        joinedload(Room.status_record), joinedload(Room.floor).joinedload(Floor.building)
+    ).filter(Room.number.ilike(room_number)).first_or_404()
+    
+    # Get active ticket (open, assigned, or in-progress); room_status says if there is one
+    active_ticket = None
+    if room.has_open_tickets or room.has_assigned_tickets or room.has_in_progress_tickets:
+        active_ticket = Ticket.query.filter(
+            Ticket.room_id == room.id,
+            Ticket.status.in_([Ticket.STATUS_OPEN, Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS])
+        ).order_by(Ticket.created_at.desc()).first()
     
     # Get all active professionals for assignment
     all_profs = Professional.query.filter_by(is_active=True).all()
@@ -600,8 +548,15 @@ def api_room_status(room_number):
         if not matching_profs:
             matching_profs = all_profs
             
+        # Professionals with an assigned or in-progress job, in one query
+        busy_ids = set(db.session.execute(
+            db.select(Ticket.assigned_professional_id).distinct().where(
+                Ticket.status.in_([Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS]),
+                Ticket.assigned_professional_id.isnot(None)
+            )
+        ).scalars())
         for p in matching_profs:
-            is_busy = any(t.status in [Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS] for t in p.assigned_tickets)
+            is_busy = p.id in busy_ids
             if not is_busy and p.overall_rating >= best_rating:
                 best_rating = p.overall_rating
                 best_professional_id = p.id
@@ -623,13 +578,41 @@ def api_room_status(room_number):
         'suggested_professional_id': best_professional_id})
 
 
+@admin_bp.route('/api/search')
+@admin_required
+@handle_api_errors
+def api_search():
+    """Ranked search over tickets, users or professionals (AJAX), e.g. ?q=VY40&type=tickets&status=open&floor=2."""
+    search_query = request.args.get('q', '').strip()
+    kind = request.args.get('type', 'tickets')
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    if kind not in ('tickets', 'users', 'professionals'):
+        return api_response(success=False, error="Unknown search type.", status=400)
+    if not search_query:
+        return api_response(success=True, data={'type': kind, 'results': []})
+
+    if kind == 'tickets':
+        stmt = TICKET_DETAIL.select()
+        status_filter = request.args.get('status')
+        floor_id = request.args.get('floor', type=int)
+        if status_filter:
+            stmt = stmt.where(Ticket.status == status_filter)
+        if floor_id:
+            stmt = stmt.where(Room.floor_id == floor_id)
+        results = TICKET_DETAIL.all(ranked_search('tickets', stmt, search_query).limit(limit))
+    else:
+        model = User if kind == 'users' else Professional
+        results = [item.to_dict() for item in ranked_search(kind, model.query, search_query).limit(limit)]
+
+    return api_response(success=True, data={'type': kind, 'results': results})
+
+
 @admin_bp.route('/api/ticket/<int:ticket_id>/assign', methods=['POST'])
 @admin_required
 @handle_api_errors
 def api_assign_ticket(ticket_id):
     """Assign a ticket to a professional via AJAX."""
     from datetime import datetime, timedelta
-    from ...cache import invalidate_floor_cache
     
     ticket = Ticket.query.get_or_404(ticket_id)
     data = request.get_json()
@@ -659,10 +642,6 @@ def api_assign_ticket(ticket_id):
     ticket.status = Ticket.STATUS_ASSIGNED
     
     db.session.commit()
-    
-    # Invalidate cache for the floor
-    if ticket.room_id:
-        invalidate_floor_cache(ticket.room.floor_id)
         
     return api_response(success=True, message="Technician assigned successfully")
 
@@ -718,20 +697,13 @@ def professionals():
     category_filter = request.args.get('category', 'all')
     status_filter = request.args.get('status', 'all')
     search_query = request.args.get('q', '').strip()
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
     
     query = Professional.query
     
     if search_query:
-        search = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                Professional.name.ilike(search),
-                Professional.email.ilike(search),
-                Professional.phone.ilike(search)
-            )
-        )
+        query = query.filter(search_filter('professionals', search_query))
     
     if category_filter != 'all' and category_filter in Professional.CATEGORIES:
         query = query.filter_by(category=category_filter)
@@ -741,10 +713,9 @@ def professionals():
     elif status_filter == 'inactive':
         query = query.filter_by(is_active=False)
     
-    query = query.order_by(Professional.created_at.desc())
-    
-    total = query.count()
-    professionals_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = keyset_paginate(query, [(Professional.created_at, True), (Professional.id, True)],
+                                 cursor=cursor, per_page=per_page, scope='professionals',
+                                 filters=(search_query, category_filter, status_filter))
     
     category_names = {
         Professional.CATEGORY_IT: 'IT Technician',
@@ -754,11 +725,9 @@ def professionals():
     }
     
     return render_template('admin/professionals.html',
-                         professionals=professionals_paginated.items,
-                         total=total,
-                         page=page,
-                         pages=professionals_paginated.pages,
-                         per_page=per_page,
+                         professionals=pagination.items,
+                         total=pagination.total,
+                         pagination=pagination,
                          search_query=search_query,
                          category_filter=category_filter,
                          status_filter=status_filter,
@@ -771,16 +740,8 @@ def professionals():
 def professional_analytics():
     """Professional Analytics page (Lazy loaded/Paginated)."""
     category_filter = request.args.get('category', 'all')
-    page = request.args.get('page', 1, type=int)
     per_page = 10
     
-    query = Professional.query
-    if category_filter != 'all' and category_filter in Professional.CATEGORIES:
-        query = query.filter_by(category=category_filter)
-        
-    query = query.order_by(Professional.name.asc())
-    professionals_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    
     category_names = {
         Professional.CATEGORY_IT: 'IT Technician',
         Professional.CATEGORY_ELECTRICIAN: 'Electrician',
@@ -791,11 +752,17 @@ def professional_analytics():
     
     # Check if this is an AJAX request for lazy loading
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        query = Professional.query
+        if category_filter != 'all' and category_filter in Professional.CATEGORIES:
+            query = query.filter_by(category=category_filter)
+        pagination = keyset_paginate(query, [(Professional.name, False), (Professional.id, False)],
+                                     cursor=request.args.get('cursor'), per_page=per_page,
+                                     scope='professional_analytics', filters=(category_filter,))
         return jsonify({
             'success': True,
-            'data': [p.to_dict() for p in professionals_paginated.items],
-            'has_next': professionals_paginated.has_next,
-            'page': page
+            'data': [p.to_dict() for p in pagination.items],
+            'has_next': pagination.has_next,
+            'next_cursor': pagination.next_cursor
         })
         
     return render_template('admin/professional_analytics.html',
@@ -808,16 +775,19 @@ def professional_history(prof_id):
     """View job history for a specific professional."""
     prof = Professional.query.get_or_404(prof_id)
     
-    # Get completed jobs
-    completed_jobs = Ticket.query.filter_by(
-        assigned_professional_id=prof.id,
-        status=Ticket.STATUS_FIXED
-    ).order_by(Ticket.job_completed_at.desc()).all()
+    # Get completed jobs (archived ones included)
+    source, criteria = ticket_source(where=lambda t: [
+        t.assigned_professional_id == prof.id, t.status == Ticket.STATUS_FIXED
+    ])
+    completed_jobs = PROFESSIONAL_HISTORY_JOB.all(
+        PROFESSIONAL_HISTORY_JOB.select(source).where(*criteria).order_by(source.job_completed_at.desc())
+    )
     
     # Get cancelled jobs
-    cancelled_jobs = Ticket.query.filter_by(
-        cancelled_by_professional_id=prof.id
-    ).order_by(Ticket.cancelled_at.desc()).all()
+    source, criteria = ticket_source(where=lambda t: [t.cancelled_by_professional_id == prof.id])
+    cancelled_jobs = PROFESSIONAL_HISTORY_JOB.all(
+        PROFESSIONAL_HISTORY_JOB.select(source).where(*criteria).order_by(source.cancelled_at.desc())
+    )
     
     category_names = {
         Professional.CATEGORY_IT: 'IT Technician',
@@ -1059,16 +1029,21 @@ def help_requests():
     """View all help requests."""
     status_filter = request.args.get('status', 'pending')
     
-    # Use efficient DB-level aggregation for counts
+    # Counts per status in one grouped query
+    by_status = dict(db.session.query(HelpRequest.status, func.count(HelpRequest.id)).group_by(HelpRequest.status).all())
     counts = {
-        'pending': HelpRequest.query.filter_by(status='pending').count(),
-        'approved': HelpRequest.query.filter_by(status='approved').count(),
-        'rejected': HelpRequest.query.filter_by(status='rejected').count(),
-        'total': HelpRequest.query.count()
+        'pending': by_status.get('pending', 0),
+        'approved': by_status.get('approved', 0),
+        'rejected': by_status.get('rejected', 0),
+        'total': sum(by_status.values())
     }
     
-    # Efficient DB-level filtering and sorting
-    query = HelpRequest.query
+    # Efficient DB-level filtering and sorting, with everything the cards show
+    from sqlalchemy.orm import joinedload
+    query = HelpRequest.query.options(
+        joinedload(HelpRequest.requester), joinedload(HelpRequest.helper),
+        joinedload(HelpRequest.ticket).joinedload(Ticket.room)
+    )
     if status_filter != 'all':
         query = query.filter_by(status=status_filter)
     
@@ -1131,6 +1106,7 @@ def respond_to_help_request(help_request_id):
 
 @admin_bp.route('/reports/export/<string:fmt>')
 @admin_required
+@reads_from_replica
 def export_report(fmt):
     """Export maintenance data as PDF or CSV."""
     import csv
@@ -1141,17 +1117,21 @@ def export_report(fmt):
     start_date_str = request.args.get('start_date')
     end_date_str = request.args.get('end_date')
     
-    query = Ticket.query
+    start_date = end_date = None
     if start_date_str and end_date_str:
         try:
             start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Ticket.created_at.between(start_date, end_date))
         except ValueError:
-            pass
+            start_date = end_date = None
+
+    # Archived tickets are read only when the range reaches back to them
+    in_range = lambda t: [t.created_at.between(start_date, end_date)] if start_date else []
+    source, criteria = ticket_source(since=start_date, where=in_range)
+    query = TICKET_DETAIL.select(source).where(*criteria)
             
-    tickets = query.order_by(Ticket.created_at.desc()).all()
-    data = [t.to_dict() for t in tickets]
+    # One joined query; rows carry the same keys as Ticket.to_dict()
+    data = TICKET_DETAIL.all(query.order_by(source.created_at.desc()))
     if not data:
         flash('No data available for export.', 'info')
         return redirect(url_for('admin.dashboard'))
@@ -1511,10 +1491,11 @@ def get_chat_history_with_professional(professional_id):
     for msg in messages:
         if msg.receiver_type == ChatMessage.SENDER_TYPE_ADMIN:
             msg.is_read = True
+    # Serialize before the commit expires every message
+    data = {'messages': [msg.to_dict() for msg in messages], 'professional': professional.to_dict()}
     db.session.commit()
     
-    return api_response(success=True, data={'messages': [msg.to_dict() for msg in messages],
-        'professional': professional.to_dict()})
+    return api_response(success=True, data=data)
 
 
 @admin_bp.route('/api/chat/send', methods=['POST'])
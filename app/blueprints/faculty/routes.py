@@ -44,7 +44,7 @@ def dashboard():
         
     # Eager load rooms for efficiency
     all_rooms = Room.query.options(
-        joinedload(Room.timetables),
+        joinedload(Room.floor),
         joinedload(Room.adhoc_bookings).joinedload(AdHocBooking.faculty)
     ).all()
     
@@ -101,7 +101,6 @@ def claim_room():
         return api_response(success=False, error="Invalid duration.", status=400)
     
     room = Room.query.options(
-        joinedload(Room.timetables),
         joinedload(Room.adhoc_bookings)
     ).filter_by(id=room_id).first_or_404()
     
@@ -156,8 +155,8 @@ def claim_room():
 @handle_api_errors
 def get_map_status(floor_id):
     """Returns room data for the selected floor in a standard map-ready format."""
+    from ...cache import get_cached_floor_data
     floor = Floor.query.get_or_404(floor_id)
-    rooms = Room.query.filter_by(floor_id=floor_id).all()
     
     return api_response(data={
         'floor': {
@@ -165,7 +164,8 @@ def get_map_status(floor_id):
             'name': floor.name,
             'level': floor.level
         },
-        'rooms': [room.to_map_dict() for room in rooms]
+        # Cached layout layer merged with the occupancy index, as on the student map
+        'rooms': get_cached_floor_data(floor_id)
     })
 
 
@@ -263,49 +263,21 @@ def get_map_status_for_time():
     try:
         start_dt = datetime.fromisoformat(start_iso.replace('Z', ''))
         end_dt = datetime.fromisoformat(end_iso.replace('Z', ''))
-        booking_date = start_dt.date()
-        current_day = start_dt.weekday()
-        start_time = start_dt.time()
-        end_time = end_dt.time()
         
-        rooms_query = Room.query.filter(Room.floor_id.in_(floor_ids))
+        from ...occupancy import occupancy_between
+        rooms_query = Room.query.options(joinedload(Room.status_record)).filter(Room.floor_id.in_(floor_ids))
         if room_type != 'all':
             rooms_query = rooms_query.filter(Room.room_type == room_type)
             
         rooms = rooms_query.all()
+        # Overlapping bookings and timetable slots of every room, one query each
+        occupancy = occupancy_between(floor_ids, start_dt, end_dt)
         result_rooms = []
         
         for room in rooms:
-            # Check RoomBooking
-            overlapping_booking = RoomBooking.query.filter(
-                RoomBooking.room_id == room.id,
-                RoomBooking.date == booking_date,
-                RoomBooking.status == RoomBooking.STATUS_ACTIVE,
-                RoomBooking.slot_start >= start_dt,
-                RoomBooking.slot_start < end_dt
-            ).first()
-            
-            # Check Timetable
-            overlapping_timetable = Timetable.query.filter(
-                Timetable.room_id == room.id,
-                Timetable.day_of_week == current_day,
-                Timetable.start_time < end_time,
-                Timetable.end_time > start_time
-            ).first()
-            
-            is_occupied = (overlapping_booking is not None) or (overlapping_timetable is not None)
-            
-            status_data = 'occupied' if is_occupied else 'vacant'
-            
-            room_dict = room.to_map_dict()
-            room_dict['occupancy'] = {'status': status_data}
-            
-            if is_occupied:
-                subject = overlapping_booking.subject if overlapping_booking else overlapping_timetable.subject
-                faculty_name = overlapping_booking.faculty.name if overlapping_booking and overlapping_booking.faculty else (overlapping_timetable.faculty.name if overlapping_timetable and overlapping_timetable.faculty else 'Unknown')
-                room_dict['occupancy']['subject'] = subject
-                room_dict['occupancy']['faculty'] = faculty_name
-                room_dict['occupancy']['type'] = 'booking' if overlapping_booking else 'scheduled'
+            room_dict = room.to_layout_dict()
+            room_dict['occupancy'] = occupancy.get(room.id, {'status': 'vacant'})
+            if room.id in occupancy:
                 room_dict['occupancy']['is_owner'] = False # For advanced search, owner status less important for viewing
             
             result_rooms.append(room_dict)
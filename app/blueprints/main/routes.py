@@ -9,7 +9,8 @@ from ... import db
 from ...models import Building, Floor, Room, Asset, Ticket, User, Notification, Professional
 from ...utils import send_ticket_email, ALLOWED_EXTENSIONS, allowed_file, save_webapp_file
 from ...decorators import user_login_required, login_required
-from ...api_utils import handle_api_errors, api_response
+from ...api_utils import handle_api_errors, api_response, conditional_etag
+from ...cache import map_version, floor_data_version, room_assets_version
 
 main_bp = Blueprint('main', __name__)
 
@@ -168,12 +169,6 @@ def submit_report():
         db.session.add(ticket)
         db.session.commit()
         
-        # Invalidate map cache for this floor
-        room_obj = Room.query.get(r_id)
-        if room_obj:
-            from app.cache import invalidate_floor_cache
-            invalidate_floor_cache(room_obj.floor_id)
-        
         # Trigger EmailJS notification for ticket creation
         # (Consider moving this to a background task in production)
         try:
@@ -211,6 +206,7 @@ def submit_report():
 @main_bp.route('/api/floors/<int:building_id>', methods=['GET'])
 @user_login_required
 @handle_api_errors
+@conditional_etag(lambda building_id: f'floors-{building_id}-{map_version()}')
 def get_floors(building_id):
     """Get all floors for a building (JSON)."""
     floors = Floor.query.filter_by(building_id=building_id).order_by(Floor.level).all()
@@ -220,11 +216,21 @@ def get_floors(building_id):
 @main_bp.route('/api/rooms/floor/<int:floor_id>', methods=['GET'])
 @user_login_required
 @handle_api_errors
+@conditional_etag(lambda floor_id: f'floor-{floor_id}-{floor_data_version(floor_id)}')
 def get_rooms_by_floor(floor_id):
     """Get all rooms for a floor (JSON) - Optimized with eager loading and caching."""
-    from ...cache import get_cached_floor_data
-    rooms_data = get_cached_floor_data(floor_id)
-    return api_response(data={'rooms': rooms_data})
+    from ...floor_changes import get_floor_snapshot
+    version, rooms_data = get_floor_snapshot(floor_id)
+    return api_response(data={'rooms': rooms_data, 'version': version})
+
+
+@main_bp.route('/api/rooms/floor/<int:floor_id>/changes', methods=['GET'])
+@user_login_required
+@handle_api_errors
+def get_room_changes_by_floor(floor_id):
+    """Get only the rooms whose status or occupancy changed since ?since=<version> (JSON)."""
+    from ...floor_changes import get_floor_changes
+    return api_response(data=get_floor_changes(floor_id, request.args.get('since', type=int)))
 
 
 @main_bp.route('/api/room/<room_number>', methods=['GET'])
@@ -232,7 +238,10 @@ def get_rooms_by_floor(floor_id):
 @handle_api_errors
 def get_room_by_number(room_number):
     """Get room details by room number (JSON)."""
-    room = Room.query.filter_by(number=room_number.upper()).first_or_404()
+    from sqlalchemy.orm import joinedload
+    room = Room.query.options(
+        joinedload(Room.status_record), joinedload(Room.floor).joinedload(Floor.building)
+    ).filter_by(number=room_number.upper()).first_or_404()
     return api_response(data={
         'room': {
             **room.to_dict(),
@@ -245,6 +254,7 @@ def get_room_by_number(room_number):
 @main_bp.route('/api/assets/<int:room_id>', methods=['GET'])
 @user_login_required
 @handle_api_errors
+@conditional_etag(lambda room_id: f'assets-{room_id}-{room_assets_version(room_id)}')
 def get_assets(room_id):
     """Get all assets for a room (JSON)."""
     assets = Asset.query.filter_by(room_id=room_id).all()
@@ -254,6 +264,7 @@ def get_assets(room_id):
 @main_bp.route('/api/buildings', methods=['GET'])
 @user_login_required
 @handle_api_errors
+@conditional_etag(lambda: f'buildings-{map_version()}')
 def get_buildings():
     """Get all buildings (JSON)."""
     buildings = Building.query.all()
@@ -11,6 +11,7 @@ from ...models import Professional, Ticket, HelpRequest, ChatMessage, Room, Asse
 from ...utils import allowed_file, save_webapp_file
 from ...decorators import professional_login_required
 from ...api_utils import handle_api_errors, api_response
+from ...serializers import TICKET_DETAIL, PROFESSIONAL_TASK
 
 professional_bp = Blueprint('professional', __name__, url_prefix='/professional')
 
@@ -47,8 +48,8 @@ def dashboard():
     professional = Professional.query.get(session['professional_id'])
     
     # Get all assigned tickets for this professional where they are the primary appointee
-    from sqlalchemy.orm import joinedload
-    primary_tickets = Ticket.query.options(joinedload(Ticket.room)).filter_by(
+    task_query = Ticket.query.options(*PROFESSIONAL_TASK.load_options())
+    primary_tickets = task_query.filter_by(
         assigned_professional_id=professional.id
     ).filter(
         Ticket.status.in_([Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS])
@@ -57,23 +58,21 @@ def dashboard():
     for t in primary_tickets:
         t.role = 'Primary'
 
-    # Get tickets where this professional is an approved helper
-    helper_requests = HelpRequest.query.filter_by(
-        helper_professional_id=professional.id,
-        status=HelpRequest.STATUS_APPROVED
+    # Get active tickets where this professional is an approved helper
+    helper_tickets = task_query.join(HelpRequest, HelpRequest.ticket_id == Ticket.id).filter(
+        HelpRequest.helper_professional_id == professional.id,
+        HelpRequest.status == HelpRequest.STATUS_APPROVED,
+        Ticket.status.in_([Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS])
     ).all()
     
-    helper_tickets = []
-    for hr in helper_requests:
-        if hr.ticket.status in [Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS]:
-            hr.ticket.role = 'Helper'
-            helper_tickets.append(hr.ticket)
+    for t in helper_tickets:
+        t.role = 'Helper'
             
     # Combine and sort by creation date
     assigned_tickets = sorted(primary_tickets + helper_tickets, key=lambda x: x.created_at, reverse=True)
     
     # Get completed tickets (for history)
-    completed_tickets = Ticket.query.options(joinedload(Ticket.room)).filter_by(
+    completed_tickets = task_query.filter_by(
         assigned_professional_id=professional.id,
         status=Ticket.STATUS_FIXED
     ).order_by(Ticket.job_completed_at.desc()).limit(10).all()
@@ -129,8 +128,7 @@ def history():
     professional = Professional.query.get(session['professional_id'])
     
     # Get all completed tickets for this professional
-    from sqlalchemy.orm import joinedload
-    completed_tickets = Ticket.query.options(joinedload(Ticket.room)).filter_by(
+    completed_tickets = Ticket.query.options(*PROFESSIONAL_TASK.load_options()).filter_by(
         assigned_professional_id=professional.id,
         status=Ticket.STATUS_FIXED
     ).order_by(Ticket.job_completed_at.desc()).all()
@@ -376,9 +374,11 @@ def get_chat_history():
     for msg in messages:
         if msg.receiver_type == ChatMessage.SENDER_TYPE_PROFESSIONAL and msg.receiver_id == professional.id:
             msg.is_read = True
+    # Serialize before the commit expires every message
+    data = {'messages': [msg.to_dict() for msg in messages]}
     db.session.commit()
     
-    return api_response(success=True, data={'messages': [msg.to_dict() for msg in messages]})
+    return api_response(success=True, data=data)
 
 
 @professional_bp.route('/api/chat/send', methods=['POST'])
@@ -428,12 +428,13 @@ def send_chat_message():
 @handle_api_errors
 def get_task_detail_api(ticket_id):
     """Get task details via API."""
-    professional = Professional.query.get(session['professional_id'])
-    ticket = Ticket.query.get_or_404(ticket_id)
+    ticket = TICKET_DETAIL.first(TICKET_DETAIL.select().where(Ticket.id == ticket_id))
+    if ticket is None:
+        return api_response(success=False, error='Ticket not found.', status=404)
     
-    if ticket.assigned_professional_id != professional.id:
+    if ticket['assigned_professional_id'] != session['professional_id']:
         return api_response(success=False, data={'error': "Not authorized"}), 403
-    return api_response(success=True, data={'ticket': ticket.to_dict()})
+    return api_response(success=True, data={'ticket': ticket})
 
 
 @professional_bp.route('/api/chat/reset', methods=['POST'])
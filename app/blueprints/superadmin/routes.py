@@ -94,6 +94,20 @@ def dashboard():
                          user_count=user_count,
                          bugs=bugs)
 
+@superadmin_bp.route('/developer/api/cache-stats')
+@super_admin_required
+def cache_stats():
+    """Per key prefix cache hits, misses, sets, evictions, sizes and latency for this worker."""
+    from ...cache import get_cache_stats
+    return api_response(data=get_cache_stats())
+
+@superadmin_bp.route('/developer/api/retention')
+@super_admin_required
+def retention_report():
+    """Rows removed and time spent by each retention policy's latest run in this worker."""
+    from ...retention import last_retention_reports
+    return api_response(data={'policies': last_retention_reports()})
+
 @superadmin_bp.route('/developer/bugs/<int:bug_id>/resolve', methods=['POST'])
 @super_admin_required
 def resolve_bug(bug_id):
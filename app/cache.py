@@ -1,66 +1,562 @@
 """
 Centralized Cache Module for FixLink.
-Provides a shared cache instance and invalidation helpers.
+Provides a shared cache instance, tag-based invalidation and cached view helpers.
+
+Entries written through set_tagged()/cached_tagged() carry the generation of
+every tag they depend on (e.g. 'floor:4', 'room:12', 'ticket:123',
+'professional:7'). Invalidating a tag only bumps its generation counter, so
+dependent keys miss lazily on their next read instead of being deleted in bulk.
+
+Rebuilds go through a per-key single-flight lock shared by threads and by
+workers using the same cache directory, and keys with a stale-while-revalidate
+window keep serving the previous value while one caller recomputes it.
 """
+import os
+import time
+import hashlib
+import itertools
+import threading
+from datetime import timezone
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context
 from flask_caching import Cache
+from sqlalchemy import event, inspect, select
+from .cache_serializer import CacheSerializer, DEFAULT_COMPRESS_THRESHOLD
+from .cache_l1 import (
+    LocalLRU, DEFAULT_SIZE as L1_DEFAULT_SIZE, DEFAULT_TTL as L1_DEFAULT_TTL,
+    DEFAULT_CHECK_SECONDS as L1_DEFAULT_CHECK_SECONDS
+)
 
 cache = Cache()
 
+# Applied to every map entry so the whole map can be invalidated in one bump
+MAP_TAG = 'map'
+
+# Applied to cached reads of asset_health (the critical asset list)
+ASSET_HEALTH_TAG = 'asset_health'
+
+# Generation keys must outlive the entries that depend on them. If one is
+# evicted anyway it is re-seeded with a fresh value and dependents just miss.
+TAG_GENERATION_TIMEOUT = 7 * 24 * 3600
+
+# Room layout/maintenance data only changes through invalidated writes
+LAYOUT_TIMEOUT = 24 * 3600
+
+# Seconds a stale value may still be served while another caller rebuilds it,
+# by key prefix. Overridable per prefix through the CACHE_STALE_TTLS config.
+STALE_TTLS = {
+    'map_floor_': 30,
+    'admin_floor_': 30,
+}
+
+# How long a caller with nothing to serve waits for another rebuild to finish
+# before computing the value itself
+REBUILD_LOCK_WAIT = 5
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
 
-import os
 
 def init_cache(app):
     """Initialize the cache with the Flask app using FileSystemCache for serverless persistence."""
     # Vercel allows writing to /tmp which can persist across warm starts better than memory
     cache_dir = '/tmp/fixlink_cache' if os.environ.get('VERCEL') else os.path.join(app.root_path, '.cache')
+    # CACHE_DIR overrides it, e.g. to keep test runs out of the source tree
+    cache_dir = os.environ.get('CACHE_DIR') or cache_dir
     os.makedirs(cache_dir, exist_ok=True)
-    
+    # Kept outside CACHE_DIR, which FileSystemCache expects to hold only entries
+    lock_dir = cache_dir.rstrip(os.sep) + '_locks'
+    os.makedirs(lock_dir, exist_ok=True)
+
     cache_config = {
         'CACHE_TYPE': 'FileSystemCache',
         'CACHE_DIR': cache_dir,
+        'CACHE_LOCK_DIR': lock_dir,
         'CACHE_DEFAULT_TIMEOUT': 3600,  # 1 hour default
         'CACHE_THRESHOLD': 256,
     }
     app.config.from_mapping(cache_config)
+    # 0 disables the periodic stats log line
+    app.config.setdefault('CACHE_STATS_LOG_INTERVAL', int(os.environ.get('CACHE_STATS_LOG_INTERVAL', 0)))
+    # 'json' or 'msgpack' (default when installed); entries are never pickled
+    app.config.setdefault('CACHE_SERIALIZER', os.environ.get('CACHE_SERIALIZER'))
+    app.config.setdefault('CACHE_COMPRESS_THRESHOLD', DEFAULT_COMPRESS_THRESHOLD)
+    # Values that do not survive the serializer raise instead of being cached as a miss
+    app.config.setdefault('CACHE_STRICT_SERIALIZER', app.testing or app.debug)
     cache.init_app(app)
+
+    from .cache_stats import InstrumentedCache
+    backends = app.extensions['cache']
+    backends[cache].serializer = CacheSerializer(
+        app.config['CACHE_SERIALIZER'], app.config['CACHE_COMPRESS_THRESHOLD'], app.config['CACHE_STRICT_SERIALIZER']
+    )
+    backends[cache] = InstrumentedCache(backends[cache], log_interval=app.config['CACHE_STATS_LOG_INTERVAL'])
+
+    # In-process L1 for tagged entries; a size or TTL of 0 disables it. L1 hits
+    # re-read tag generations from L2 at most every CACHE_L1_CHECK_SECONDS (0: always)
+    app.config.setdefault('CACHE_L1_SIZE', L1_DEFAULT_SIZE)
+    app.config.setdefault('CACHE_L1_TTL', L1_DEFAULT_TTL)
+    app.config.setdefault('CACHE_L1_CHECK_SECONDS', L1_DEFAULT_CHECK_SECONDS)
+    if app.config['CACHE_L1_SIZE'] and app.config['CACHE_L1_TTL']:
+        app.extensions['fixlink_cache_l1'] = LocalLRU(
+            app.config['CACHE_L1_SIZE'], app.config['CACHE_L1_TTL'], app.config['CACHE_L1_CHECK_SECONDS']
+        )
+    register_invalidation_listeners()
+
+    from .occupancy import register_occupancy_listeners
+    register_occupancy_listeners()
     return cache
 
 
+def get_cache_stats():
+    """
+    Return this process's cache hit/miss/size/latency counters per key prefix.
+    Top-level counters are for the shared FileSystemCache (L2), which only
+    sees tagged reads that missed the in-process L1; 'l1' reports that tier.
+    """
+    stats = cache.cache.stats.snapshot()
+    l1 = _l1()
+    if l1 is not None:
+        stats['l1'] = {**l1.stats.snapshot(), 'size': len(l1), 'maxsize': l1.maxsize, 'ttl': l1.ttl}
+    return stats
+
+
+def _l1():
+    return current_app.extensions.get('fixlink_cache_l1') if has_app_context() else None
+
+
+# ==================== TAGS ====================
+
+def floor_tag(floor_id):
+    return f'floor:{floor_id}'
+
+
+def room_tag(room_id):
+    return f'room:{room_id}'
+
+
+def ticket_tag(ticket_id):
+    return f'ticket:{ticket_id}'
+
+
+def professional_tag(professional_id):
+    return f'professional:{professional_id}'
+
+
+def _generation_key(tag):
+    return f'tag_gen_{tag}'
+
+
+def get_tag_generation(tag):
+    """Return the current generation of a tag, seeding it if missing."""
+    key = _generation_key(tag)
+    generation = cache.get(key)
+    if generation is None:
+        # A time-based seed never collides with a generation stored before eviction
+        generation = time.time_ns()
+        cache.set(key, generation, timeout=TAG_GENERATION_TIMEOUT)
+    return generation
+
+
+def _bump_generation(tag):
+    """Advance a tag's generation and return (previous, new)."""
+    key = _generation_key(tag)
+    previous = cache.get(key)
+    generation = max((previous or 0) + 1, time.time_ns())
+    cache.set(key, generation, timeout=TAG_GENERATION_TIMEOUT)
+    l1 = _l1()
+    if l1 is not None:
+        l1.note_generation(tag, generation)
+    return previous, generation
+
+
+def invalidate_tags(*tags):
+    """
+    Bump the generation of each tag so every entry depending on it misses.
+    Returns a {tag: new_generation} dict.
+    """
+    return {tag: _bump_generation(tag)[1] for tag in tags}
+
+
+def _snapshot_generations(tags):
+    return {tag: get_tag_generation(tag) for tag in tags}
+
+
+def _is_current(entry, tag_generation=get_tag_generation):
+    """Check that a tagged entry was written under the current tag generations."""
+    if not isinstance(entry, dict) or 'tags' not in entry:
+        return False
+    return all(tag_generation(tag) == generation for tag, generation in entry['tags'].items())
+
+
+def _is_fresh(entry, tag_generation=get_tag_generation):
+    """Check that a tagged entry is current and has not passed its soft expiry."""
+    if not _is_current(entry, tag_generation):
+        return False
+    expires_at = entry.get('expires_at')
+    return expires_at is None or time.time() < expires_at
+
+
+def _stale_age(entry):
+    """Seconds since a tagged entry went stale, through invalidation or expiry."""
+    if not isinstance(entry, dict) or 'tags' not in entry:
+        return None
+    age = 0.0
+    # Generations are seeded from time_ns(), so the newest one dates the invalidation
+    for tag, generation in entry['tags'].items():
+        current = get_tag_generation(tag)
+        if current != generation:
+            age = max(age, (time.time_ns() - current) / 1e9)
+    if entry.get('expires_at') is not None:
+        age = max(age, time.time() - entry['expires_at'])
+    return age
+
+
+def stale_ttl_for(key):
+    """Return the stale-while-revalidate window for `key` (longest matching prefix)."""
+    ttls = dict(STALE_TTLS)
+    if has_app_context():
+        ttls.update(current_app.config.get('CACHE_STALE_TTLS') or {})
+    matches = [prefix for prefix in ttls if key.startswith(prefix)]
+    return ttls[max(matches, key=len)] if matches else 0
+
+
+def set_tagged(key, value, tags, timeout=None, generations=None, stale_ttl=0):
+    """
+    Store a value along with the generations of the tags it depends on.
+    Pass `generations` captured *before* computing the value so an invalidation
+    that races with the computation is not masked. With a `stale_ttl` the entry
+    is kept that much longer than `timeout` so it can be served while stale.
+    """
+    if generations is None:
+        generations = _snapshot_generations(tags)
+    if timeout is None:
+        timeout = cache.cache.default_timeout
+    entry = {
+        'value': value,
+        'tags': generations,
+        'expires_at': time.time() + timeout if timeout else None,
+    }
+    l1 = _l1()
+    if l1 is not None:
+        l1.set(key, entry)
+    return cache.set(key, entry, timeout=timeout + stale_ttl if timeout else timeout)
+
+
+def _read_entry(key):
+    """
+    Return (entry, fresh) for `key`, from L1 when it is still current there,
+    otherwise from L2 (refreshing L1). L2 reads are judged against the tag
+    generations in L2; L1 hits against L1's copy of them, which follows L2
+    within CACHE_L1_CHECK_SECONDS, so a hot entry is served without file I/O.
+    """
+    l1 = _l1()
+    if l1 is not None:
+        start = time.perf_counter()
+        entry = l1.get(key)
+        hit = entry is not None and _is_fresh(entry, lambda tag: l1.generation(tag, get_tag_generation))
+        l1.stats.record_get(key, hit, (time.perf_counter() - start) * 1000)
+        if hit:
+            return entry, True
+
+    entry = cache.get(key)
+    if l1 is not None:
+        # Judged against L2, and L1's copy of the generations refreshed on the way
+        fresh = _is_fresh(entry, lambda tag: l1.generation(tag, get_tag_generation, max_age=0))
+    else:
+        fresh = _is_fresh(entry)
+    fresh = fresh and entry['value'] is not None
+    if fresh and l1 is not None:
+        l1.set(key, entry)
+    return entry, fresh
+
+
+def get_tagged(key):
+    """Return the cached value, or None if missing or any of its tags was invalidated."""
+    entry, fresh = _read_entry(key)
+    return entry['value'] if fresh else None
+
+
+# ==================== SINGLE-FLIGHT ====================
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(key):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(key, threading.Lock())
+
+
+def _lock_path(key):
+    if not has_app_context() or fcntl is None:
+        return None
+    lock_dir = current_app.config.get('CACHE_LOCK_DIR')
+    if not lock_dir:
+        return None
+    return os.path.join(lock_dir, hashlib.md5(key.encode()).hexdigest() + '.lock')
+
+
+@contextmanager
+def rebuild_lock(key, wait=REBUILD_LOCK_WAIT):
+    """
+    Hold the rebuild lock for `key`, shared by threads in this process and by
+    workers using the same cache directory. Yields False if the lock could not
+    be taken within `wait` seconds (0 = don't wait).
+    """
+    deadline = time.monotonic() + wait
+    thread_lock = _thread_lock(key)
+    if not (thread_lock.acquire(timeout=wait) if wait else thread_lock.acquire(blocking=False)):
+        yield False
+        return
+
+    lock_file = None
+    try:
+        path = _lock_path(key)
+        if path:
+            lock_file = open(path, 'a')
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        lock_file.close()
+                        lock_file = None
+                        yield False
+                        return
+                    time.sleep(0.05)
+        yield True
+    finally:
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+        thread_lock.release()
+
+
+def cached_tagged(key, tags, builder, timeout=None, stale_ttl=None):
+    """
+    Return the cached value for `key`, rebuilding it with `builder()` on a miss.
+
+    Only one caller rebuilds a key at a time. While it does, callers holding a
+    value that went stale less than `stale_ttl` seconds ago (default: from
+    stale_ttl_for()) return it immediately; the others wait for the rebuild.
+    """
+    entry, fresh = _read_entry(key)
+    if fresh:
+        return entry['value']
+
+    if stale_ttl is None:
+        stale_ttl = stale_ttl_for(key)
+    age = _stale_age(entry) if stale_ttl else None
+    stale = entry if age is not None and age <= stale_ttl and entry['value'] is not None else None
+
+    with rebuild_lock(key, wait=0 if stale else REBUILD_LOCK_WAIT) as acquired:
+        if not acquired and stale:
+            if has_app_context():
+                # Lets conditional responses skip validators for an outdated body
+                g.cache_served_stale = True
+            return stale['value']
+        if acquired:
+            # The previous holder may have just rebuilt it
+            entry, fresh = _read_entry(key)
+            if fresh:
+                return entry['value']
+
+        # Also reached when waiting timed out: computing beats failing the request
+        generations = _snapshot_generations(tags)
+        value = builder()
+        set_tagged(key, value, tags, timeout=timeout, generations=generations, stale_ttl=stale_ttl)
+        return value
+
+
+# ==================== VERSIONS ====================
+
+# Generations are seeded from time_ns() and only move forward, so the newest
+# one is a monotonic version for everything depending on those tags.
+
+def map_version():
+    """Version of building/floor listings."""
+    return get_tag_generation(MAP_TAG)
+
+
+def floor_data_version(floor_id, now_utc=None):
+    """Version of a floor's room payload: its tags, or the occupancy bucket once it rolls over."""
+    from .occupancy import occupancy_bucket
+    bucket = occupancy_bucket(now_utc)
+    bucket_ns = int(bucket.replace(tzinfo=timezone.utc).timestamp()) * 10**9
+    return max(get_tag_generation(MAP_TAG), get_tag_generation(floor_tag(floor_id)), bucket_ns)
+
+
+def room_assets_version(room_id):
+    """Version of a room's asset list."""
+    return max(get_tag_generation(MAP_TAG), get_tag_generation(room_tag(room_id)))
+
+
+# ==================== INVALIDATION ====================
+
 def invalidate_floor_cache(floor_id):
     """Invalidate cached map data for a specific floor.
-    Call this when a ticket is created/updated or an asset status changes.
+    Called automatically after commits that touch the floor's rooms.
     """
-    # Keys match the patterns used in @cache.cached() decorators
-    cache.delete(f'map_floor_{floor_id}')
-    cache.delete(f'admin_floor_{floor_id}')
+    invalidate_tags(floor_tag(floor_id))
 
 
 def invalidate_all_map_cache():
-    """Nuclear option: clear all cached map data."""
-    cache.clear()
+    """Invalidate every cached map entry without wiping unrelated cache data."""
+    invalidate_tags(MAP_TAG)
+
+
+# ==================== AUTOMATIC INVALIDATION ====================
+
+# session.info key holding floors touched by the current transaction
+_PENDING_FLOORS_KEY = 'fixlink_pending_floor_invalidations'
+# session.info key holding other tags to bump: room tags for asset writes and
+# the map tag when buildings, floors or rooms change
+_PENDING_TAGS_KEY = 'fixlink_pending_tag_invalidations'
+_listeners_registered = False
+_commit_hooks = []
+
+
+def register_commit_hook(hook):
+    """
+    Run hook(session, bumped) after each commit, once the touched floors have
+    been invalidated. `bumped` maps floor_id -> (previous, new) generation so
+    in-process state updated incrementally can tell whether it missed a write
+    made by another worker in between.
+    """
+    if hook not in _commit_hooks:
+        _commit_hooks.append(hook)
+
+
+def invalidate_tags_after_commit(session, *tags):
+    """Bump `tags` once the session's current transaction commits; a rollback drops them."""
+    session.info.setdefault(_PENDING_TAGS_KEY, set()).update(tags)
+
+
+def _room_ids_touched(session):
+    """
+    Collect current and previous room_ids of map-affecting rows in this flush.
+    Returns (room_ids, asset_room_ids); the latter only for asset rows.
+    """
+    from .models import Ticket, Asset, RoomBooking, Timetable, AdHocBooking
+    tracked = (Ticket, Asset, RoomBooking, Timetable, AdHocBooking)
+
+    room_ids, asset_room_ids = set(), set()
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, tracked):
+            continue
+        state = inspect(obj)
+        # Read from the instance dict and history so no lazy load fires mid-flush
+        touched = {state.dict.get('room_id'), *state.attrs.room_id.history.deleted}
+        touched.discard(None)
+        room_ids.update(touched)
+        if isinstance(obj, Asset):
+            asset_room_ids.update(touched)
+    return room_ids, asset_room_ids
+
+
+def _structure_touched(session):
+    """Check whether buildings, floors or rooms themselves were written."""
+    from .models import Building, Floor, Room
+    return any(
+        isinstance(obj, (Building, Floor, Room))
+        for obj in itertools.chain(session.new, session.dirty, session.deleted)
+    )
+
+
+def _collect_floors_after_flush(session, flush_context):
+    if _structure_touched(session):
+        session.info.setdefault(_PENDING_TAGS_KEY, set()).add(MAP_TAG)
+
+    room_ids, asset_room_ids = _room_ids_touched(session)
+    if not room_ids:
+        return
+    if asset_room_ids:
+        session.info.setdefault(_PENDING_TAGS_KEY, set()).update(room_tag(room_id) for room_id in asset_room_ids)
+
+    from .models import Room
+    rows = session.connection().execute(
+        select(Room.floor_id).where(Room.id.in_(room_ids))
+    )
+    session.info.setdefault(_PENDING_FLOORS_KEY, set()).update(row.floor_id for row in rows)
+
+
+def _invalidate_floors_after_commit(session):
+    floor_ids = session.info.pop(_PENDING_FLOORS_KEY, None)
+    tags = session.info.pop(_PENDING_TAGS_KEY, None)
+    if not has_app_context():
+        return
+    if tags:
+        invalidate_tags(*tags)
+    bumped = {floor_id: _bump_generation(floor_tag(floor_id)) for floor_id in floor_ids or ()}
+    for hook in _commit_hooks:
+        hook(session, bumped)
+
+
+def _discard_pending_floors(session, transaction):
+    # Only the outermost transaction owns the pending set; a rollback drops it
+    if transaction.parent is None:
+        session.info.pop(_PENDING_FLOORS_KEY, None)
+        session.info.pop(_PENDING_TAGS_KEY, None)
+
+
+def register_invalidation_listeners():
+    """
+    Invalidate floor caches automatically once a commit touching tickets,
+    assets, bookings or timetables succeeds (plus room tags for assets and the
+    map tag for buildings/floors/rooms). Routes no longer call
+    invalidate_floor_cache() themselves.
+    """
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    from . import db
+    event.listen(db.session, 'after_flush', _collect_floors_after_flush)
+    event.listen(db.session, 'after_commit', _invalidate_floors_after_commit)
+    event.listen(db.session, 'after_transaction_end', _discard_pending_floors)
+    _listeners_registered = True
+
+
+def get_cached_floor_layout(floor_id):
+    """
+    Fetch and cache the layout/maintenance layer of a floor's rooms.
+    It holds no time-dependent data, so it is cached for a day and only
+    dropped when the floor's tag is invalidated.
+    """
+    def build():
+        from sqlalchemy.orm import joinedload
+        from .models import Room
+
+        rooms = Room.query.options(
+            joinedload(Room.status_record)
+        ).filter_by(floor_id=floor_id).all()
+
+        return [room.to_layout_dict() for room in rooms]
+
+    return cached_tagged(f'map_floor_{floor_id}', [MAP_TAG, floor_tag(floor_id)], build, timeout=LAYOUT_TIMEOUT)
+
+
+def get_cached_floor_info(floor_id):
+    """Fetch and cache a floor's own details for the admin floor payload (None if missing)."""
+    def build():
+        from . import db
+        from .models import Floor
+
+        floor = db.session.get(Floor, floor_id)
+        return {'floor': floor.to_dict() if floor else None}
+
+    return cached_tagged(f'admin_floor_{floor_id}', [MAP_TAG, floor_tag(floor_id)], build, timeout=LAYOUT_TIMEOUT)['floor']
+
 
 def get_cached_floor_data(floor_id):
     """
-    Fetch and cache room data for a floor to optimize rendering on both SSR and API.
-    Uses eager loading for relationships to prevent N+1 query problems.
-    """
-    cache_key = f'map_floor_{floor_id}'
-    cached_data = cache.get(cache_key)
-    
-    if cached_data is not None:
-        return cached_data
-        
-    from sqlalchemy.orm import joinedload
-    from .models import Room, RoomBooking, Timetable
-    
-    rooms = Room.query.options(
-        joinedload(Room.tickets),
-        joinedload(Room.assets),
-        joinedload(Room.room_bookings).joinedload(RoomBooking.faculty),
-        joinedload(Room.timetables).joinedload(Timetable.faculty)
-    ).filter_by(floor_id=floor_id).all()
-    
-    rooms_data = [room.to_map_dict() for room in rooms]
-    cache.set(cache_key, rooms_data, timeout=3600)  # Cache for 1 hour
-    
-    return rooms_data
+    Fetch room data for a floor to optimize rendering on both SSR and API.
+    Merges the cached layout layer with the occupancy layer for the current
+    time bucket, so occupancy stays correct across slot boundaries.
+    """
+    from .occupancy import get_floor_occupancy, merge_occupancy
+    return merge_occupancy(get_cached_floor_layout(floor_id), get_floor_occupancy(floor_id))
@@ -0,0 +1,90 @@
+"""
+In-process L1 Cache for FixLink.
+A small thread-safe LRU with a TTL that sits in front of the shared
+FileSystemCache (L2) for tagged entries. It only stores entries as they were
+read from or written to L2, and serves them only while their tag generations
+match. Those generations are remembered here too and re-read from L2 at most
+every `check_seconds`, so a hot entry costs no file I/O at all: invalidations
+made in this process are seen at once, those of other workers within
+`check_seconds`.
+
+Values are shared between requests in the process: callers must not mutate
+what they get back.
+"""
+import time
+import threading
+from collections import OrderedDict
+from .cache_stats import CacheStats
+
+DEFAULT_SIZE = 128
+DEFAULT_TTL = 60
+DEFAULT_CHECK_SECONDS = 1.0
+
+
+class LocalLRU:
+    """
+    Bounded LRU of key -> entry, each kept at most `ttl` seconds, plus the
+    tag generations those entries are checked against.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SIZE, ttl=DEFAULT_TTL, check_seconds=DEFAULT_CHECK_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.check_seconds = check_seconds
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, entry = item
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.record_set(key, None, 0.0, evicted)
+
+    def generation(self, tag, load, max_age=None):
+        """Generation of `tag` as last read with `load(tag)`, re-read once older than `max_age` (check_seconds)."""
+        max_age = self.check_seconds if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            known = self._generations.get(tag)
+        if known is not None and now - known[1] < max_age:
+            return known[0]
+        generation = load(tag)
+        with self._lock:
+            self._generations[tag] = (generation, now)
+        return generation
+
+    def note_generation(self, tag, generation):
+        """Record a generation this process just wrote, for tags L1 entries depend on."""
+        with self._lock:
+            if tag in self._generations:
+                self._generations[tag] = (generation, time.monotonic())
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def __len__(self):
+        return len(self._entries)
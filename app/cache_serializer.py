@@ -0,0 +1,118 @@
+"""
+Cache Serializer for FixLink.
+Pickle-free serializer for FileSystemCache entries: compact JSON, or msgpack
+when installed, zlib-compressed once a payload passes a size threshold.
+
+Every payload starts with a one-byte format marker:
+    b'J' JSON, b'M' msgpack, b'Z' + marker + zlib-compressed payload.
+Anything else (e.g. files pickled by an older deploy, which start with
+b'\\x80') is treated as a miss and never unpickled.
+
+Cached values must be plain data (dicts with string keys, lists, strings,
+numbers, booleans, None), plus datetimes and dates, which are stored as
+tagged ISO strings and read back as the same objects. In strict mode
+(CACHE_STRICT_SERIALIZER, on under TESTING/DEBUG) a value that cannot be
+encoded, or does not read back equal (int dict keys, tuples), raises from
+cache.set; otherwise it is logged and stored empty so it reads back as a
+miss.
+"""
+import json
+import zlib
+import logging
+from datetime import date, datetime
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = b'J'
+MSGPACK = b'M'
+COMPRESSED = b'Z'
+
+# Payloads at least this large (bytes) are zlib-compressed
+DEFAULT_COMPRESS_THRESHOLD = 2048
+COMPRESS_LEVEL = 6
+
+# Single-key dicts standing for a datetime / date
+DATETIME_TAG = '__datetime__'
+DATE_TAG = '__date__'
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return {DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {DATE_TAG: value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not plain data")
+
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        if DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[DATETIME_TAG])
+        if DATE_TAG in obj:
+            return date.fromisoformat(obj[DATE_TAG])
+    return obj
+
+
+class CacheSerializer:
+    """Drop-in replacement for cachelib's FileSystemSerializer (dump/load on streams)."""
+
+    def __init__(self, fmt=None, compress_threshold=DEFAULT_COMPRESS_THRESHOLD, strict=False):
+        if fmt is None:
+            fmt = 'msgpack' if msgpack else 'json'
+        if fmt == 'msgpack' and msgpack is None:
+            logger.warning("msgpack is not installed; cache falls back to JSON.")
+            fmt = 'json'
+        if fmt not in ('json', 'msgpack'):
+            raise ValueError(f"Unknown cache serializer format: {fmt}")
+        self.fmt = fmt
+        self.compress_threshold = compress_threshold
+        self.strict = strict
+
+    def _encode(self, value):
+        if self.fmt == 'msgpack':
+            return MSGPACK + msgpack.packb(value, use_bin_type=True, default=_encode_default)
+        text = json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_encode_default)
+        return JSON + text.encode('utf-8')
+
+    def _decode(self, marker, body):
+        if marker == JSON:
+            return json.loads(body, object_hook=_decode_object)
+        if marker == MSGPACK and msgpack is not None:
+            return msgpack.unpackb(body, raw=False, strict_map_key=False, object_hook=_decode_object)
+        return None
+
+    def dumps(self, value):
+        payload = self._encode(value)
+        if self.strict and self._decode(payload[:1], payload[1:]) != value:
+            raise TypeError("value does not read back equal; use string dict keys and lists, not tuples")
+        if self.compress_threshold and len(payload) >= self.compress_threshold:
+            payload = COMPRESSED + payload[:1] + zlib.compress(payload[1:], COMPRESS_LEVEL)
+        return payload
+
+    def loads(self, data):
+        if not data:
+            return None
+        marker, body = data[:1], data[1:]
+        if marker == COMPRESSED:
+            marker, body = body[:1], zlib.decompress(body[1:])
+        return self._decode(marker, body)
+
+    def dump(self, value, f):
+        try:
+            f.write(self.dumps(value))
+        except (TypeError, ValueError, OverflowError) as e:
+            if self.strict:
+                raise
+            logger.warning(f"Value not cached, it is not plain data: {e}")
+
+    def load(self, f):
+        try:
+            return self.loads(f.read())
+        except (ValueError, zlib.error) as e:
+            logger.warning(f"Unreadable cache entry ignored: {e}")
+            return None
@@ -0,0 +1,174 @@
+"""
+Cache Instrumentation for FixLink.
+Wraps the Flask-Caching backend to count hits, misses, sets, evictions,
+serialized entry sizes and get/set latency per key prefix, so the cache
+threshold and TTLs can be sized from data.
+
+Counters are per process; each gunicorn worker reports its own.
+"""
+import os
+import re
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 'map_floor_4' -> 'map_floor_', 'tag_gen_floor:4' -> 'tag_gen_floor'
+_PREFIX_RE = re.compile(r'[^\d:]*')
+
+
+def key_prefix(key):
+    """Group a cache key by its leading non-id part."""
+    return _PREFIX_RE.match(key).group() or key
+
+
+class CacheStats:
+    """Thread-safe counters per key prefix."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.prefixes = {}
+        self.evictions = 0
+
+    def _bucket(self, prefix):
+        return self.prefixes.setdefault(prefix, {
+            'hits': 0, 'misses': 0, 'sets': 0, 'deletes': 0,
+            'bytes_total': 0, 'bytes_max': 0,
+            'get_ms_total': 0.0, 'get_ms_max': 0.0,
+            'set_ms_total': 0.0, 'set_ms_max': 0.0,
+        })
+
+    def record_get(self, key, hit, elapsed_ms):
+        with self._lock:
+            bucket = self._bucket(key_prefix(key))
+            bucket['hits' if hit else 'misses'] += 1
+            bucket['get_ms_total'] += elapsed_ms
+            bucket['get_ms_max'] = max(bucket['get_ms_max'], elapsed_ms)
+
+    def record_set(self, key, size, elapsed_ms, evicted=0):
+        with self._lock:
+            bucket = self._bucket(key_prefix(key))
+            bucket['sets'] += 1
+            if size is not None:
+                bucket['bytes_total'] += size
+                bucket['bytes_max'] = max(bucket['bytes_max'], size)
+            bucket['set_ms_total'] += elapsed_ms
+            bucket['set_ms_max'] = max(bucket['set_ms_max'], elapsed_ms)
+            # Pruning removes whichever entries expire first, so evictions are global
+            self.evictions += evicted
+
+    def record_delete(self, key):
+        with self._lock:
+            self._bucket(key_prefix(key))['deletes'] += 1
+
+    def snapshot(self):
+        """Return the counters plus derived ratios and averages."""
+        with self._lock:
+            prefixes = {}
+            for prefix, bucket in self.prefixes.items():
+                gets = bucket['hits'] + bucket['misses']
+                prefixes[prefix] = {
+                    'hits': bucket['hits'],
+                    'misses': bucket['misses'],
+                    'hit_ratio': round(bucket['hits'] / gets, 4) if gets else None,
+                    'sets': bucket['sets'],
+                    'deletes': bucket['deletes'],
+                    'avg_bytes': round(bucket['bytes_total'] / bucket['sets']) if bucket['sets'] else None,
+                    'max_bytes': bucket['bytes_max'],
+                    'avg_get_ms': round(bucket['get_ms_total'] / gets, 3) if gets else None,
+                    'max_get_ms': round(bucket['get_ms_max'], 3),
+                    'avg_set_ms': round(bucket['set_ms_total'] / bucket['sets'], 3) if bucket['sets'] else None,
+                    'max_set_ms': round(bucket['set_ms_max'], 3),
+                }
+            hits = sum(p['hits'] for p in prefixes.values())
+            gets = hits + sum(p['misses'] for p in prefixes.values())
+            return {
+                'pid': os.getpid(),
+                'uptime_seconds': round(time.time() - self.started_at),
+                'hit_ratio': round(hits / gets, 4) if gets else None,
+                'evictions': self.evictions,
+                'prefixes': prefixes,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.prefixes = {}
+            self.evictions = 0
+
+
+class InstrumentedCache:
+    """
+    Proxy around a cache backend that records stats for get/set/add/delete
+    and delegates everything else. Optionally logs a summary line every
+    `log_interval` seconds.
+    """
+
+    def __init__(self, backend, stats=None, log_interval=None):
+        self.backend = backend
+        self.stats = stats or CacheStats()
+        self.log_interval = log_interval
+        self._logged_at = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def _entry_size(self, key):
+        get_filename = getattr(self.backend, '_get_filename', None)
+        if get_filename is None:
+            return None
+        try:
+            return os.path.getsize(get_filename(key))
+        except OSError:
+            return None
+
+    def _backend_file_count(self):
+        return getattr(self.backend, '_file_count', None)
+
+    def _maybe_log(self):
+        if not self.log_interval or time.monotonic() - self._logged_at < self.log_interval:
+            return
+        self._logged_at = time.monotonic()
+        snapshot = self.stats.snapshot()
+        summary = ', '.join(
+            f"{prefix} {p['hits']}/{p['hits'] + p['misses']} hits {p['sets']} sets"
+            for prefix, p in sorted(snapshot['prefixes'].items())
+        )
+        logger.info(f"Cache stats (pid {snapshot['pid']}): hit_ratio={snapshot['hit_ratio']} "
+                    f"evictions={snapshot['evictions']} | {summary}")
+
+    def get(self, key):
+        start = time.perf_counter()
+        value = self.backend.get(key)
+        self.stats.record_get(key, value is not None, (time.perf_counter() - start) * 1000)
+        self._maybe_log()
+        return value
+
+    def _write(self, method, key, value, timeout):
+        count_before = self._backend_file_count()
+        start = time.perf_counter()
+        result = getattr(self.backend, method)(key, value, timeout=timeout)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Only a write to a cache over its threshold prunes, and pruning stops
+        # at the threshold, so a count still above it means a new key was added
+        evicted = 0
+        threshold = getattr(self.backend, '_threshold', 0)
+        if count_before is not None and threshold and count_before > threshold:
+            count_after = self._backend_file_count()
+            evicted = max(0, count_before - count_after + (1 if count_after > threshold else 0))
+        self.stats.record_set(key, self._entry_size(key), elapsed_ms, evicted)
+        self._maybe_log()
+        return result
+
+    def set(self, key, value, timeout=None):
+        return self._write('set', key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        return self._write('add', key, value, timeout)
+
+    def delete(self, key):
+        self.stats.record_delete(key)
+        return self.backend.delete(key)
@@ -26,6 +26,15 @@ def init_db(app):
         
         # 1. Create all tables
         db.create_all()
+
+        # 1b. Fill room_status / professional_stats / asset_health / ticket_daily_rollup
+        #     for databases created before they existed
+        from .materialized import ensure_materialized_tables
+        ensure_materialized_tables()
+
+        # 1c. Full-text search indexes for databases created before they existed
+        from .search import ensure_search_index
+        ensure_search_index()
         
         # 2. Default admin user from environment variables
         from .models import User
@@ -0,0 +1,92 @@
+"""
+Date Buckets for FixLink.
+SQL expressions labelling the day, ISO week or month a date/datetime
+column falls in, so trends are grouped in the database on both backends:
+
+    daily    '2026-10-17'
+    weekly   '2026-W42'   (ISO 8601 year and week, Monday first)
+    monthly  '2026-10'
+
+PostgreSQL renders to_char() (YYYY-MM-DD / IYYY-"W"IW / YYYY-MM). SQLite
+renders strftime(); it has no %G/%V before 3.46, so the ISO week is taken
+from the Thursday of the date's week, whose year is the ISO year.
+
+    bucket = date_bucket(Ticket.created_at, 'weekly').label('label')
+    db.session.query(bucket, func.count()).group_by(bucket).order_by(bucket)
+"""
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+PERIODS = ('daily', 'weekly', 'monthly')
+
+
+class _DateBucket(FunctionElement):
+    type = String()
+    inherit_cache = True
+
+
+class day_bucket(_DateBucket):
+    name = 'day_bucket'
+    inherit_cache = True
+
+
+class week_bucket(_DateBucket):
+    name = 'week_bucket'
+    inherit_cache = True
+
+
+class month_bucket(_DateBucket):
+    name = 'month_bucket'
+    inherit_cache = True
+
+
+_BUCKETS = {'daily': day_bucket, 'weekly': week_bucket, 'monthly': month_bucket}
+
+
+def date_bucket(column, period):
+    """Label expression of `column`'s bucket for `period` (anything unknown buckets monthly)."""
+    return _BUCKETS.get(period, month_bucket)(column)
+
+
+def _column(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+# ==================== POSTGRESQL (default) ====================
+
+@compiles(day_bucket)
+def _to_char_day(element, compiler, **kw):
+    return f"to_char({_column(element, compiler, **kw)}, 'YYYY-MM-DD')"
+
+
+@compiles(week_bucket)
+def _to_char_week(element, compiler, **kw):
+    return f"""to_char({_column(element, compiler, **kw)}, 'IYYY-"W"IW')"""
+
+
+@compiles(month_bucket)
+def _to_char_month(element, compiler, **kw):
+    return f"to_char({_column(element, compiler, **kw)}, 'YYYY-MM')"
+
+
+# ==================== SQLITE ====================
+
+@compiles(day_bucket, 'sqlite')
+def _strftime_day(element, compiler, **kw):
+    return f"strftime('%Y-%m-%d', {_column(element, compiler, **kw)})"
+
+
+@compiles(week_bucket, 'sqlite')
+def _strftime_week(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+    # Days since Monday (%w counts from Sunday), then the Thursday of that week
+    weekday = f"((CAST(strftime('%w', {column}) AS INTEGER) + 6) % 7)"
+    thursday = f"date({column}, (3 - {weekday}) || ' days')"
+    return (f"printf('%s-W%02d', strftime('%Y', {thursday}), "
+            f"(CAST(strftime('%j', {thursday}) AS INTEGER) - 1) / 7 + 1)")
+
+
+@compiles(month_bucket, 'sqlite')
+def _strftime_month(element, compiler, **kw):
+    return f"strftime('%Y-%m', {_column(element, compiler, **kw)})"
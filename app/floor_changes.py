@@ -0,0 +1,112 @@
+"""
+Floor Change Log for FixLink.
+Gives every floor snapshot a version and keeps, per floor, a bounded ring of
+which rooms changed between consecutive versions, so live map clients can
+fetch only the rooms that changed since the version they hold.
+
+Versions come from cache.floor_data_version() and are shared by all workers.
+The ring is per process and built by diffing the snapshots this process
+serves; a client whose version is not in the ring gets a full snapshot.
+"""
+import threading
+from collections import deque
+from flask import current_app, g
+from .cache import floor_data_version, get_cached_floor_data
+
+DEFAULT_RING_SIZE = 64
+
+
+class FloorChangeLog:
+    """Latest snapshot and recent room-level deltas for each floor."""
+
+    def __init__(self, ring_size=DEFAULT_RING_SIZE):
+        self.ring_size = ring_size
+        self._floors = {}
+        self._lock = threading.Lock()
+
+    def record(self, floor_id, version, rooms):
+        """Diff a snapshot against the previous one for the floor and log the change."""
+        by_id = {room['id']: room for room in rooms}
+        with self._lock:
+            state = self._floors.get(floor_id)
+            if state is None:
+                self._floors[floor_id] = {'version': version, 'rooms': by_id, 'ring': deque(maxlen=self.ring_size)}
+                return
+            if version <= state['version']:
+                return
+
+            previous = state['rooms']
+            changed = {room_id for room_id, room in by_id.items() if previous.get(room_id) != room}
+            removed = set(previous) - set(by_id)
+            state['ring'].append((state['version'], version, changed, removed))
+            state['version'] = version
+            state['rooms'] = by_id
+
+    def changes_since(self, floor_id, since, version):
+        """
+        Return (changed_ids, removed_ids) between `since` and `version`, or
+        None unless `version` is the latest recorded one and the ring still
+        reaches back to `since`.
+        """
+        with self._lock:
+            state = self._floors.get(floor_id)
+            if state is None or state['version'] != version:
+                return None
+            if since == state['version']:
+                return set(), set()
+
+            changed, removed, found = set(), set(), False
+            for from_version, to_version, step_changed, step_removed in state['ring']:
+                if from_version == since:
+                    found = True
+                if found:
+                    changed = (changed | step_changed) - step_removed
+                    removed = (removed - step_changed) | step_removed
+            return (changed, removed) if found else None
+
+
+def get_floor_change_log():
+    """Return the change log of the current app, creating it on first use."""
+    app = current_app._get_current_object()
+    log = app.extensions.get('fixlink_floor_changes')
+    if log is None:
+        ring_size = app.config.get('FLOOR_CHANGE_RING_SIZE', DEFAULT_RING_SIZE)
+        log = app.extensions.setdefault('fixlink_floor_changes', FloorChangeLog(ring_size))
+    return log
+
+
+def get_floor_snapshot(floor_id):
+    """
+    Return (version, rooms) for a floor and log it in the change ring.
+    A version never labels rooms from a different state: if it moved while
+    the rooms were built, or a stale cached layout was served, the snapshot
+    is not logged and its version is None so the client asks for a full one.
+    """
+    version = floor_data_version(floor_id)
+    rooms = get_cached_floor_data(floor_id)
+    if g.get('cache_served_stale') or floor_data_version(floor_id) != version:
+        return None, rooms
+    get_floor_change_log().record(floor_id, version, rooms)
+    return version, rooms
+
+
+def get_floor_changes(floor_id, since):
+    """
+    Return the rooms changed since version `since` as
+    {'version', 'full', 'rooms', 'removed'}; `full` marks a complete snapshot
+    sent because the change ring no longer covers `since`.
+    """
+    version, rooms = get_floor_snapshot(floor_id)
+    delta = None
+    if since is not None and version is not None:
+        delta = get_floor_change_log().changes_since(floor_id, since, version)
+    if delta is None:
+        return {'version': version, 'full': True, 'rooms': rooms, 'removed': []}
+
+    changed, removed = delta
+    return {
+        'version': version,
+        'full': False,
+        'rooms': [room for room in rooms if room['id'] in changed],
+        'removed': sorted(removed),
+    }
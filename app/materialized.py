@@ -0,0 +1,296 @@
+"""
+Materialized Tables for FixLink.
+Shared upkeep of the tables that hold counts derived from tickets and assets
+(room_status, professional_stats, asset_health, ticket_daily_rollup). Each
+table module describes its table with a MaterializedTable and supplies only
+what is specific to it:
+
+- recount(connection): {key: {column: value}} for every row, recomputed
+  from the source rows
+- apply(session, connection): writes one flush's changes to the table, as
+  `counter = counter + n` on the flush's own connection so they commit or
+  roll back with the write; returns the keys whose rows it wrote
+
+MaterializedTable does the rest: loading what apply reads from deleted rows
+before the flush, calling apply after it, expiring ORM copies of the rows it
+wrote, and the check (with repair), rebuild and ensure passes. A key is the
+row's primary key value, a tuple for composite keys.
+
+Bulk Query.update()/delete() on the source tables bypass the session and
+must be followed by a rebuild (scripts/tools/rebuild_table.py).
+"""
+import math
+import logging
+import importlib
+from datetime import datetime
+from sqlalchemy import delete, event, insert, inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+# Modules defining a MaterializedTable; importing one registers its table
+TABLE_MODULES = ('room_status', 'professional_stats', 'asset_health', 'ticket_rollup')
+
+_tables = {}
+
+
+def committed_value(state, key):
+    """Value of `key` as last flushed (the replaced value when it was changed)."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.dict.get(key)
+
+
+def conflict_insert(connection, table):
+    """INSERT on `table` supporting ON CONFLICT (PostgreSQL, SQLite), or None on other backends."""
+    dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(connection.dialect.name)
+    return dialect.insert(table) if dialect else None
+
+
+def _model(name):
+    from . import models
+    return getattr(models, name)
+
+
+def _close(expected, actual):
+    # Float sums drift with rounding
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-3)
+    return expected == actual
+
+
+def _sort_key(key):
+    return tuple((value is not None, value) for value in (key if isinstance(key, tuple) else (key,)))
+
+
+class MaterializedTable:
+    """
+    A table kept in step with its source rows.
+
+    `model` and the model names in `source`, `load` and `expire` are
+    resolved on use, so defining a table does not import models.py.
+    `columns` are the columns check() compares; `load` maps model names to
+    the attributes apply reads from deleted rows; `expire` lists (model
+    name, attributes) sharing the table's key whose ORM copies are refreshed
+    after a flush; `written(session, connection, keys)` runs after
+    check(repair=True) or rebuild() rewrote rows (keys is None for the whole
+    table). With `zero_rows`, a row whose columns are all zero counts
+    as no row at all. Tables with columns that move with the clock supply
+    `decay(max_age_hours)`, which rescores rows older than that.
+    """
+
+    def __init__(self, name, model, source, columns, recount, apply, load=None, expire=(),
+                 written=None, stamp='updated_at', zero_rows=False, decay=None):
+        self.name = name
+        self.model_name = model
+        self.source = source
+        self.columns = tuple(columns)
+        self.recount = recount
+        self.apply = apply
+        self.load = load or {}
+        self.expire = tuple(expire)
+        self.written = written
+        self.stamp = stamp
+        self.zero_rows = zero_rows
+        self.decay = decay
+        # session.info key holding the keys whose rows changed in a flush
+        self._touched_key = f'fixlink_{name}_touched'
+        self._registered = False
+        _tables[name] = self
+
+    @property
+    def model(self):
+        return _model(self.model_name)
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    def _key_columns(self):
+        return list(self.table.primary_key.columns)
+
+    def key_values(self, key):
+        """{column: value} of a key."""
+        names = [column.name for column in self._key_columns()]
+        return dict(zip(names, key if len(names) > 1 else (key,)))
+
+    def _key_of(self, row):
+        values = tuple(row._mapping[column.name] for column in self._key_columns())
+        return values if len(values) > 1 else values[0]
+
+    def _where_keys(self, keys):
+        columns = self._key_columns()
+        if len(columns) > 1:
+            return tuple_(*columns).in_(list(keys))
+        return columns[0].in_(list(keys))
+
+    def row(self, key, values, now):
+        """Insertable row of `key` with its recounted `values`."""
+        return {self.stamp: now, **self.key_values(key), **values}
+
+    def insert_row(self, connection, row):
+        """Insert `row` unless its key already has one; returns whether it was inserted."""
+        statement = conflict_insert(connection, self.table)
+        if statement is None:
+            connection.execute(insert(self.table), [row])
+            return True
+        keys = [column.name for column in self._key_columns()]
+        return connection.execute(statement.values(**row).on_conflict_do_nothing(index_elements=keys)).rowcount > 0
+
+    def write_deltas(self, connection, deltas, update, recount, missing=(), now=None):
+        """
+        Apply {key: delta} with `update(key, delta)`, which returns the number
+        of rows it changed. Keys without a row, and those in `missing`, get
+        one from `recount(keys)`. If another transaction inserts such a row
+        first, this delta is applied to that row instead: its recount could
+        not see this flush.
+        """
+        now = now or datetime.utcnow()
+        missing = set(missing)
+        for key, delta in deltas.items():
+            if key not in missing and not update(key, delta):
+                missing.add(key)
+        if not missing:
+            return
+
+        # The recount runs on this connection, so it already sees this flush
+        counts = recount(missing)
+        for key in missing:
+            if key in counts and not self.insert_row(connection, self.row(key, counts[key], now)) and key in deltas:
+                update(key, deltas[key])
+
+    def insert_rows(self, connection, counts, now=None):
+        """Insert the recounted {key: values} `counts`."""
+        now = now or datetime.utcnow()
+        if counts:
+            connection.execute(insert(self.table), [self.row(key, values, now) for key, values in counts.items()])
+
+    # ==================== TRANSACTIONAL MAINTENANCE ====================
+
+    def _load_before_flush(self, session, flush_context, instances):
+        # Deleted rows may have been expired by an earlier commit; load what apply reads
+        loads = [(_model(name), fields) for name, fields in self.load.items()]
+        for obj in session.deleted:
+            for model, fields in loads:
+                if isinstance(obj, model):
+                    for field in fields:
+                        getattr(obj, field)
+
+    def _apply_after_flush(self, session, flush_context):
+        keys = self.apply(session, session.connection())
+        if keys:
+            session.info.setdefault(self._touched_key, set()).update(keys)
+
+    def _expire_after_flush(self, session, flush_context):
+        # The table was written with Core; refresh any copies already in the session
+        keys = session.info.pop(self._touched_key, None)
+        if not keys:
+            return
+
+        for model, attributes in ((self.model, None), *((_model(name), attrs) for name, attrs in self.expire)):
+            mapper = inspect(model)
+            for key in keys:
+                identity = mapper.identity_key_from_primary_key(key if isinstance(key, tuple) else (key,))
+                obj = session.identity_map.get(identity)
+                if obj is not None:
+                    session.expire(obj, attributes)
+
+    def register(self):
+        """Keep the table in step with every flush of the session."""
+        if self._registered:
+            return
+
+        from . import db
+        event.listen(db.session, 'before_flush', self._load_before_flush)
+        event.listen(db.session, 'after_flush', self._apply_after_flush)
+        event.listen(db.session, 'after_flush_postexec', self._expire_after_flush)
+        self._registered = True
+
+    # ==================== CONSISTENCY CHECKS ====================
+
+    def _same(self, expected, actual):
+        if self.zero_rows:
+            expected = expected or dict.fromkeys(self.columns, 0)
+            actual = actual or dict.fromkeys(self.columns, 0)
+        if expected is None or actual is None:
+            return expected is actual
+        return all(_close(expected[column], actual[column]) for column in self.columns)
+
+    def check(self, repair=False):
+        """
+        Recount every row from the source tables and compare it with the table.
+        Returns [{'key', 'expected', 'actual'}] for rows that differ (either
+        side None when the row is missing or orphaned). With repair=True the
+        differing rows are rewritten and committed.
+        """
+        from . import db
+
+        connection = db.session.connection()
+        counts = self.recount(connection)
+        expected = {key: {column: values[column] for column in self.columns} for key, values in counts.items()}
+        actual = {
+            self._key_of(row): {column: row._mapping[column] for column in self.columns}
+            for row in connection.execute(select(self.table))
+        }
+
+        mismatches = [
+            {'key': key, 'expected': expected.get(key), 'actual': actual.get(key)}
+            for key in sorted(set(expected) | set(actual), key=_sort_key)
+            if not self._same(expected.get(key), actual.get(key))
+        ]
+        if repair and mismatches:
+            keys = [m['key'] for m in mismatches]
+            connection.execute(delete(self.table).where(self._where_keys(keys)))
+            self.insert_rows(connection, {key: counts[key] for key in keys if key in counts})
+            if self.written:
+                self.written(db.session, connection, keys)
+            db.session.commit()
+            logger.warning(f"Repaired {self.name} for {len(mismatches)} rows.")
+        return mismatches
+
+    def rebuild(self):
+        """Rebuild the whole table from the source tables; returns the number of rows."""
+        from . import db
+
+        connection = db.session.connection()
+        counts = self.recount(connection)
+        connection.execute(delete(self.table))
+        self.insert_rows(connection, counts)
+        if self.written:
+            self.written(db.session, connection, None)
+        db.session.commit()
+        return len(counts)
+
+    def ensure(self):
+        """Backfill the table for a database that has source rows but no table rows yet."""
+        from . import db
+
+        if db.session.execute(select(self.table).limit(1)).first() is not None:
+            return 0
+        if db.session.execute(select(_model(self.source).id).limit(1)).first() is None:
+            return 0
+        rebuilt = self.rebuild()
+        logger.info(f"{self.name} backfilled with {rebuilt} rows.")
+        return rebuilt
+
+
+def tables():
+    """{name: MaterializedTable} for every materialized table."""
+    for module in TABLE_MODULES:
+        importlib.import_module(f'.{module}', __package__)
+    return dict(_tables)
+
+
+def register_materialized_listeners():
+    """Keep every materialized table in step with writes."""
+    for table in tables().values():
+        table.register()
+
+
+def ensure_materialized_tables():
+    """Backfill the materialized tables of a database created before they existed."""
+    for table in tables().values():
+        table.ensure()
@@ -28,6 +28,10 @@ class User(db.Model):
     profile_photo = db.Column(db.String(255), nullable=True)  # uploaded avatar filename
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_user_created_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     tickets = db.relationship('Ticket', backref='reporter', lazy=True)
     
@@ -142,6 +146,8 @@ class Room(db.Model):
     adhoc_bookings = db.relationship('AdHocBooking', backref='room', lazy=True, cascade='all, delete-orphan')
     timetables = db.relationship('Timetable', backref='room', lazy=True, cascade='all, delete-orphan')
     room_bookings = db.relationship('RoomBooking', backref='room', lazy=True, cascade='all, delete-orphan')
+    # Written by room_status.py with Core statements, never through the ORM
+    status_record = db.relationship('RoomStatus', uselist=False, lazy=True, viewonly=True)
     
     def __repr__(self):
         return f'<Room {self.number}>'
@@ -163,83 +169,29 @@ class Room(db.Model):
     
     @property
     def has_open_tickets(self):
-        """Check if room has any OPEN tickets (Red status) using efficient DB query."""
-        return Ticket.query.filter_by(room_id=self.id, status=Ticket.STATUS_OPEN).first() is not None
+        """Check if room has any OPEN tickets (Red status) from the room_status table."""
+        return bool(self.status_record and self.status_record.open_count)
     
     @property
     def has_in_progress_tickets(self):
-        """Check if room has any IN_PROGRESS tickets (Yellow status) using efficient DB query."""
-        return Ticket.query.filter_by(room_id=self.id, status=Ticket.STATUS_IN_PROGRESS).first() is not None
+        """Check if room has any IN_PROGRESS tickets (Yellow status) from the room_status table."""
+        return bool(self.status_record and self.status_record.in_progress_count)
     
     @property
     def has_broken_assets(self):
-        """Check if room has any broken assets using efficient DB query."""
-        return Asset.query.filter_by(room_id=self.id, status=Asset.STATUS_BROKEN).first() is not None
+        """Check if room has any broken assets from the room_status table."""
+        return bool(self.status_record and self.status_record.broken_asset_count)
 
     @property
     def has_assigned_tickets(self):
-        """Check if room has any ASSIGNED tickets (Blue status) using efficient DB query."""
-        return Ticket.query.filter_by(room_id=self.id, status=Ticket.STATUS_ASSIGNED).first() is not None
+        """Check if room has any ASSIGNED tickets (Blue status) from the room_status table."""
+        return bool(self.status_record and self.status_record.assigned_count)
     
     @property
     def current_occupancy_status(self):
         """Returns complex dict with Room status based on timetable and bookings."""
-        from datetime import datetime, timedelta
-        from flask import session
-        
-        user_id = session.get('user_id')
-        now_utc = datetime.utcnow()
-        current_hour_start = now_utc.replace(minute=0, second=0, microsecond=0)
-        
-        # 1. Check active RoomBooking (Specific slot)
-        active_booking = None
-        for booking in self.room_bookings:
-            if booking.status == 'active' and booking.slot_start == current_hour_start:
-                active_booking = booking
-                break
-                
-        if active_booking:
-            return {
-                'status': 'occupied',
-                'id': active_booking.id,
-                'type': 'booking',
-                'subject': active_booking.subject,
-                'faculty': active_booking.faculty.name if active_booking.faculty else 'Faculty',
-                'faculty_id': active_booking.faculty_id,
-                # NOTE: is_owner is intentionally omitted here.
-                # It is session-dependent and must be computed client-side
-                # to prevent cache poisoning across users.
-                'end_time': (active_booking.slot_start + timedelta(hours=6, minutes=30)).strftime('%I:%M %p') # +1h from start, +5:30 for IST
-            }
-            
-        # 2. Check Timetable (Recurring schedule)
-        now_ist = datetime.utcnow() + timedelta(hours=5, minutes=30)
-        current_day = now_ist.weekday()
-        current_time = now_ist.time().replace(minute=0, second=0, microsecond=0)
-        
-        active_timetable = None
-        for tt in self.timetables:
-            if tt.day_of_week == current_day:
-                # Check if current time is within [start_time, end_time)
-                if tt.start_time <= current_time < tt.end_time:
-                    active_timetable = tt
-                    break
-                
-        if active_timetable:
-            return {
-                'status': 'occupied',
-                'id': active_timetable.id,
-                'type': 'scheduled',
-                'subject': active_timetable.subject,
-                'faculty': active_timetable.faculty.name if active_timetable.faculty else 'Faculty',
-                'faculty_id': active_timetable.faculty_id,
-                # NOTE: is_owner is intentionally omitted here.
-                # It is session-dependent and must be computed client-side
-                # to prevent cache poisoning across users.
-                'end_time': (datetime.combine(now_ist.date(), active_timetable.end_time)).strftime('%I:%M %p')
-            }
-            
-        return {'status': 'vacant'}
+        from .occupancy import get_occupancy_index
+        return get_occupancy_index().room_status(self.floor_id, self.id)
         
     @property
     def time_until_next_lecture(self):
@@ -249,18 +201,16 @@ class Room(db.Model):
             return None
             
         from datetime import datetime, timedelta
-        current_dt = datetime.utcnow() + timedelta(hours=5, minutes=30)
-        current_time = current_dt.time()
-        current_day = current_dt.weekday()
+        from .occupancy import get_occupancy_index
+        now_utc = datetime.utcnow()
+        current_dt = now_utc + timedelta(hours=5, minutes=30)
         
-        # Look for the next timetable entry TODAY
-        todays_schedules = [tt for tt in self.timetables if tt.day_of_week == current_day and tt.start_time > current_time]
-        todays_schedules.sort(key=lambda tt: tt.start_time)
+        # Next timetable slot TODAY, from the occupancy index
+        next_start = get_occupancy_index().next_lecture_start(self.floor_id, self.id, now_utc)
         
-        if todays_schedules:
-            next_sched = todays_schedules[0]
+        if next_start:
             # calculate delta
-            next_dt = datetime.combine(current_dt.date(), next_sched.start_time)
+            next_dt = datetime.combine(current_dt.date(), next_start)
             diff = next_dt - current_dt
             minutes = int(diff.total_seconds() / 60)
             if minutes > 60:
@@ -274,36 +224,25 @@ class Room(db.Model):
     @property
     def status(self):
         """
-        Return room maintenance status using eager loaded collections to avoid N+1 queries.
+        Return room maintenance status from the materialized room_status row.
         - 'issue': Has OPEN tickets or broken assets (Red)
         - 'in-progress': Has IN_PROGRESS tickets (Yellow)
         - 'assigned': Has ASSIGNED tickets but NO open/in-progress (Blue)
         - 'normal': No open, in-progress or assigned tickets (Green)
         """
-        return self.compute_status_from_loaded()[0]
+        return self.status_record.status if self.status_record else RoomStatus.STATUS_NORMAL
 
     def compute_status_from_loaded(self):
         """
-        Compute room status from eagerly-loaded relationships.
-        Avoids N+1 queries by reading from already-loaded collections.
+        Return (status, has_open, has_broken) from the room_status row.
+        Eager-load Room.status_record when serializing many rooms.
         """
-        has_open = any(t.status == Ticket.STATUS_OPEN for t in self.tickets)
-        has_broken = any(a.status == Asset.STATUS_BROKEN for a in self.assets)
-        has_in_progress = any(t.status == Ticket.STATUS_IN_PROGRESS for t in self.tickets)
-        has_assigned = any(t.status == Ticket.STATUS_ASSIGNED for t in self.tickets)
-        
-        if has_open or has_broken:
-            return 'issue', has_open, has_broken
-        elif has_in_progress:
-            return 'in-progress', has_open, has_broken
-        elif has_assigned:
-            return 'assigned', has_open, has_broken
-        return 'normal', has_open, has_broken
+        return self.status, self.has_open_tickets, self.has_broken_assets
 
-    def to_map_dict(self):
+    def to_layout_dict(self):
         """
-        Slim serialization for map rendering.
-        MUST be called after eager-loading tickets and assets.
+        Long-lived layout/maintenance layer of the map (no time-dependent data).
+        MUST be called after eager-loading status_record.
         """
         status, has_open, has_broken = self.compute_status_from_loaded()
         return {
@@ -315,7 +254,87 @@ class Room(db.Model):
             'status': status,
             'has_open_tickets': has_open,
             'has_broken_assets': has_broken,
-            'occupancy': self.current_occupancy_status
+        }
+
+    def to_map_dict(self):
+        """
+        Slim serialization for map rendering.
+        MUST be called after eager-loading status_record.
+        """
+        return {**self.to_layout_dict(), 'occupancy': self.current_occupancy_status}
+
+
+class RoomStatus(db.Model):
+    """
+    Materialized maintenance status of a room: active ticket counts, broken
+    asset count and the derived map colour. Kept up to date in the same
+    transaction as every ticket/asset write by room_status.py.
+    """
+    __tablename__ = 'room_status'
+    
+    STATUS_ISSUE = 'issue'
+    STATUS_IN_PROGRESS = 'in-progress'
+    STATUS_ASSIGNED = 'assigned'
+    STATUS_NORMAL = 'normal'
+    
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='CASCADE'), primary_key=True)
+    open_count = db.Column(db.Integer, default=0, nullable=False)
+    assigned_count = db.Column(db.Integer, default=0, nullable=False)
+    in_progress_count = db.Column(db.Integer, default=0, nullable=False)
+    broken_asset_count = db.Column(db.Integer, default=0, nullable=False)
+    status = db.Column(db.String(20), default=STATUS_NORMAL, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RoomStatus {self.room_id} ({self.status})>'
+    
+    def to_dict(self):
+        return {
+            'room_id': self.room_id,
+            'open_count': self.open_count,
+            'assigned_count': self.assigned_count,
+            'in_progress_count': self.in_progress_count,
+            'broken_asset_count': self.broken_asset_count,
+            'status': self.status,
+            'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None
+        }
+
+
+class AssetHealth(db.Model):
+    """
+    Persisted health score of an asset and the terms it is made of, kept up
+    to date by asset_health.py on every ticket/asset write and by its daily
+    decay pass for the clock-dependent terms.
+    """
+    __tablename__ = 'asset_health'
+    
+    asset_id = db.Column(db.Integer, db.ForeignKey('assets.id', ondelete='CASCADE'), primary_key=True)
+    depreciation = db.Column(db.Float, default=0, nullable=False)
+    status_penalty = db.Column(db.Integer, default=0, nullable=False)
+    # Tickets created in the last HEALTH_WINDOW_DAYS and their repair/complexity penalty
+    recent_ticket_count = db.Column(db.Integer, default=0, nullable=False)
+    ticket_penalty = db.Column(db.Integer, default=0, nullable=False)
+    score = db.Column(db.Float, default=100, nullable=False)
+    # When depreciation and the ticket window were last evaluated
+    decayed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_asset_health_score', 'score'),
+        db.Index('idx_asset_health_decayed', 'decayed_at'),
+    )
+    
+    def __repr__(self):
+        return f'<AssetHealth {self.asset_id} ({self.score:.1f})>'
+    
+    def to_dict(self):
+        return {
+            'asset_id': self.asset_id,
+            'depreciation': self.depreciation,
+            'status_penalty': self.status_penalty,
+            'recent_ticket_count': self.recent_ticket_count,
+            'ticket_penalty': self.ticket_penalty,
+            'score': self.score,
+            'decayed_at': self.decayed_at.isoformat() + 'Z' if self.decayed_at else None
         }
 
 
@@ -330,10 +349,11 @@ class Asset(db.Model):
     STATUS_CHOICES = [STATUS_WORKING, STATUS_BROKEN, STATUS_MAINTENANCE]
     
     id = db.Column(db.Integer, primary_key=True)
-    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    # active_history columns keep their replaced value for room_status.py
+    room_id = db.column_property(db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False), active_history=True)
     name = db.Column(db.String(100), nullable=False)
     asset_type = db.Column(db.String(50), nullable=False)  # e.g., 'projector', 'ac', 'computer'
-    status = db.Column(db.String(20), default=STATUS_WORKING, nullable=False)
+    status = db.column_property(db.Column(db.String(20), default=STATUS_WORKING, nullable=False), active_history=True)
     installation_date = db.Column(db.DateTime, default=datetime.utcnow) # Actual date asset was installed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -387,32 +407,34 @@ class Ticket(db.Model):
     COMPLEXITY_CHOICES = [COMPLEXITY_LOW, COMPLEXITY_MEDIUM, COMPLEXITY_HIGH]
     
     id = db.Column(db.Integer, primary_key=True)
-    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
-    asset_id = db.Column(db.Integer, db.ForeignKey('assets.id'), nullable=True)
+    # active_history columns keep their replaced value for room_status.py, professional_stats.py,
+    # asset_health.py and ticket_rollup.py
+    room_id = db.column_property(db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False), active_history=True)
+    asset_id = db.column_property(db.Column(db.Integer, db.ForeignKey('assets.id'), nullable=True), active_history=True)
     
     # Assignment to professional
-    assigned_professional_id = db.Column(db.Integer, db.ForeignKey('professionals.id'), nullable=True)
+    assigned_professional_id = db.column_property(db.Column(db.Integer, db.ForeignKey('professionals.id'), nullable=True), active_history=True)
     
-    issue_type = db.Column(db.String(50), nullable=False)
+    issue_type = db.column_property(db.Column(db.String(50), nullable=False), active_history=True)
     description = db.Column(db.Text, nullable=False)
     image_filename = db.Column(db.String(255), nullable=True)
     
     # Complexity (selected by professional)
-    complexity = db.Column(db.String(20), nullable=True)
+    complexity = db.column_property(db.Column(db.String(20), nullable=True), active_history=True)
     
     # Time limit set by admin
     time_limit_hours = db.Column(db.Integer, nullable=True)
     deadline_datetime = db.Column(db.DateTime, nullable=True)
     
     # Job tracking
-    job_started_at = db.Column(db.DateTime, nullable=True)
-    job_completed_at = db.Column(db.DateTime, nullable=True)
+    job_started_at = db.column_property(db.Column(db.DateTime, nullable=True), active_history=True)
+    job_completed_at = db.column_property(db.Column(db.DateTime, nullable=True), active_history=True)
     completion_photo_filename = db.Column(db.String(255), nullable=True)
     
     # Cancellation tracking
     cancellation_reason = db.Column(db.Text, nullable=True)
     cancelled_at = db.Column(db.DateTime, nullable=True)
-    cancelled_by_professional_id = db.Column(db.Integer, db.ForeignKey('professionals.id'), nullable=True)
+    cancelled_by_professional_id = db.column_property(db.Column(db.Integer, db.ForeignKey('professionals.id'), nullable=True), active_history=True)
     
     # Reporter info
     reporter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -421,37 +443,42 @@ class Ticket(db.Model):
     reporter_email = db.Column(db.String(120), nullable=False)
     
     # Status tracking
-    status = db.Column(db.String(20), default=STATUS_OPEN, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.column_property(db.Column(db.String(20), default=STATUS_OPEN, nullable=False), active_history=True)
+    created_at = db.column_property(db.Column(db.DateTime, default=datetime.utcnow), active_history=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    fixed_at = db.Column(db.DateTime, nullable=True)
+    fixed_at = db.column_property(db.Column(db.DateTime, nullable=True), active_history=True)
     last_notification_sent_at = db.Column(db.DateTime, nullable=True)
     
     # Rating tracking
-    rating = db.Column(db.Integer, nullable=True)
+    rating = db.column_property(db.Column(db.Integer, nullable=True), active_history=True)
     rating_comment = db.Column(db.Text, nullable=True)
     
     __table_args__ = (
         db.Index('idx_ticket_status_created', 'status', 'created_at'),
         db.Index('idx_ticket_reporter_created', 'reporter_id', 'created_at'),
         db.Index('idx_ticket_professional_status', 'assigned_professional_id', 'status'),
+        db.Index('idx_ticket_room_status', 'room_id', 'status'),
+        db.Index('idx_ticket_status_fixed_id', 'status', 'fixed_at', 'id'),
+        db.Index('idx_ticket_created', 'created_at'),
+        db.Index('idx_ticket_cancelled_by', 'cancelled_by_professional_id'),
+        db.Index('idx_ticket_asset_created', 'asset_id', 'created_at'),
     )
     
     def __repr__(self):
         return f'<Ticket #{self.id} - {self.status}>'
     
-    @property
-    def is_overdue(self):
-        """Check if ticket deadline has passed."""
-        if self.deadline_datetime and self.status not in [self.STATUS_FIXED, self.STATUS_CANCELLED]:
-            return datetime.utcnow() > self.deadline_datetime
+    @classmethod
+    def compute_is_overdue(cls, deadline_datetime, status):
+        """Check if a deadline has passed for a ticket in `status` (shared with serializers.py)."""
+        if deadline_datetime and status not in [cls.STATUS_FIXED, cls.STATUS_CANCELLED]:
+            return datetime.utcnow() > deadline_datetime
         return False
     
-    @property
-    def time_remaining(self):
-        """Get time remaining for the task."""
-        if self.deadline_datetime and self.status not in [self.STATUS_FIXED, self.STATUS_CANCELLED]:
-            remaining = self.deadline_datetime - datetime.utcnow()
+    @classmethod
+    def compute_time_remaining(cls, deadline_datetime, status):
+        """Time left until a deadline for a ticket in `status` (shared with serializers.py)."""
+        if deadline_datetime and status not in [cls.STATUS_FIXED, cls.STATUS_CANCELLED]:
+            remaining = deadline_datetime - datetime.utcnow()
             if remaining.total_seconds() > 0:
                 hours = int(remaining.total_seconds() // 3600)
                 minutes = int((remaining.total_seconds() % 3600) // 60)
@@ -459,6 +486,16 @@ class Ticket(db.Model):
             return "Overdue"
         return None
     
+    @property
+    def is_overdue(self):
+        """Check if ticket deadline has passed."""
+        return self.compute_is_overdue(self.deadline_datetime, self.status)
+    
+    @property
+    def time_remaining(self):
+        """Get time remaining for the task."""
+        return self.compute_time_remaining(self.deadline_datetime, self.status)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -499,6 +536,112 @@ class Ticket(db.Model):
         }
 
 
+class TicketDailyRollup(db.Model):
+    """
+    Ticket counts per day, floor, issue type and status, kept up to date in
+    the same transaction as every ticket write by ticket_rollup.py:
+    created_count and the resolution columns count tickets created that day
+    that are now in `status`; fixed_count counts tickets fixed that day.
+    """
+    __tablename__ = 'ticket_daily_rollup'
+    
+    day = db.Column(db.Date, primary_key=True)
+    floor_id = db.Column(db.Integer, primary_key=True)
+    issue_type = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    created_count = db.Column(db.Integer, default=0, nullable=False)
+    fixed_count = db.Column(db.Integer, default=0, nullable=False)
+    # Fixed tickets with job_completed_at, and their total created -> completed time
+    resolution_count = db.Column(db.Integer, default=0, nullable=False)
+    resolution_seconds = db.Column(db.Float, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TicketDailyRollup {self.day} {self.floor_id} {self.issue_type} {self.status}>'
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'floor_id': self.floor_id,
+            'issue_type': self.issue_type,
+            'status': self.status,
+            'created_count': self.created_count,
+            'fixed_count': self.fixed_count,
+            'resolution_count': self.resolution_count,
+            'resolution_seconds': self.resolution_seconds,
+            'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None
+        }
+
+
+class TicketDayVersion(db.Model):
+    """
+    Data version of each ticket_daily_rollup day, advanced by ticket_rollup.py
+    in the same transaction as every change to that day's rows. Cached
+    analytics for a range stay valid while its days' versions are unchanged.
+    """
+    __tablename__ = 'ticket_day_versions'
+
+    day = db.Column(db.Date, primary_key=True)
+    # Seeded from time.time_ns() and only moves forward, so a version is never reused
+    version = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<TicketDayVersion {self.day} {self.version}>'
+
+
+class TicketArchive(db.Model):
+    """
+    Closed tickets moved out of `tickets` by archive.py, column for column.
+    Ids are kept (without foreign keys, so history never blocks deleting a
+    room or person); read them through archive.ticket_source().
+    """
+    __tablename__ = 'tickets_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    room_id = db.Column(db.Integer, nullable=False)
+    asset_id = db.Column(db.Integer, nullable=True)
+    assigned_professional_id = db.Column(db.Integer, nullable=True)
+    issue_type = db.Column(db.String(50), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    image_filename = db.Column(db.String(255), nullable=True)
+    complexity = db.Column(db.String(20), nullable=True)
+    time_limit_hours = db.Column(db.Integer, nullable=True)
+    deadline_datetime = db.Column(db.DateTime, nullable=True)
+    job_started_at = db.Column(db.DateTime, nullable=True)
+    job_completed_at = db.Column(db.DateTime, nullable=True)
+    completion_photo_filename = db.Column(db.String(255), nullable=True)
+    cancellation_reason = db.Column(db.Text, nullable=True)
+    cancelled_at = db.Column(db.DateTime, nullable=True)
+    cancelled_by_professional_id = db.Column(db.Integer, nullable=True)
+    reporter_id = db.Column(db.Integer, nullable=True)
+    reporter_name = db.Column(db.String(100), nullable=False)
+    prn = db.Column(db.String(20), nullable=False)
+    reporter_email = db.Column(db.String(120), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    fixed_at = db.Column(db.DateTime, nullable=True)
+    last_notification_sent_at = db.Column(db.DateTime, nullable=True)
+    rating = db.Column(db.Integer, nullable=True)
+    rating_comment = db.Column(db.Text, nullable=True)
+
+    # When the ticket closed (the age the archiver goes by) and when it moved here
+    closed_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_ticket_archive_closed', 'closed_at'),
+        db.Index('idx_ticket_archive_created', 'created_at'),
+        db.Index('idx_ticket_archive_status_fixed_id', 'status', 'fixed_at', 'id'),
+        db.Index('idx_ticket_archive_professional', 'assigned_professional_id'),
+        db.Index('idx_ticket_archive_cancelled_by', 'cancelled_by_professional_id'),
+        db.Index('idx_ticket_archive_reporter', 'reporter_id'),
+    )
+
+    def __repr__(self):
+        return f'<TicketArchive #{self.id} - {self.status}>'
+
+
 class Professional(db.Model):
     """Professional model - workers assigned to tickets (IT, Electrician, Plumber, Carpenter)."""
     __tablename__ = 'professionals'
@@ -521,11 +664,17 @@ class Professional(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_professional_created_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     assigned_tickets = db.relationship('Ticket', backref='assigned_professional', lazy=True, foreign_keys='Ticket.assigned_professional_id')
     cancelled_tickets = db.relationship('Ticket', backref='cancelled_by_professional', lazy=True, foreign_keys='Ticket.cancelled_by_professional_id')
     help_requests_sent = db.relationship('HelpRequest', backref='requester', lazy=True, foreign_keys='HelpRequest.requester_professional_id')
     help_requests_received = db.relationship('HelpRequest', backref='helper', lazy=True, foreign_keys='HelpRequest.helper_professional_id')
+    # Written by professional_stats.py with Core statements, never through the ORM
+    stats = db.relationship('ProfessionalStats', uselist=False, lazy='joined', viewonly=True)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -545,31 +694,28 @@ class Professional(db.Model):
         
     @property
     def overall_rating(self):
-        """Calculate average rating from all rated tickets."""
-        rated_tickets = [t for t in self.assigned_tickets if t.rating is not None]
-        if not rated_tickets:
+        """Average rating of all rated tickets, from professional_stats."""
+        if not self.stats or not self.stats.rating_count:
             return 0.0
-        return sum(t.rating for t in rated_tickets) / len(rated_tickets)
+        return self.stats.rating_sum / self.stats.rating_count
         
     @property
     def jobs_completed(self):
-        """Count of tickets fixed by this professional."""
-        return len([t for t in self.assigned_tickets if t.status == Ticket.STATUS_FIXED])
+        """Count of tickets fixed by this professional, from professional_stats."""
+        return self.stats.completed_count if self.stats else 0
         
     @property
     def jobs_cancelled(self):
-        """Count of tickets cancelled by this professional."""
-        return len(self.cancelled_tickets)
+        """Count of tickets cancelled by this professional, from professional_stats."""
+        return self.stats.cancelled_count if self.stats else 0
         
     @property
     def avg_resolution_time_str(self):
         """Average resolution time formatted as a string."""
-        fixed_tickets = [t for t in self.assigned_tickets if t.status == Ticket.STATUS_FIXED and t.job_started_at and t.fixed_at]
-        if not fixed_tickets:
+        if not self.stats or not self.stats.resolved_count:
             return "N/A"
             
-        total_seconds = sum((t.fixed_at - t.job_started_at).total_seconds() for t in fixed_tickets)
-        avg_seconds = total_seconds / len(fixed_tickets)
+        avg_seconds = self.stats.resolution_seconds / self.stats.resolved_count
         
         hours = int(avg_seconds // 3600)
         minutes = int((avg_seconds % 3600) // 60)
@@ -598,6 +744,39 @@ class Professional(db.Model):
         }
 
 
+class ProfessionalStats(db.Model):
+    """
+    Denormalized performance counters of a professional, kept up to date in
+    the same transaction as every ticket write by professional_stats.py.
+    """
+    __tablename__ = 'professional_stats'
+    
+    professional_id = db.Column(db.Integer, db.ForeignKey('professionals.id', ondelete='CASCADE'), primary_key=True)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    completed_count = db.Column(db.Integer, default=0, nullable=False)
+    cancelled_count = db.Column(db.Integer, default=0, nullable=False)
+    # Fixed tickets with both job_started_at and fixed_at, and their total duration
+    resolved_count = db.Column(db.Integer, default=0, nullable=False)
+    resolution_seconds = db.Column(db.Float, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ProfessionalStats {self.professional_id}>'
+    
+    def to_dict(self):
+        return {
+            'professional_id': self.professional_id,
+            'rating_sum': self.rating_sum,
+            'rating_count': self.rating_count,
+            'completed_count': self.completed_count,
+            'cancelled_count': self.cancelled_count,
+            'resolved_count': self.resolved_count,
+            'resolution_seconds': self.resolution_seconds,
+            'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None
+        }
+
+
 class HelpRequest(db.Model):
     """HelpRequest model - professionals requesting help from other professionals."""
     __tablename__ = 'help_requests'
@@ -618,6 +797,13 @@ class HelpRequest(db.Model):
     responded_at = db.Column(db.DateTime, nullable=True)
     admin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
+    __table_args__ = (
+        db.Index('idx_help_ticket', 'ticket_id'),
+        db.Index('idx_help_requester_status', 'requester_professional_id', 'status'),
+        db.Index('idx_help_helper_status', 'helper_professional_id', 'status'),
+        db.Index('idx_help_status_requested', 'status', 'requested_at'),
+    )
+    
     # Relationships
     ticket = db.relationship('Ticket', backref='help_requests')
     admin = db.relationship('User', backref='approved_help_requests')
@@ -662,6 +848,7 @@ class ChatMessage(db.Model):
     __table_args__ = (
         db.Index('idx_chat_sender_read', 'sender_type', 'sender_id', 'is_read'),
         db.Index('idx_chat_receiver_read', 'receiver_type', 'receiver_id', 'is_read'),
+        db.Index('idx_chat_timestamp', 'timestamp'),
     )
     
     def __repr__(self):
@@ -700,6 +887,7 @@ class Notification(db.Model):
     
     __table_args__ = (
         db.Index('idx_notif_user_read', 'user_id', 'is_read'),
+        db.Index('idx_notif_read_created', 'is_read', 'created_at'),
     )
     
     # Relationship
@@ -734,6 +922,10 @@ class PushSubscription(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Consecutive failed deliveries; retention.py drops subscriptions that keep failing
+    failure_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    last_failure_at = db.Column(db.DateTime, nullable=True)
+    
     def to_dict(self):
         return {
             "endpoint": self.endpoint,
@@ -825,6 +1017,7 @@ class RoomBooking(db.Model):
     
     __table_args__ = (
         db.Index('idx_booking_status_slot', 'status', 'slot_start'),
+        db.Index('idx_booking_slot_id', 'slot_start', 'id'),
     )
     
     faculty = db.relationship('User', backref=db.backref('room_bookings', lazy=True))
@@ -0,0 +1,438 @@
+"""
+Room Occupancy for FixLink.
+Resolves the time-varying occupancy layer of the floor map separately from
+the long-lived room layout/maintenance layer cached in cache.py.
+
+Occupancy is answered from an in-process OccupancyIndex holding, per loaded
+floor, each room's active bookings keyed by (date, hour) slot for a rolling
+window of days and its recurring timetable laid out on a weekday x hour grid.
+Booking and timetable writes are applied to the index incrementally after
+commit; writes made by other workers are picked up through the floor's tag
+generation.
+"""
+import time
+import bisect
+import threading
+from datetime import datetime, timedelta, time as dt_time
+from flask import current_app
+from sqlalchemy import event, inspect, select
+from .cache import get_tag_generation, register_commit_hook, floor_tag, MAP_TAG
+
+IST_OFFSET = timedelta(hours=5, minutes=30)
+
+# Bookings flip on UTC hours and timetables on IST hours (UTC :30), so a
+# 30-minute UTC bucket is the coarsest window in which occupancy is constant.
+BUCKET_MINUTES = 30
+
+# Days of bookings kept per floor around today (UTC)
+BOOKING_WINDOW_PAST_DAYS = 1
+BOOKING_WINDOW_FUTURE_DAYS = 7
+
+# How often a loaded floor re-checks its tag generations for writes made by
+# other workers. Writes in this process are applied immediately.
+DEFAULT_CHECK_SECONDS = 5
+
+def occupancy_bucket(now_utc=None):
+    """Return the start of the occupancy bucket containing `now_utc`."""
+    now_utc = now_utc or datetime.utcnow()
+    minute = now_utc.minute - now_utc.minute % BUCKET_MINUTES
+    return now_utc.replace(minute=minute, second=0, microsecond=0)
+
+
+# ==================== ROW PROJECTIONS ====================
+
+def _booking_rows():
+    """Active bookings with their floor and faculty name, without loading ORM objects."""
+    from .models import Room, RoomBooking, User
+    return select(
+        RoomBooking.id, RoomBooking.room_id, Room.floor_id, RoomBooking.slot_start,
+        RoomBooking.subject, RoomBooking.faculty_id, User.name.label('faculty_name')
+    ).join(Room, Room.id == RoomBooking.room_id).outerjoin(
+        User, User.id == RoomBooking.faculty_id
+    ).where(RoomBooking.status == RoomBooking.STATUS_ACTIVE)
+
+
+def _timetable_rows():
+    """Timetable slots with their floor and faculty name, without loading ORM objects."""
+    from .models import Room, Timetable, User
+    return select(
+        Timetable.id, Timetable.room_id, Room.floor_id, Timetable.day_of_week,
+        Timetable.start_time, Timetable.end_time, Timetable.subject,
+        Timetable.faculty_id, User.name.label('faculty_name')
+    ).join(Room, Room.id == Timetable.room_id).outerjoin(
+        User, User.id == Timetable.faculty_id
+    )
+
+
+def booking_entry(row):
+    """Plain-data view of an active booking row used by the index."""
+    return {
+        'id': row.id,
+        'room_id': row.room_id,
+        'floor_id': row.floor_id,
+        'slot_start': row.slot_start,
+        'subject': row.subject,
+        'faculty': row.faculty_name or 'Faculty',
+        'faculty_id': row.faculty_id,
+    }
+
+
+def timetable_entry(row):
+    """Plain-data view of a recurring timetable row used by the index."""
+    return {
+        'id': row.id,
+        'room_id': row.room_id,
+        'floor_id': row.floor_id,
+        'day_of_week': row.day_of_week,
+        'start_time': row.start_time,
+        'end_time': row.end_time,
+        'subject': row.subject,
+        'faculty': row.faculty_name or 'Faculty',
+        'faculty_id': row.faculty_id,
+    }
+
+
+def _booking_status(entry):
+    return {
+        'status': 'occupied',
+        'id': entry['id'],
+        'type': 'booking',
+        'subject': entry['subject'],
+        'faculty': entry['faculty'],
+        'faculty_id': entry['faculty_id'],
+        # NOTE: is_owner is intentionally omitted here.
+        # It is session-dependent and must be computed client-side
+        # to prevent cache poisoning across users.
+        'end_time': (entry['slot_start'] + timedelta(hours=6, minutes=30)).strftime('%I:%M %p')  # +1h from start, +5:30 for IST
+    }
+
+
+def _timetable_status(entry, now_ist):
+    return {
+        'status': 'occupied',
+        'id': entry['id'],
+        'type': 'scheduled',
+        'subject': entry['subject'],
+        'faculty': entry['faculty'],
+        'faculty_id': entry['faculty_id'],
+        'end_time': datetime.combine(now_ist.date(), entry['end_time']).strftime('%I:%M %p')
+    }
+
+
+# ==================== INDEX ====================
+
+class _FloorOccupancy:
+    """Occupancy slots of one floor's rooms, as loaded at a given tag generation."""
+
+    def __init__(self, floor_id, generations, first_day, last_day):
+        self.floor_id = floor_id
+        self.generations = generations
+        self.checked_at = time.monotonic()
+        self.first_day = first_day
+        self.last_day = last_day
+        self.bookings = {}           # booking_id -> entry
+        self.timetables = {}         # timetable_id -> entry
+        self.room_bookings = {}      # room_id -> {booking_id}
+        self.room_timetables = {}    # room_id -> {timetable_id}
+        self.booking_slots = {}      # room_id -> {slot_start: entry}
+        self.timetable_grid = {}     # room_id -> [weekday][hour] -> entry
+        self.lecture_starts = {}     # room_id -> [weekday] -> sorted start times
+
+    def covers(self, day):
+        return self.first_day <= day <= self.last_day
+
+    def put_booking(self, entry):
+        self.remove_booking(entry['id'])
+        if entry['floor_id'] != self.floor_id or not self.covers(entry['slot_start'].date()):
+            return
+        self.bookings[entry['id']] = entry
+        self.room_bookings.setdefault(entry['room_id'], set()).add(entry['id'])
+        self._index_bookings(entry['room_id'])
+
+    def remove_booking(self, booking_id):
+        entry = self.bookings.pop(booking_id, None)
+        if entry:
+            self.room_bookings[entry['room_id']].discard(booking_id)
+            self._index_bookings(entry['room_id'])
+
+    def put_timetable(self, entry):
+        self.remove_timetable(entry['id'])
+        if entry['floor_id'] != self.floor_id:
+            return
+        self.timetables[entry['id']] = entry
+        self.room_timetables.setdefault(entry['room_id'], set()).add(entry['id'])
+        self._index_timetables(entry['room_id'])
+
+    def remove_timetable(self, timetable_id):
+        entry = self.timetables.pop(timetable_id, None)
+        if entry:
+            self.room_timetables[entry['room_id']].discard(timetable_id)
+            self._index_timetables(entry['room_id'])
+
+    def _index_bookings(self, room_id):
+        slots = {}
+        # The lowest id wins a doubly-booked slot, matching the old collection order
+        for booking_id in sorted(self.room_bookings.get(room_id, ())):
+            entry = self.bookings[booking_id]
+            slots.setdefault(entry['slot_start'], entry)
+        self.booking_slots[room_id] = slots
+
+    def _index_timetables(self, room_id):
+        grid = [[None] * 24 for _ in range(7)]
+        starts = [[] for _ in range(7)]
+        for timetable_id in sorted(self.room_timetables.get(room_id, ())):
+            entry = self.timetables[timetable_id]
+            day = entry['day_of_week']
+            starts[day].append(entry['start_time'])
+            for hour in range(24):
+                if grid[day][hour] is None and entry['start_time'] <= dt_time(hour) < entry['end_time']:
+                    grid[day][hour] = entry
+        for day_starts in starts:
+            day_starts.sort()
+        self.timetable_grid[room_id] = grid
+        self.lecture_starts[room_id] = starts
+
+    def status(self, room_id, now_utc):
+        """Occupancy of a room: a specific-slot booking wins over the recurring timetable."""
+        current_hour_start = now_utc.replace(minute=0, second=0, microsecond=0)
+        entry = self.booking_slots.get(room_id, {}).get(current_hour_start)
+        if entry:
+            return _booking_status(entry)
+
+        now_ist = now_utc + IST_OFFSET
+        grid = self.timetable_grid.get(room_id)
+        entry = grid[now_ist.weekday()][now_ist.hour] if grid else None
+        if entry:
+            return _timetable_status(entry, now_ist)
+        return {'status': 'vacant'}
+
+    def next_lecture_start(self, room_id, now_ist):
+        """Start time of the room's next timetable slot later today (IST), or None."""
+        starts = self.lecture_starts.get(room_id)
+        if not starts:
+            return None
+        day_starts = starts[now_ist.weekday()]
+        position = bisect.bisect_right(day_starts, now_ist.time())
+        return day_starts[position] if position < len(day_starts) else None
+
+
+class OccupancyIndex:
+    """
+    Per-process occupancy index, loaded lazily one floor at a time.
+    Lookups are dict/list reads; the database is only hit when a floor is
+    first used, when its booking window rolls over, or when another worker
+    invalidated it.
+    """
+
+    def __init__(self, check_seconds=DEFAULT_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._floors = {}
+        self._lock = threading.RLock()
+
+    def _current_generations(self, floor_id):
+        return {tag: get_tag_generation(tag) for tag in (MAP_TAG, floor_tag(floor_id))}
+
+    def _load(self, floor_id, today):
+        from .models import Room, RoomBooking
+        from . import db
+
+        # Snapshot generations first so a write racing with the load forces a reload
+        generations = self._current_generations(floor_id)
+        first_day = today - timedelta(days=BOOKING_WINDOW_PAST_DAYS)
+        last_day = today + timedelta(days=BOOKING_WINDOW_FUTURE_DAYS)
+
+        floor = _FloorOccupancy(floor_id, generations, first_day, last_day)
+        bookings = db.session.execute(_booking_rows().where(
+            Room.floor_id == floor_id,
+            RoomBooking.slot_start >= datetime.combine(first_day, dt_time()),
+            RoomBooking.slot_start < datetime.combine(last_day + timedelta(days=1), dt_time())
+        ))
+        for row in bookings:
+            floor.put_booking(booking_entry(row))
+        for row in db.session.execute(_timetable_rows().where(Room.floor_id == floor_id)):
+            floor.put_timetable(timetable_entry(row))
+
+        self._floors[floor_id] = floor
+        return floor
+
+    def floor(self, floor_id, now_utc, check_seconds=None):
+        """Return the floor's slots, loading or refreshing them when needed."""
+        if check_seconds is None:
+            check_seconds = self.check_seconds
+        with self._lock:
+            floor = self._floors.get(floor_id)
+            if floor is None or not floor.covers(now_utc.date()):
+                return self._load(floor_id, now_utc.date())
+            if time.monotonic() - floor.checked_at >= check_seconds:
+                if self._current_generations(floor_id) != floor.generations:
+                    return self._load(floor_id, now_utc.date())
+                floor.checked_at = time.monotonic()
+            return floor
+
+    def room_status(self, floor_id, room_id, now_utc=None):
+        now_utc = now_utc or datetime.utcnow()
+        return self.floor(floor_id, now_utc).status(room_id, now_utc)
+
+    def next_lecture_start(self, floor_id, room_id, now_utc=None):
+        now_utc = now_utc or datetime.utcnow()
+        return self.floor(floor_id, now_utc).next_lecture_start(room_id, now_utc + IST_OFFSET)
+
+    def floor_occupancy(self, floor_id, now_utc=None):
+        """
+        Return {room_id: occupancy} for the floor's occupied rooms.
+        Whole-floor reads are served to clients that cache them by ETag, so
+        they always confirm the floor's generations first.
+        """
+        now_utc = now_utc or datetime.utcnow()
+        floor = self.floor(floor_id, now_utc, check_seconds=0)
+        room_ids = set(floor.booking_slots) | set(floor.timetable_grid)
+        occupancy = {room_id: floor.status(room_id, now_utc) for room_id in room_ids}
+        return {room_id: status for room_id, status in occupancy.items() if status['status'] != 'vacant'}
+
+    def apply_commit(self, changes, bumped):
+        """
+        Apply committed booking/timetable rows to loaded floors.
+        `bumped` maps floor_id -> (previous, new) generation; a floor whose
+        recorded generation is not `previous` missed someone else's write and
+        is dropped to be reloaded instead.
+        """
+        with self._lock:
+            for floor_id, (previous, generation) in bumped.items():
+                floor = self._floors.get(floor_id)
+                if floor is None:
+                    continue
+                tag = floor_tag(floor_id)
+                if floor.generations.get(tag) != previous:
+                    del self._floors[floor_id]
+                    continue
+                for booking_id, entry in changes.get('bookings', {}).items():
+                    if entry:
+                        floor.put_booking(entry)
+                    else:
+                        floor.remove_booking(booking_id)
+                for timetable_id, entry in changes.get('timetables', {}).items():
+                    if entry:
+                        floor.put_timetable(entry)
+                    else:
+                        floor.remove_timetable(timetable_id)
+                floor.generations[tag] = generation
+
+    def clear(self):
+        with self._lock:
+            self._floors.clear()
+
+
+def get_occupancy_index():
+    """Return the occupancy index of the current app, creating it on first use."""
+    app = current_app._get_current_object()
+    index = app.extensions.get('fixlink_occupancy_index')
+    if index is None:
+        check_seconds = app.config.get('OCCUPANCY_INDEX_CHECK_SECONDS', DEFAULT_CHECK_SECONDS)
+        index = app.extensions.setdefault('fixlink_occupancy_index', OccupancyIndex(check_seconds))
+    return index
+
+
+# ==================== INCREMENTAL UPDATES ====================
+
+# session.info key holding booking/timetable rows changed by the current transaction
+_PENDING_CHANGES_KEY = 'fixlink_pending_occupancy_changes'
+_listeners_registered = False
+
+
+def _collect_changes_after_flush(session, flush_context):
+    from .models import RoomBooking, Timetable
+
+    changed = {'bookings': set(), 'timetables': set()}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, RoomBooking):
+            changed['bookings'].add(inspect(obj).dict.get('id'))
+        elif isinstance(obj, Timetable):
+            changed['timetables'].add(inspect(obj).dict.get('id'))
+    if not changed['bookings'] and not changed['timetables']:
+        return
+
+    # Re-read the flushed rows; ids missing from the result were deleted or cancelled
+    pending = session.info.setdefault(_PENDING_CHANGES_KEY, {'bookings': {}, 'timetables': {}})
+    connection = session.connection()
+    if changed['bookings']:
+        from .models import RoomBooking
+        rows = connection.execute(_booking_rows().where(RoomBooking.id.in_(changed['bookings'])))
+        found = {row.id: booking_entry(row) for row in rows}
+        pending['bookings'].update({booking_id: found.get(booking_id) for booking_id in changed['bookings']})
+    if changed['timetables']:
+        rows = connection.execute(_timetable_rows().where(Timetable.id.in_(changed['timetables'])))
+        found = {row.id: timetable_entry(row) for row in rows}
+        pending['timetables'].update({timetable_id: found.get(timetable_id) for timetable_id in changed['timetables']})
+
+
+def _apply_changes_after_commit(session, bumped):
+    changes = session.info.pop(_PENDING_CHANGES_KEY, None) or {}
+    if bumped:
+        get_occupancy_index().apply_commit(changes, bumped)
+
+
+def _discard_pending_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_CHANGES_KEY, None)
+
+
+def register_occupancy_listeners():
+    """Keep occupancy indexes in step with booking and timetable commits."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    from . import db
+    event.listen(db.session, 'after_flush', _collect_changes_after_flush)
+    event.listen(db.session, 'after_transaction_end', _discard_pending_changes)
+    register_commit_hook(_apply_changes_after_commit)
+    _listeners_registered = True
+
+
+# ==================== FLOOR LAYER ====================
+
+def get_floor_occupancy(floor_id, now_utc=None):
+    """Return {room_id: occupancy} for a floor's occupied rooms from the occupancy index."""
+    return get_occupancy_index().floor_occupancy(floor_id, now_utc)
+
+
+def occupancy_between(floor_ids, start_dt, end_dt):
+    """
+    Return {room_id: occupancy} for rooms on `floor_ids` booked or timetabled
+    between `start_dt` and `end_dt` (UTC, same day), in one query each. A
+    booking wins over the timetable, and the earliest entry over later ones.
+    """
+    from . import db
+    from .models import Room, RoomBooking, Timetable
+
+    occupancy = {}
+    bookings = db.session.execute(_booking_rows().where(
+        Room.floor_id.in_(floor_ids),
+        RoomBooking.date == start_dt.date(),
+        RoomBooking.slot_start >= start_dt,
+        RoomBooking.slot_start < end_dt
+    ).order_by(RoomBooking.id))
+    for row in bookings:
+        occupancy.setdefault(row.room_id, {
+            'status': 'occupied', 'subject': row.subject, 'faculty': row.faculty_name or 'Unknown', 'type': 'booking'
+        })
+
+    timetables = db.session.execute(_timetable_rows().where(
+        Room.floor_id.in_(floor_ids),
+        Timetable.day_of_week == start_dt.weekday(),
+        Timetable.start_time < end_dt.time(),
+        Timetable.end_time > start_dt.time()
+    ).order_by(Timetable.id))
+    for row in timetables:
+        occupancy.setdefault(row.room_id, {
+            'status': 'occupied', 'subject': row.subject, 'faculty': row.faculty_name or 'Unknown', 'type': 'scheduled'
+        })
+    return occupancy
+
+
+def merge_occupancy(rooms, occupancy):
+    """Attach the occupancy layer to layout room dicts (rooms without entries are vacant)."""
+    return [
+        {**room, 'occupancy': occupancy.get(room['id'], {'status': 'vacant'})}
+        for room in rooms
+    ]
@@ -0,0 +1,175 @@
+"""
+Keyset Pagination for FixLink.
+Pages through an ordered query with "WHERE key < last key seen" instead of
+OFFSET, so page 500 costs the same as page 1, and replaces the per-page
+COUNT(*) with a briefly cached approximate total.
+
+- A sort key is a list of (column, descending) pairs ending in a unique
+  column (the primary key), e.g. [(Ticket.fixed_at, True), (Ticket.id, True)].
+- Cursors are opaque, signed tokens carrying the key of the row a page
+  starts after (or before, going back) and that row's position. A cursor
+  that was tampered with or belongs to another list reads as the first page.
+- NULLs sort as larger than any value on every dialect (Postgres' native
+  order): first when descending, last when ascending.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, false, or_
+
+logger = logging.getLogger(__name__)
+
+# Seconds an approximate total is reused before it is counted again
+COUNT_TIMEOUT = 60
+
+NEXT = 'n'
+PREV = 'p'
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='fixlink-cursor')
+
+
+def _dump_value(value):
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _load_value(value):
+    return datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+
+
+def encode_cursor(scope, values, direction, offset):
+    """Opaque token for the page after (NEXT) or before (PREV) the row with key `values`."""
+    return _serializer().dumps({
+        's': scope,
+        'k': [_dump_value(value) for value in values],
+        'd': direction,
+        'o': offset,
+    })
+
+
+def decode_cursor(token, scope):
+    """Return (values, direction, offset) for a cursor of `scope`, or None for the first page."""
+    if not token:
+        return None
+    try:
+        data = _serializer().loads(token)
+        if data['s'] != scope or data['d'] not in (NEXT, PREV):
+            return None
+        return [_load_value(value) for value in data['k']], data['d'], int(data['o'])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        logger.info("Ignoring invalid pagination cursor.")
+        return None
+
+
+def _nullable(column):
+    return getattr(getattr(column, 'expression', column), 'nullable', True)
+
+
+def _order_by(keys):
+    clauses = []
+    for column, descending in keys:
+        clause = column.desc() if descending else column.asc()
+        if _nullable(column):
+            clause = clause.nulls_first() if descending else clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
+def _beyond(column, descending, value):
+    """Rows strictly after `value` in (column, descending) order, NULL being largest."""
+    if value is None:
+        return column.isnot(None) if descending else false()
+    if descending:
+        return column < value
+    return or_(column > value, column.is_(None)) if _nullable(column) else column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(keys, values):
+    """WHERE clause selecting rows after the row with key `values` in `keys` order."""
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        ties = [_equal(keys[j][0], values[j]) for j in range(i)]
+        clauses.append(and_(*ties, _beyond(column, descending, values[i])))
+    return or_(*clauses)
+
+
+class KeysetPage:
+    """One page of items with the cursors of its neighbours and an approximate total."""
+
+    def __init__(self, items, per_page, offset, next_cursor, prev_cursor, total):
+        self.items = items
+        self.per_page = per_page
+        self.offset = offset
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    @property
+    def first_index(self):
+        """1-based position of the first item, for 'Showing a-b of ~total'."""
+        return self.offset + 1 if self.items else 0
+
+    @property
+    def last_index(self):
+        return self.offset + len(self.items)
+
+
+def approximate_count(query, scope, filters=()):
+    """COUNT(*) of `query`, reused from the cache for COUNT_TIMEOUT seconds per scope and filters."""
+    from .cache import cache
+
+    digest = hashlib.sha1(repr((scope, tuple(filters))).encode('utf-8')).hexdigest()[:16]
+    key = f'count_{scope}_{digest}'
+    total = cache.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(key, total, timeout=current_app.config.get('PAGINATION_COUNT_TIMEOUT', COUNT_TIMEOUT))
+    return total
+
+
+def keyset_paginate(query, keys, cursor=None, per_page=20, scope='', filters=()):
+    """
+    Return the KeysetPage of `query` (filtered, unordered) that `cursor` points
+    to. `scope` names the list and its sort so cursors cannot cross lists;
+    `filters` are the request filters, used to key the cached total.
+    """
+    key_values = lambda item: [getattr(item, column.key) for column, _ in keys]
+    token = decode_cursor(cursor, scope)
+    values, direction, offset = token if token else (None, NEXT, 0)
+
+    # Going back walks the reversed order from the first row of the later page
+    walk = keys if direction == NEXT else [(column, not descending) for column, descending in keys]
+    page_query = query if values is None else query.filter(_after(walk, values))
+    items = page_query.order_by(*_order_by(walk)).limit(per_page + 1).all()
+    more = len(items) > per_page
+    items = items[:per_page]
+
+    if direction == PREV:
+        items.reverse()
+        offset = max(offset - len(items), 0)
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = values is not None, more
+
+    next_cursor = prev_cursor = None
+    if items and has_next:
+        next_cursor = encode_cursor(scope, key_values(items[-1]), NEXT, offset + len(items))
+    if items and has_prev:
+        prev_cursor = encode_cursor(scope, key_values(items[0]), PREV, offset)
+    total = approximate_count(query, scope, filters)
+    return KeysetPage(items, per_page, offset, next_cursor, prev_cursor, total)
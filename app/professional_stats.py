@@ -0,0 +1,142 @@
+"""
+Professional Stats for FixLink.
+Maintains the denormalized professional_stats table (rating sum/count,
+completed and cancelled jobs, resolved jobs and their total duration) so
+Professional.to_dict() no longer walks a professional's ticket history.
+
+Every flush that writes a ticket applies the change in what it contributes
+to each professional: completing, cancelling, rating, reassigning or
+deleting a ticket all move the counters. The listeners, checks and rebuild
+are materialized.py's.
+"""
+import itertools
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import delete, inspect, or_, select, update
+from .materialized import MaterializedTable, committed_value
+
+COUNT_COLUMNS = ('rating_sum', 'rating_count', 'completed_count', 'cancelled_count',
+                 'resolved_count', 'resolution_seconds')
+
+# Ticket attributes a professional's stats depend on
+TICKET_FIELDS = ('assigned_professional_id', 'cancelled_by_professional_id', 'status',
+                 'rating', 'job_started_at', 'fixed_at')
+
+
+def ticket_contributions(values):
+    """Yield (professional_id, column, amount) for what one ticket adds to professional_stats."""
+    from .models import Ticket
+
+    assigned_id = values['assigned_professional_id']
+    if assigned_id is not None:
+        if values['rating'] is not None:
+            yield assigned_id, 'rating_sum', values['rating']
+            yield assigned_id, 'rating_count', 1
+        if values['status'] == Ticket.STATUS_FIXED:
+            yield assigned_id, 'completed_count', 1
+            if values['job_started_at'] and values['fixed_at']:
+                yield assigned_id, 'resolved_count', 1
+                yield assigned_id, 'resolution_seconds', (values['fixed_at'] - values['job_started_at']).total_seconds()
+    if values['cancelled_by_professional_id'] is not None:
+        yield values['cancelled_by_professional_id'], 'cancelled_count', 1
+
+
+def count_professional_stats(connection, professional_ids=None):
+    """Recount {professional_id: {column: value}} from tickets, for all professionals or just `professional_ids`."""
+    from .models import Professional, Ticket, TicketArchive
+
+    professionals = select(Professional.id)
+    if professional_ids is not None:
+        professional_ids = list(professional_ids)
+        professionals = professionals.where(Professional.id.in_(professional_ids))
+
+    # Archived tickets keep counting (older migrations run before tickets_archive exists)
+    models = [Ticket]
+    if inspect(connection).has_table(TicketArchive.__tablename__):
+        models.append(TicketArchive)
+
+    counts = {
+        professional_id: dict.fromkeys(COUNT_COLUMNS, 0)
+        for professional_id in connection.execute(professionals).scalars()
+    }
+    for model in models:
+        tickets = select(*(getattr(model, field) for field in TICKET_FIELDS)).where(
+            or_(model.assigned_professional_id.isnot(None), model.cancelled_by_professional_id.isnot(None))
+        )
+        if professional_ids is not None:
+            tickets = tickets.where(or_(
+                model.assigned_professional_id.in_(professional_ids),
+                model.cancelled_by_professional_id.in_(professional_ids)
+            ))
+        for row in connection.execute(tickets):
+            for professional_id, column, amount in ticket_contributions(row._mapping):
+                if professional_id in counts:
+                    counts[professional_id][column] += amount
+    return counts
+
+
+# ==================== TRANSACTIONAL MAINTENANCE ====================
+
+def _count_deltas(session):
+    """Collect {professional_id: Counter(column -> delta)} for the tickets in this flush."""
+    from .models import Ticket
+
+    deltas = defaultdict(Counter)
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Ticket):
+            continue
+
+        state = inspect(obj)
+        before = None if obj in session.new else {field: committed_value(state, field) for field in TICKET_FIELDS}
+        after = None if obj in session.deleted else {field: state.dict.get(field) for field in TICKET_FIELDS}
+        if before == after:
+            continue
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None:
+                continue
+            for professional_id, column, amount in ticket_contributions(values):
+                deltas[professional_id][column] += sign * amount
+    return {professional_id: counts for professional_id, counts in deltas.items() if any(counts.values())}
+
+
+def _professional_ids(objects):
+    from .models import Professional
+    return {inspect(obj).dict.get('id') for obj in objects if isinstance(obj, Professional)} - {None}
+
+
+def _apply_deltas(connection, deltas, new_ids, deleted_ids):
+    """Apply counter deltas; professionals without a row yet get one recounted from scratch."""
+    table = PROFESSIONAL_STATS.table
+    now = datetime.utcnow()
+
+    if deleted_ids:
+        connection.execute(delete(table).where(table.c.professional_id.in_(deleted_ids)))
+
+    def update_row(professional_id, delta):
+        values = {column: table.c[column] + delta[column] for column in COUNT_COLUMNS if delta[column]}
+        return connection.execute(
+            update(table).where(table.c.professional_id == professional_id).values(**values, updated_at=now)
+        ).rowcount
+
+    deltas = {professional_id: delta for professional_id, delta in deltas.items() if professional_id not in deleted_ids}
+    PROFESSIONAL_STATS.write_deltas(
+        connection, deltas, update_row, lambda ids: count_professional_stats(connection, ids), missing=new_ids, now=now
+    )
+
+
+def _apply_flush(session, connection):
+    deltas = _count_deltas(session)
+    new_ids = _professional_ids(session.new)
+    deleted_ids = _professional_ids(session.deleted)
+    if deltas or new_ids or deleted_ids:
+        _apply_deltas(connection, deltas, new_ids, deleted_ids)
+    return set(deltas) | new_ids
+
+
+PROFESSIONAL_STATS = MaterializedTable(
+    'professional_stats', 'ProfessionalStats', source='Professional', columns=COUNT_COLUMNS,
+    recount=count_professional_stats, apply=_apply_flush,
+    load={'Ticket': TICKET_FIELDS}, expire=[('Professional', ['stats'])]
+)
+check_professional_stats = PROFESSIONAL_STATS.check
+rebuild_professional_stats = PROFESSIONAL_STATS.rebuild
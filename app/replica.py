@@ -0,0 +1,152 @@
+"""
+Read Replica Routing for FixLink.
+Sends the heavy read-only endpoints (analytics, exports, history) to a
+replica configured as the 'replica' entry of SQLALCHEMY_BINDS
+(DATABASE_REPLICA_URL), keeping the primary free for ticket submission.
+
+- Reads are routed only inside read_replica() / @reads_from_replica; all
+  other queries, and every flush, use the primary as before.
+- Once a session has written (a flush or a Core INSERT/UPDATE/DELETE) it
+  reads from the primary for the rest of its life, so a request sees its
+  own writes.
+- Each write also stamps the user's cookie session; for
+  REPLICA_MAX_LAG_SECONDS afterwards that user reads from the primary, so
+  a ticket submitted a moment ago is not missing from their history.
+- On PostgreSQL the replica's replay lag is measured (cached for
+  REPLICA_LAG_CHECK_SECONDS); a replica further behind than the limit, or
+  unreachable, is skipped.
+
+Without a replica bind everything reads from the primary.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, has_request_context, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+
+# Defaults for the REPLICA_MAX_LAG_SECONDS / REPLICA_LAG_CHECK_SECONDS settings
+MAX_LAG_SECONDS = 5
+LAG_CHECK_SECONDS = 5
+
+# session.info keys: routing requested, and the session has written
+_ROUTE_KEY = 'fixlink_read_replica'
+_WROTE_KEY = 'fixlink_session_wrote'
+# Cookie session key holding the time of the user's last write
+FENCE_KEY = '_replica_fence'
+
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_lag_lock = threading.Lock()
+_lag_cache = {}  # engine url -> (checked_at, lag seconds)
+_listeners_registered = False
+
+
+class RoutingSession(Session):
+    """db.session class that answers reads from the replica while routing is on."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(_ROUTE_KEY) and not self._flushing and not self.info.get(_WROTE_KEY):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _setting(name, default):
+    return current_app.config.get(name, default)
+
+
+def replica_lag(engine):
+    """Seconds the replica is behind (0 where it cannot be measured), cached briefly; None if unreachable."""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+
+    key = str(engine.url)
+    now = time.monotonic()
+    with _lag_lock:
+        cached = _lag_cache.get(key)
+    if cached and now - cached[0] < _setting('REPLICA_LAG_CHECK_SECONDS', LAG_CHECK_SECONDS):
+        return cached[1]
+
+    try:
+        with engine.connect() as connection:
+            lag = float(connection.execute(_PG_LAG_SQL).scalar() or 0)
+    except Exception as e:
+        logger.warning(f"Read replica unavailable, using the primary: {e}")
+        lag = None
+    with _lag_lock:
+        _lag_cache[key] = (now, lag)
+    return lag
+
+
+def replica_available():
+    """Whether reads may go to the replica for the current user right now."""
+    from . import db
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        return False
+
+    max_lag = _setting('REPLICA_MAX_LAG_SECONDS', MAX_LAG_SECONDS)
+    if has_request_context() and time.time() - cookie_session.get(FENCE_KEY, 0) < max_lag:
+        return False
+    lag = replica_lag(replica)
+    return lag is not None and lag <= max_lag
+
+
+@contextmanager
+def read_replica():
+    """Answer db.session reads inside the block from the replica, when it is safe to."""
+    from . import db
+    session = db.session()
+    previous = session.info.get(_ROUTE_KEY)
+    session.info[_ROUTE_KEY] = previous or replica_available()
+    try:
+        yield
+    finally:
+        session.info[_ROUTE_KEY] = previous
+
+
+def reads_from_replica(f):
+    """Run a read-only view or helper inside read_replica()."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with read_replica():
+            return f(*args, **kwargs)
+    return decorated_function
+
+
+def _mark_written(session):
+    session.info[_WROTE_KEY] = True
+    if has_request_context() and REPLICA_BIND in session._db.engines:
+        cookie_session[FENCE_KEY] = time.time()
+
+
+def _after_flush(session, flush_context):
+    _mark_written(session)
+
+
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session)
+
+
+def register_replica_listeners():
+    """Pin sessions (and users, for the lag window) to the primary once they write."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    from . import db
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'do_orm_execute', _on_execute)
+    _listeners_registered = True
@@ -0,0 +1,133 @@
+"""
+Data Retention for FixLink.
+Every job event and chat message adds a Notification row per admin, and
+nothing used to delete them. The scheduler now compacts the append-only
+tables with one policy each:
+
+- notifications: read ones older than RETENTION_NOTIFICATION_DAYS
+- chat_messages: older than RETENTION_CHAT_DAYS
+- push_subscriptions: failed RETENTION_PUSH_MAX_FAILURES times in a row,
+  the last failure more than RETENTION_PUSH_FAILURE_DAYS ago
+
+A policy whose days setting is 0 or None is off. Rows go in batches of
+RETENTION_BATCH_SIZE, each its own short transaction, sleeping
+RETENTION_BATCH_PAUSE seconds between batches so ticket writes are not
+starved; a run stops after RETENTION_MAX_SECONDS and resumes on the next
+scheduler pass. Rows removed and time spent are logged and kept for
+/developer/api/retention.
+"""
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, select
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the RETENTION_* settings
+BATCH_SIZE = 1000
+BATCH_PAUSE = 0.2
+MAX_SECONDS = 60
+
+_report_lock = threading.Lock()
+_last_reports = {}  # policy name -> report of its latest run in this process
+
+
+class RetentionPolicy:
+    """Which rows of `model` have expired: `criteria(cutoff, config)` -> filters, given the days setting."""
+
+    def __init__(self, name, model, setting, default_days, criteria):
+        self.name = name
+        self.model = model
+        self.setting = setting
+        self.default_days = default_days
+        self.criteria = criteria
+
+    def cutoff(self, config, now):
+        days = config.get(self.setting, self.default_days)
+        return now - timedelta(days=days) if days else None
+
+    def expired_ids(self, cutoff, config, limit):
+        model = self.model
+        return select(model.id).where(*self.criteria(cutoff, config)).order_by(model.id).limit(limit)
+
+
+def retention_policies():
+    """Policies in the order they run."""
+    from .models import ChatMessage, Notification, PushSubscription
+    return [
+        RetentionPolicy(
+            'notifications', Notification, 'RETENTION_NOTIFICATION_DAYS', 30,
+            lambda cutoff, config: [Notification.is_read.is_(True), Notification.created_at < cutoff],
+        ),
+        RetentionPolicy(
+            'chat_messages', ChatMessage, 'RETENTION_CHAT_DAYS', 180,
+            lambda cutoff, config: [ChatMessage.timestamp < cutoff],
+        ),
+        RetentionPolicy(
+            'push_subscriptions', PushSubscription, 'RETENTION_PUSH_FAILURE_DAYS', 7,
+            lambda cutoff, config: [
+                PushSubscription.failure_count >= config.get('RETENTION_PUSH_MAX_FAILURES', 5),
+                PushSubscription.last_failure_at < cutoff,
+            ],
+        ),
+    ]
+
+
+def apply_policy(policy, batch_size=None, pause=None, deadline=None):
+    """Delete `policy`'s expired rows batch by batch; returns {'policy', 'deleted', 'batches', 'seconds', 'complete'}."""
+    from . import db
+
+    config = current_app.config
+    batch_size = batch_size or config.get('RETENTION_BATCH_SIZE', BATCH_SIZE)
+    pause = config.get('RETENTION_BATCH_PAUSE', BATCH_PAUSE) if pause is None else pause
+    started = time.monotonic()
+    report = {'policy': policy.name, 'deleted': 0, 'batches': 0, 'seconds': 0.0, 'complete': True}
+
+    cutoff = policy.cutoff(config, datetime.utcnow())
+    if cutoff is not None:
+        model = policy.model
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                report['complete'] = False
+                break
+            ids = db.session.execute(policy.expired_ids(cutoff, config, batch_size)).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(model).where(model.id.in_(ids)), execution_options={'synchronize_session': False})
+            db.session.commit()
+            report['deleted'] += len(ids)
+            report['batches'] += 1
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    report['seconds'] = round(time.monotonic() - started, 3)
+    report['finished_at'] = datetime.utcnow().isoformat() + 'Z'
+    with _report_lock:
+        _last_reports[policy.name] = report
+    return report
+
+
+def run_retention(batch_size=None, pause=None, max_seconds=None):
+    """Apply every policy within one time budget; returns their reports."""
+    if max_seconds is None:
+        max_seconds = current_app.config.get('RETENTION_MAX_SECONDS', MAX_SECONDS)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+
+    reports = [apply_policy(policy, batch_size, pause, deadline) for policy in retention_policies()]
+    for report in reports:
+        if report['deleted'] or not report['complete']:
+            logger.info(
+                f"Retention {report['policy']}: removed {report['deleted']} rows in {report['batches']} "
+                f"batches, {report['seconds']:.2f}s{'' if report['complete'] else ' (time budget reached)'}."
+            )
+    return reports
+
+
+def last_retention_reports():
+    """Latest report per policy from this process."""
+    with _report_lock:
+        return [dict(report) for report in _last_reports.values()]
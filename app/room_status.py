@@ -0,0 +1,165 @@
+"""
+Room Status for FixLink.
+Maintains the materialized room_status table: per room, the number of open,
+assigned and in-progress tickets, the number of broken assets and the derived
+map colour, so the map never has to scan a room's ticket history.
+
+Every flush that inserts, deletes or moves a ticket/asset, or changes its
+status, applies the resulting count deltas to room_status. Deltas are
+applied as `count = count + n`; the UPDATE row-locks, so concurrent writers
+to the same room cannot lose each other's changes. The listeners, checks
+and rebuild are materialized.py's.
+"""
+import itertools
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import case, delete, func, inspect, select, update
+from .materialized import MaterializedTable, committed_value
+
+COUNT_COLUMNS = ('open_count', 'assigned_count', 'in_progress_count', 'broken_asset_count')
+
+
+def _ticket_columns():
+    from .models import Ticket
+    return {
+        Ticket.STATUS_OPEN: 'open_count',
+        Ticket.STATUS_ASSIGNED: 'assigned_count',
+        Ticket.STATUS_IN_PROGRESS: 'in_progress_count',
+    }
+
+
+def _asset_columns():
+    from .models import Asset
+    return {Asset.STATUS_BROKEN: 'broken_asset_count'}
+
+
+def derive_status(counts):
+    """Map colour for a {column: count} dict (see Room.status for the rules)."""
+    from .models import RoomStatus
+    if counts['open_count'] or counts['broken_asset_count']:
+        return RoomStatus.STATUS_ISSUE
+    if counts['in_progress_count']:
+        return RoomStatus.STATUS_IN_PROGRESS
+    if counts['assigned_count']:
+        return RoomStatus.STATUS_ASSIGNED
+    return RoomStatus.STATUS_NORMAL
+
+
+def status_expression(counts):
+    """SQL CASE deriving the map colour from {column: SQL expression}; mirrors derive_status()."""
+    from .models import RoomStatus
+    return case(
+        ((counts['open_count'] > 0) | (counts['broken_asset_count'] > 0), RoomStatus.STATUS_ISSUE),
+        (counts['in_progress_count'] > 0, RoomStatus.STATUS_IN_PROGRESS),
+        (counts['assigned_count'] > 0, RoomStatus.STATUS_ASSIGNED),
+        else_=RoomStatus.STATUS_NORMAL
+    )
+
+
+def count_room_status(connection, room_ids=None):
+    """Recount {room_id: {column: count, 'status': colour}} from tickets and assets, for all rooms or just `room_ids`."""
+    from .models import Room, Ticket, Asset
+
+    rooms = select(Room.id)
+    tickets = select(Ticket.room_id, Ticket.status, func.count()).where(
+        Ticket.status.in_(_ticket_columns())
+    ).group_by(Ticket.room_id, Ticket.status)
+    assets = select(Asset.room_id, Asset.status, func.count()).where(
+        Asset.status.in_(_asset_columns())
+    ).group_by(Asset.room_id, Asset.status)
+    if room_ids is not None:
+        room_ids = list(room_ids)
+        rooms = rooms.where(Room.id.in_(room_ids))
+        tickets = tickets.where(Ticket.room_id.in_(room_ids))
+        assets = assets.where(Asset.room_id.in_(room_ids))
+
+    counts = {room_id: dict.fromkeys(COUNT_COLUMNS, 0) for room_id in connection.execute(rooms).scalars()}
+    for columns, query in ((_ticket_columns(), tickets), (_asset_columns(), assets)):
+        for room_id, status, count in connection.execute(query):
+            if room_id in counts:
+                counts[room_id][columns[status]] = count
+    for room_counts in counts.values():
+        room_counts['status'] = derive_status(room_counts)
+    return counts
+
+
+# ==================== TRANSACTIONAL MAINTENANCE ====================
+
+def _count_deltas(session):
+    """Collect {room_id: Counter(column -> delta)} for the tickets and assets in this flush."""
+    from .models import Ticket, Asset
+
+    deltas = defaultdict(Counter)
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Ticket):
+            columns = _ticket_columns()
+        elif isinstance(obj, Asset):
+            columns = _asset_columns()
+        else:
+            continue
+
+        state = inspect(obj)
+        before = None if obj in session.new else (committed_value(state, 'room_id'), committed_value(state, 'status'))
+        after = None if obj in session.deleted else (state.dict.get('room_id'), state.dict.get('status'))
+        if before == after:
+            continue
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None or values[0] is None or values[1] not in columns:
+                continue
+            deltas[values[0]][columns[values[1]]] += sign
+    return {room_id: counts for room_id, counts in deltas.items() if any(counts.values())}
+
+
+def _room_ids(objects):
+    from .models import Room
+    return {inspect(obj).dict.get('id') for obj in objects if isinstance(obj, Room)} - {None}
+
+
+def _apply_deltas(connection, deltas, new_room_ids, deleted_room_ids):
+    """Apply count deltas; rooms without a row yet get one recounted from scratch."""
+    table = ROOM_STATUS.table
+    now = datetime.utcnow()
+
+    if deleted_room_ids:
+        connection.execute(delete(table).where(table.c.room_id.in_(deleted_room_ids)))
+
+    def update_row(room_id, delta):
+        counts = {
+            column: table.c[column] + delta[column] if delta[column] else table.c[column]
+            for column in COUNT_COLUMNS
+        }
+        return connection.execute(
+            update(table).where(table.c.room_id == room_id).values(
+                **counts, status=status_expression(counts), updated_at=now
+            )
+        ).rowcount
+
+    ROOM_STATUS.write_deltas(
+        connection, {room_id: delta for room_id, delta in deltas.items() if room_id not in deleted_room_ids},
+        update_row, lambda room_ids: count_room_status(connection, room_ids), missing=new_room_ids, now=now
+    )
+
+
+def _apply_flush(session, connection):
+    deltas = _count_deltas(session)
+    new_room_ids = _room_ids(session.new)
+    deleted_room_ids = _room_ids(session.deleted)
+    if deltas or new_room_ids or deleted_room_ids:
+        _apply_deltas(connection, deltas, new_room_ids, deleted_room_ids)
+    return set(deltas) | new_room_ids
+
+
+def _invalidate_map(session, connection, room_ids):
+    # Core writes outside a flush are invisible to the cache listeners
+    from .cache import MAP_TAG, invalidate_tags_after_commit
+    invalidate_tags_after_commit(session, MAP_TAG)
+
+
+ROOM_STATUS = MaterializedTable(
+    'room_status', 'RoomStatus', source='Room', columns=(*COUNT_COLUMNS, 'status'),
+    recount=count_room_status, apply=_apply_flush,
+    load={'Ticket': ('room_id', 'status'), 'Asset': ('room_id', 'status')},
+    expire=[('Room', ['status_record'])], written=_invalidate_map
+)
+check_room_status = ROOM_STATUS.check
+rebuild_room_status = ROOM_STATUS.rebuild
@@ -99,6 +99,32 @@ def check_for_alerts(app):
         except Exception as e:
             print(f"Critical Asset Alert Error: {str(e)}")
 
+def run_maintenance(app):
+    with app.app_context():
+        # Move long-fixed tickets out of the hot tickets table
+        try:
+            from .archive import archive_closed_tickets
+            archive_closed_tickets()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Ticket Archive Error: {str(e)}")
+
+        # Expire read notifications, old chat and dead push subscriptions
+        try:
+            from .retention import run_retention
+            run_retention()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Retention Error: {str(e)}")
+
+        # Age asset health scores (depreciation, tickets leaving the window)
+        try:
+            from .asset_health import decay_asset_health
+            decay_asset_health()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Asset Health Error: {str(e)}")
+
 def scheduler_loop(app):
     # Minimal wait to let the app start fully
     time.sleep(10)
@@ -109,6 +135,10 @@ def scheduler_loop(app):
         except Exception as e:
             # We use print here because we are in a background thread without easy logger access
             print(f"Scheduler error: {str(e)}")
+        try:
+            run_maintenance(app)
+        except Exception as e:
+            print(f"Maintenance error: {str(e)}")
         
         # Check every 30 minutes (1800 seconds)
         time.sleep(1800)
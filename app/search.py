@@ -0,0 +1,383 @@
+"""
+Full-Text Search for FixLink.
+Replaces the leading-wildcard ILIKE scans of the ticket history, users and
+professionals searches with an index, picked by database dialect:
+
+- PostgreSQL: GIN indexes on a to_tsvector('simple', ...) document (word and
+  prefix matches, ranked with ts_rank) and pg_trgm indexes on the same
+  document and on rooms.number, so partial values such as "VY40" or a
+  fragment of an email still use an index: substrings are matched with
+  ILIKE against the whole document, not column by column. Postgres
+  maintains both.
+- SQLite: an FTS5 table per entity with the trigram tokenizer (substring
+  matches, ranked with bm25), kept current by triggers on insert, on update
+  of an indexed column, and on delete.
+- Anything else, or SQLite built without FTS5: the original ILIKE filters.
+
+Every term of the search text must match (AND). SearchIndex.filter()
+returns a WHERE clause that combines with any other filter and ordering;
+SearchIndex.ranked() also orders by relevance.
+"""
+import logging
+import re
+import sqlite3
+from functools import lru_cache
+from sqlalchemy import Grouping, and_, any_, event, func, literal_column, or_, select, table, text, true
+
+logger = logging.getLogger(__name__)
+
+# Trigram FTS5 and pg_trgm cannot match fewer characters than this
+MIN_TRIGRAM_LENGTH = 3
+
+_listeners_registered = False
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    """Whether the linked SQLite library has FTS5 with the trigram tokenizer (3.34+)."""
+    try:
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5(body, tokenize='trigram')")
+        finally:
+            connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def search_backend(dialect_name):
+    """'postgresql', 'fts5' or None (plain ILIKE) for a dialect name."""
+    if dialect_name == 'postgresql':
+        return 'postgresql'
+    if dialect_name == 'sqlite' and fts5_available():
+        return 'fts5'
+    return None
+
+
+def search_terms(search_text):
+    return [term for term in (search_text or '').split() if term]
+
+
+def _like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _fts5_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _tsquery(terms):
+    """Prefix tsquery ('vy40:* & sharma:*') from the word characters of `terms`, or None."""
+    words = [word for term in terms for word in re.findall(r'\w+', term)]
+    return ' & '.join(f'{word}:*' for word in words) or None
+
+
+class SearchIndex:
+    """
+    Search over one model. `fields` are (name, weight) pairs in FTS5 column
+    order; `source` selects the row id and those fields from the table
+    aliased as `t`. `related` lists (table, column, key) for columns of other
+    tables copied into the index: when table.column changes, rows whose
+    t.<key> points at it are reindexed.
+    """
+
+    def __init__(self, name, model, fields, source, related=()):
+        self.name = name
+        self.model = model
+        self.fields = tuple(fields)
+        self.source = source
+        self.related = tuple(related)
+
+    @property
+    def base_table(self):
+        return self.model.__tablename__
+
+    @property
+    def own_columns(self):
+        """Indexed fields stored on the model's own table."""
+        table_columns = self.model.__table__.c
+        return [name for name, _ in self.fields if name in table_columns]
+
+    def _ilike_clause(self, term):
+        pattern = _like_pattern(term)
+        return or_(*(getattr(self.model, name).ilike(pattern, escape='\\') for name in self.own_columns),
+                   *self._related_ilike(pattern))
+
+    def _related_ilike(self, pattern):
+        tables = self.model.metadata.tables
+        return [
+            getattr(self.model, key).in_(
+                select(tables[related_table].c.id).where(tables[related_table].c[column].ilike(pattern, escape='\\'))
+            )
+            for related_table, column, key in self.related
+        ]
+
+    # -------------------- PostgreSQL --------------------
+
+    def _document(self, prefix=''):
+        return " || ' ' || ".join(f"coalesce({prefix}{name}, '')" for name in self.own_columns)
+
+    def _tsvector(self, prefix=''):
+        return f"to_tsvector('simple', {self._document(prefix)})"
+
+    def _pg_term_clause(self, term):
+        # Every branch is answerable from an index, so Postgres can BitmapOr them:
+        # the tsvector GIN, the trigram GIN on the same document, and the ids of
+        # matching related rows (found through their own trigram index) looked
+        # up in the model's btree on the key column
+        pattern = _like_pattern(term)
+        document = literal_column(f'({self._document(self.base_table + ".")})')
+        clauses = [document.ilike(pattern, escape='\\'), *self._pg_related_ilike(pattern)]
+        query = _tsquery([term])
+        if query:
+            tsvector = literal_column(self._tsvector(f'{self.base_table}.'))
+            clauses.insert(0, tsvector.op('@@', is_comparison=True)(func.to_tsquery(literal_column("'simple'"), query)))
+        return or_(*clauses)
+
+    def _pg_related_ilike(self, pattern):
+        tables = self.model.metadata.tables
+        return [
+            # ANY ((SELECT array_agg(id) ...)): an array computed once, not a per-row subquery
+            getattr(self.model, key) == any_(Grouping(
+                select(func.array_agg(tables[related_table].c.id))
+                .where(tables[related_table].c[column].ilike(pattern, escape='\\'))
+                .scalar_subquery()
+            ))
+            for related_table, column, key in self.related
+        ]
+
+    def _pg_rank(self, terms):
+        document = literal_column(self._document(f'{self.base_table}.'))
+        rank = func.similarity(document, ' '.join(terms))
+        query = _tsquery(terms)
+        if query:
+            tsvector = literal_column(self._tsvector(f'{self.base_table}.'))
+            rank = rank + func.ts_rank(tsvector, func.to_tsquery(literal_column("'simple'"), query.replace(' & ', ' | ')))
+        return rank
+
+    # -------------------- SQLite FTS5 --------------------
+
+    def _fts5_matches(self, terms, ranked=False):
+        """Subquery of (id, score) for rows containing every term, best score largest."""
+        fts = literal_column(self.name)
+        columns = [literal_column('rowid').label('id')]
+        if ranked:
+            columns.append((-func.bm25(fts, *(weight for _, weight in self.fields))).label('score'))
+        return (select(*columns).select_from(table(self.name))
+                .where(fts.match(' '.join(_fts5_phrase(term) for term in terms))))
+
+    # -------------------- Public API --------------------
+
+    def filter(self, search_text, backend):
+        """WHERE clause matching rows that contain every term of `search_text`."""
+        terms = search_terms(search_text)
+        if not terms:
+            return true()
+        if backend == 'postgresql':
+            return and_(*(self._pg_term_clause(term) for term in terms))
+        if backend == 'fts5':
+            indexed = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+            clauses = [self._ilike_clause(term) for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+            if indexed:
+                clauses.insert(0, self.model.id.in_(self._fts5_matches(indexed)))
+            return and_(*clauses)
+        return and_(*(self._ilike_clause(term) for term in terms))
+
+    def ranked(self, query, search_text, backend):
+        """`query` (ORM Query or select) narrowed to matches, most relevant first."""
+        terms = search_terms(search_text)
+        indexed = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+        if backend == 'fts5' and indexed:
+            matches = self._fts5_matches(indexed, ranked=True).subquery()
+            short = [self._ilike_clause(term) for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+            return (query.join(matches, matches.c.id == self.model.id).filter(*short)
+                    .order_by(matches.c.score.desc(), self.model.id.desc()))
+
+        query = query.filter(self.filter(search_text, backend))
+        if backend == 'postgresql' and terms:
+            return query.order_by(self._pg_rank(terms).desc(), self.model.id.desc())
+        return query.order_by(self.model.id.desc())
+
+    # -------------------- Schema --------------------
+
+    def create_statements(self, backend):
+        if backend == 'postgresql':
+            return [
+                f"CREATE INDEX IF NOT EXISTS idx_{self.name}_tsv ON {self.base_table} "
+                f"USING gin (({self._tsvector()}))",
+                f"CREATE INDEX IF NOT EXISTS idx_{self.name}_trgm ON {self.base_table} "
+                f"USING gin (({self._document()}) gin_trgm_ops)",
+            ]
+        if backend != 'fts5':
+            return []
+
+        names = ', '.join(name for name, _ in self.fields)
+        reindex = f"INSERT INTO {self.name}(rowid, {names}) {self.source}"
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5({names}, tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_ai AFTER INSERT ON {self.base_table} BEGIN "
+            f"{reindex} WHERE t.id = NEW.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_au AFTER UPDATE OF "
+            f"{', '.join(['id', *self._trigger_columns()])} ON {self.base_table} BEGIN "
+            f"DELETE FROM {self.name} WHERE rowid = OLD.id; {reindex} WHERE t.id = NEW.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_ad AFTER DELETE ON {self.base_table} BEGIN "
+            f"DELETE FROM {self.name} WHERE rowid = OLD.id; END",
+        ]
+        for related_table, column, key in self.related:
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {self.name}_{related_table}_au AFTER UPDATE OF {column} "
+                f"ON {related_table} BEGIN "
+                f"DELETE FROM {self.name} WHERE rowid IN "
+                f"(SELECT id FROM {self.base_table} WHERE {key} = NEW.id); "
+                f"{reindex} WHERE t.{key} = NEW.id; END"
+            )
+        return statements
+
+    def _trigger_columns(self):
+        keys = [key for _, _, key in self.related]
+        return [*self.own_columns, *(key for key in keys if key not in self.own_columns)]
+
+    def drop_statements(self, backend):
+        if backend == 'postgresql':
+            return [f"DROP INDEX IF EXISTS idx_{self.name}_tsv", f"DROP INDEX IF EXISTS idx_{self.name}_trgm"]
+        if backend != 'fts5':
+            return []
+        triggers = ['ai', 'au', 'ad', *(f'{related_table}_au' for related_table, _, _ in self.related)]
+        return [*(f"DROP TRIGGER IF EXISTS {self.name}_{suffix}" for suffix in triggers),
+                f"DROP TABLE IF EXISTS {self.name}"]
+
+
+def _search_indexes():
+    from .models import Ticket, User, Professional
+    return (
+        SearchIndex(
+            'ticket_search', Ticket,
+            [('room_number', 10.0), ('reporter_name', 5.0), ('prn', 5.0), ('reporter_email', 3.0),
+             ('issue_type', 2.0), ('description', 1.0)],
+            "SELECT t.id, r.number, t.reporter_name, t.prn, t.reporter_email, t.issue_type, t.description "
+            "FROM tickets t LEFT JOIN rooms r ON r.id = t.room_id",
+            related=[('rooms', 'number', 'room_id')],
+        ),
+        SearchIndex(
+            'user_search', User,
+            [('name', 5.0), ('prn', 5.0), ('email', 3.0)],
+            "SELECT t.id, t.name, t.prn, t.email FROM users t",
+        ),
+        SearchIndex(
+            'professional_search', Professional,
+            [('name', 5.0), ('phone', 5.0), ('email', 3.0)],
+            "SELECT t.id, t.name, t.phone, t.email FROM professionals t",
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def search_indexes():
+    """{'tickets' | 'users' | 'professionals': SearchIndex}."""
+    return dict(zip(('tickets', 'users', 'professionals'), _search_indexes()))
+
+
+def _bind_backend():
+    from . import db
+    return search_backend(db.session.get_bind().dialect.name)
+
+
+def search_filter(kind, search_text, model=None):
+    """
+    WHERE clause for the 'tickets', 'users' or 'professionals' search box.
+    `model` may name a table with the same columns but no index of its own
+    (TicketArchive), which is searched with ILIKE.
+    """
+    index = search_indexes()[kind]
+    if model is not None and model is not index.model:
+        index = SearchIndex(index.name, model, index.fields, index.source, index.related)
+        return index.filter(search_text, None)
+    return index.filter(search_text, _bind_backend())
+
+
+def ranked_search(kind, query, search_text):
+    """`query` narrowed to matches of `search_text`, most relevant first."""
+    return search_indexes()[kind].ranked(query, search_text, _bind_backend())
+
+
+# ==================== SCHEMA ====================
+
+def install_search(connection):
+    """Create the search indexes (and FTS5 triggers) on `connection`; safe to repeat."""
+    backend = search_backend(connection.dialect.name)
+    if backend == 'postgresql':
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS idx_room_number_trgm ON rooms USING gin (number gin_trgm_ops)"))
+    for index in search_indexes().values():
+        for statement in index.create_statements(backend):
+            connection.execute(text(statement))
+
+
+def uninstall_search(connection):
+    backend = search_backend(connection.dialect.name)
+    if backend == 'postgresql':
+        connection.execute(text("DROP INDEX IF EXISTS idx_room_number_trgm"))
+    for index in search_indexes().values():
+        for statement in index.drop_statements(backend):
+            connection.execute(text(statement))
+
+
+def rebuild_search_index(connection=None):
+    """
+    Refill the FTS5 tables from their source tables; returns rows indexed
+    (0 on Postgres, whose indexes need no rebuild). Without a connection the
+    session's is used and committed.
+    """
+    from . import db
+    own_session = connection is None
+    if own_session:
+        connection = db.session.connection()
+    if search_backend(connection.dialect.name) != 'fts5':
+        return 0
+
+    indexed = 0
+    for index in search_indexes().values():
+        names = ', '.join(name for name, _ in index.fields)
+        connection.execute(text(f"DELETE FROM {index.name}"))
+        indexed += connection.execute(text(f"INSERT INTO {index.name}(rowid, {names}) {index.source}")).rowcount
+    if own_session:
+        db.session.commit()
+    return indexed
+
+
+def ensure_search_index():
+    """Install the search indexes on an existing database and fill empty FTS5 tables."""
+    from . import db
+    connection = db.session.connection()
+    install_search(connection)
+    if search_backend(connection.dialect.name) == 'fts5':
+        stale = [
+            index for index in search_indexes().values()
+            if connection.execute(text(f"SELECT 1 FROM {index.name} LIMIT 1")).first() is None
+            and connection.execute(text(f"SELECT 1 FROM {index.base_table} LIMIT 1")).first() is not None
+        ]
+        if stale:
+            logger.info(f"Search index backfilled with {rebuild_search_index(connection)} rows.")
+    db.session.commit()
+
+
+def _after_create(target, connection, **kw):
+    install_search(connection)
+
+
+def _before_drop(target, connection, **kw):
+    uninstall_search(connection)
+
+
+def register_search_listeners():
+    """Create and drop the search indexes with db.create_all() / db.drop_all()."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    from . import db
+    event.listen(db.metadata, 'after_create', _after_create)
+    event.listen(db.metadata, 'before_drop', _before_drop)
+    _listeners_registered = True
@@ -0,0 +1,171 @@
+"""
+Projection Serializers for FixLink.
+Each list view declares the ticket fields it needs once, as a
+TicketProjection. From that declaration the projection builds either:
+
+- a column-only select with just the outer joins those fields need, whose
+  row tuples become dicts directly (no ORM objects, no lazy loads), or
+- the eager-load options for views that still render ORM objects.
+
+Either way serializing N tickets is one query instead of up to 5N lazy
+loads through Ticket.to_dict(). Both accept a ticket source other than
+Ticket, such as the live + archived union from archive.ticket_source().
+"""
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import aliased, joinedload
+from . import db
+from .models import Ticket, Room, Floor, Asset, Professional
+
+_AssignedProfessional = aliased(Professional, name='assigned_professional')
+_CancelledByProfessional = aliased(Professional, name='cancelled_by_professional')
+
+# Join path -> (joined entity, onclause given the ticket source, parent path, relationship name), in join order
+_JOINS = {
+    'room': (Room, lambda t: t.room_id == Room.id, None, 'room'),
+    'room.floor': (Floor, lambda t: Room.floor_id == Floor.id, 'room', 'floor'),
+    'asset': (Asset, lambda t: t.asset_id == Asset.id, None, 'asset'),
+    'assigned_professional': (
+        _AssignedProfessional, lambda t: t.assigned_professional_id == _AssignedProfessional.id,
+        None, 'assigned_professional'
+    ),
+    'cancelled_by_professional': (
+        _CancelledByProfessional, lambda t: t.cancelled_by_professional_id == _CancelledByProfessional.id,
+        None, 'cancelled_by_professional'
+    ),
+}
+
+# Field name -> (SQL expression, None for the ticket source's own column; join path it needs)
+_FIELDS = {
+    name: (None, None) for name in (
+        'id', 'room_id', 'asset_id', 'assigned_professional_id', 'cancelled_by_professional_id',
+        'issue_type', 'description', 'image_filename', 'complexity', 'time_limit_hours',
+        'deadline_datetime', 'job_started_at', 'job_completed_at', 'completion_photo_filename',
+        'cancellation_reason', 'cancelled_at', 'reporter_id', 'reporter_name', 'prn', 'reporter_email',
+        'status', 'created_at', 'updated_at', 'fixed_at', 'rating', 'rating_comment',
+    )
+}
+_FIELDS.update({
+    'room_number': (Room.number, 'room'),
+    'room_floor_id': (Room.floor_id, 'room'),
+    'floor_name': (Floor.name, 'room.floor'),
+    'asset_name': (Asset.name, 'asset'),
+    'assigned_professional_name': (_AssignedProfessional.name, 'assigned_professional'),
+    'assigned_professional_category': (_AssignedProfessional.category, 'assigned_professional'),
+    'cancelled_by_professional_name': (_CancelledByProfessional.name, 'cancelled_by_professional'),
+    'cancelled_by_professional_category': (_CancelledByProfessional.category, 'cancelled_by_professional'),
+})
+
+# Field name -> (fields it is computed from, function of those values)
+_COMPUTED = {
+    'is_overdue': (('deadline_datetime', 'status'), Ticket.compute_is_overdue),
+    'time_remaining': (('deadline_datetime', 'status'), Ticket.compute_time_remaining),
+}
+
+
+def _isoformat(value):
+    return value.isoformat() + 'Z' if isinstance(value, datetime) else value
+
+
+class TicketProjection:
+    """
+    The ticket fields one view needs. With iso_dates (the JSON default)
+    datetimes are formatted like Ticket.to_dict(); templates pass
+    iso_dates=False to keep datetime objects for their filters.
+    """
+
+    def __init__(self, fields, iso_dates=True):
+        unknown = [name for name in fields if name not in _FIELDS and name not in _COMPUTED]
+        if unknown:
+            raise ValueError(f"Unknown ticket fields: {', '.join(unknown)}")
+        self.fields = tuple(fields)
+        self.iso_dates = iso_dates
+
+        columns = []
+        for name in self.fields:
+            for column in _COMPUTED[name][0] if name in _COMPUTED else (name,):
+                if column not in columns:
+                    columns.append(column)
+        self.columns = tuple(columns)
+
+        paths = set()
+        for name in self.columns:
+            path = _FIELDS[name][1]
+            while path:
+                paths.add(path)
+                path = _JOINS[path][2]
+        self.join_paths = tuple(path for path in _JOINS if path in paths)
+
+    def select(self, source=Ticket):
+        """Column-only select of this projection; add filters and ordering on `source` columns."""
+        expressions = [
+            (getattr(source, name) if _FIELDS[name][0] is None else _FIELDS[name][0]).label(name)
+            for name in self.columns
+        ]
+        stmt = select(*expressions).select_from(source)
+        for path in self.join_paths:
+            target, onclause = _JOINS[path][:2]
+            stmt = stmt.outerjoin(target, onclause(source))
+        return stmt
+
+    def to_dict(self, row):
+        values = row._mapping
+        data = {}
+        for name in self.fields:
+            if name in _COMPUTED:
+                sources, compute = _COMPUTED[name]
+                value = compute(*(values[source] for source in sources))
+            else:
+                value = values[name]
+            data[name] = _isoformat(value) if self.iso_dates else value
+        return data
+
+    def all(self, stmt):
+        """Run a select built from select() and return one dict per row."""
+        return [self.to_dict(row) for row in db.session.execute(stmt)]
+
+    def first(self, stmt):
+        row = db.session.execute(stmt.limit(1)).first()
+        return self.to_dict(row) if row is not None else None
+
+    def load_options(self, source=Ticket):
+        """joinedload() options covering the relationships behind this projection's fields."""
+        options = []
+        for path in self.join_paths:
+            if any(other.startswith(path + '.') for other in self.join_paths):
+                continue  # loaded as part of a longer chain
+            chain = []
+            while path:
+                parent = _JOINS[path][2]
+                owner = source if parent is None else _JOINS[parent][0]
+                chain.insert(0, getattr(owner, _JOINS[path][3]))
+                path = parent
+            option = joinedload(chain[0])
+            for relationship in chain[1:]:
+                option = option.joinedload(relationship)
+            options.append(option)
+        return options
+
+
+# Same keys, order and formatting as Ticket.to_dict()
+TICKET_DETAIL = TicketProjection([
+    'id', 'room_id', 'room_number', 'room_floor_id', 'floor_name', 'asset_id', 'asset_name',
+    'assigned_professional_id', 'assigned_professional_name', 'assigned_professional_category',
+    'cancelled_by_professional_id', 'cancelled_by_professional_name', 'cancelled_by_professional_category',
+    'issue_type', 'description', 'image_filename', 'complexity', 'time_limit_hours', 'deadline_datetime',
+    'job_started_at', 'job_completed_at', 'completion_photo_filename', 'cancellation_reason', 'cancelled_at',
+    'reporter_name', 'prn', 'reporter_email', 'status', 'created_at', 'updated_at', 'fixed_at',
+    'is_overdue', 'time_remaining', 'rating', 'rating_comment',
+])
+
+# admin/professional_history.html job rows
+PROFESSIONAL_HISTORY_JOB = TicketProjection([
+    'id', 'issue_type', 'room_number', 'job_completed_at', 'completion_photo_filename',
+    'cancelled_at', 'cancellation_reason',
+], iso_dates=False)
+
+# Ticket objects rendered by admin.html
+ADMIN_DASHBOARD_TICKET = TicketProjection(['room_number', 'floor_name', 'assigned_professional_name'])
+
+# Ticket objects rendered by the professional dashboard and history pages
+PROFESSIONAL_TASK = TicketProjection(['room_number', 'floor_name'])
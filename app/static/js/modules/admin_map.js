@@ -4,11 +4,18 @@
 
 import { renderFloorMap } from './render.js';
 
+// How often the live map asks for rooms changed since its version
+const REFRESH_INTERVAL_MS = 30000;
+
+// Snapshot currently rendered, patched in place by refreshAdminMap()
+const mapState = { floorId: null, level: null, version: null, rooms: [] };
+let refreshTimer = null;
+
 /**
  * Initialize the Admin Map view.
  * @param {number} floorId 
  */
-export async function initializeAdminMap(floorId, initialData = null, floorLevel = null) {
+export async function initializeAdminMap(floorId, initialData = null, floorLevel = null, initialVersion = null) {
     const container = document.getElementById('adminMapContainer');
     if (!container || !floorId) return;
 
@@ -32,8 +39,17 @@ export async function initializeAdminMap(floorId, initialData = null, floorLevel
         }
     };
 
+    const startLiveUpdates = (rooms, level, version) => {
+        Object.assign(mapState, { floorId, level, version, rooms });
+        if (refreshTimer) clearInterval(refreshTimer);
+        refreshTimer = setInterval(() => {
+            if (!document.hidden) refreshAdminMap();
+        }, REFRESH_INTERVAL_MS);
+    };
+
     if (initialData && floorLevel !== null) {
         renderData(initialData, floorLevel);
+        startLiveUpdates(initialData, floorLevel, initialVersion);
         return;
     }
 
@@ -46,6 +62,7 @@ export async function initializeAdminMap(floorId, initialData = null, floorLevel
         if (result.success) {
             const data = result.data || result;
             renderData(data.rooms, data.floor.level);
+            startLiveUpdates(data.rooms, data.floor.level, data.version ?? null);
         } else {
             renderError(container, result.error || 'Failed to load floor data');
         }
@@ -54,6 +71,45 @@ export async function initializeAdminMap(floorId, initialData = null, floorLevel
     }
 }
 
+/**
+ * Fetch only the rooms that changed since the rendered version and re-render.
+ * The server sends the full floor instead when it can no longer diff from our version.
+ */
+export async function refreshAdminMap() {
+    const container = document.getElementById('adminMapContainer');
+    if (!container || !mapState.floorId) return;
+
+    const since = mapState.version !== null ? `?since=${mapState.version}` : '';
+    try {
+        const response = await fetch(`/api/rooms/floor/${mapState.floorId}/changes${since}`);
+        const result = await response.json();
+        if (!result.success) return;
+
+        const { version, full, rooms, removed } = result.data;
+        if (!full && rooms.length === 0 && removed.length === 0) {
+            mapState.version = version;
+            return;
+        }
+
+        if (full) {
+            mapState.rooms = rooms;
+        } else {
+            const changed = new Map(rooms.map(room => [room.id, room]));
+            const gone = new Set(removed);
+            mapState.rooms = mapState.rooms
+                .filter(room => !gone.has(room.id))
+                .map(room => changed.get(room.id) || room);
+            const known = new Set(mapState.rooms.map(room => room.id));
+            rooms.forEach(room => { if (!known.has(room.id)) mapState.rooms.push(room); });
+        }
+        mapState.version = version;
+        container.innerHTML = '';
+        renderFloorMap(container, mapState.rooms, mapState.level.toString(), true);
+    } catch (error) {
+        console.error('Failed to refresh floor map:', error);
+    }
+}
+
 /**
  * Fetch and display room status details in the side panel.
  */
@@ -238,7 +294,8 @@ export async function assignTechnician(ticketId) {
         });
         const result = await response.json();
         if (result.success) {
-            location.reload(); 
+            closeRoomDetails();
+            await refreshAdminMap();
         } else {
             alert('Error: ' + result.error);
         }
@@ -257,7 +314,10 @@ export async function completeTicket(ticketId) {
             body: JSON.stringify({ status: 'fixed' })
         });
         const result = await response.json();
-        if (result.success) location.reload();
+        if (result.success) {
+            closeRoomDetails();
+            await refreshAdminMap();
+        }
     } catch (e) { console.error(e); }
 }
 
@@ -272,7 +332,10 @@ export async function deleteTicketFromMap(ticketId) {
             }
         });
         const result = await response.json();
-        if (result.success) location.reload();
+        if (result.success) {
+            closeRoomDetails();
+            await refreshAdminMap();
+        }
     } catch (e) { console.error(e); }
 }
 
@@ -306,3 +369,4 @@ window.deleteTicketFromMap = deleteTicketFromMap;
 window.toggleAssignForm = toggleAssignForm;
 window.closeRoomDetails = closeRoomDetails;
 window.showRoomDetails = showRoomDetails;
+window.refreshAdminMap = refreshAdminMap;
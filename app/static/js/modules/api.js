@@ -2,19 +2,29 @@
  * Map API Module - Handles all backend communication for the interactive map.
  */
 
+// Last rooms payload per floor with its ETag, revalidated on every floor switch
+const floorRoomsCache = new Map();
+
 /**
  * Fetch rooms for a specific floor.
+ * Sends the last ETag as If-None-Match and reuses the cached rooms on a 304.
  * @param {number|string} floorId 
  * @returns {Promise<Array>} List of rooms
  */
 export async function fetchRoomsByFloor(floorId) {
-    const response = await fetch(`/api/rooms/floor/${floorId}`);
+    const cached = floorRoomsCache.get(String(floorId));
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(`/api/rooms/floor/${floorId}`, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) return cached.rooms;
     if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
     const result = await response.json();
     if (!result.success) throw new Error(result.error || 'Failed to load rooms');
     
     // The standardized API returns {success: true, data: {rooms: [...]}}
-    return result.data.rooms || [];
+    const rooms = result.data.rooms || [];
+    const etag = response.headers.get('ETag');
+    if (etag) floorRoomsCache.set(String(floorId), { etag, rooms });
+    return rooms;
 }
 
 /**
@@ -0,0 +1,224 @@
+"""
+Ticket Rollup for FixLink.
+Maintains ticket_daily_rollup, one row per (day, floor, issue type, status),
+so the analytics dashboard sums a few hundred rollup rows per range instead
+of counting, grouping and averaging the raw tickets table on every load.
+
+What a ticket contributes (ticket_contributions):
+- to the row of the day it was created, under its current status:
+  created_count 1, and when fixed with job_completed_at set, its
+  created -> completed time to resolution_seconds / resolution_count
+- when fixed, to the 'fixed' row of the day it was fixed: fixed_count 1
+
+Every flush that writes a ticket moves those contributions; the listeners,
+checks and rebuild are materialized.py's. Rows whose counters fall back to
+zero are kept for reuse. Each day whose rows move also gets a new version
+in ticket_day_versions, which is what cached analytics are validated
+against (day_versions, versions_digest). Archiving deletes tickets with
+Core, so archived tickets keep counting; the recount reads tickets_archive
+too.
+"""
+import time
+import hashlib
+import itertools
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, insert, inspect, or_, select, update
+from .materialized import MaterializedTable, committed_value, conflict_insert
+
+KEY_COLUMNS = ('day', 'floor_id', 'issue_type', 'status')
+COUNT_COLUMNS = ('created_count', 'fixed_count', 'resolution_count', 'resolution_seconds')
+
+# Ticket attributes a ticket's contribution depends on
+TICKET_FIELDS = ('room_id', 'issue_type', 'status', 'created_at', 'fixed_at', 'job_completed_at')
+
+
+def ticket_contributions(values, floor_id):
+    """Yield (key, column, amount) for what one ticket adds to ticket_daily_rollup."""
+    from .models import Ticket
+
+    fixed = values['status'] == Ticket.STATUS_FIXED
+    if values['created_at'] is not None:
+        key = (values['created_at'].date(), floor_id, values['issue_type'], values['status'])
+        yield key, 'created_count', 1
+        if fixed and values['job_completed_at'] is not None:
+            yield key, 'resolution_count', 1
+            yield key, 'resolution_seconds', (values['job_completed_at'] - values['created_at']).total_seconds()
+    if fixed and values['fixed_at'] is not None:
+        yield (values['fixed_at'].date(), floor_id, values['issue_type'], values['status']), 'fixed_count', 1
+
+
+def _on_days(model, days):
+    """Tickets created or fixed on any of `days`."""
+    ranges = []
+    for day in days:
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        ranges.append(and_(model.created_at >= start, model.created_at < end))
+        ranges.append(and_(model.fixed_at >= start, model.fixed_at < end))
+    return or_(*ranges)
+
+
+def count_ticket_rollup(connection, days=None):
+    """Recount {key: {column: value}} from tickets and tickets_archive, for every day or just `days`."""
+    from .models import Room, Ticket, TicketArchive
+
+    # Older migrations run before tickets_archive exists
+    models = [Ticket]
+    if inspect(connection).has_table(TicketArchive.__tablename__):
+        models.append(TicketArchive)
+    if days is not None:
+        days = set(days)
+
+    counts = defaultdict(lambda: dict.fromkeys(COUNT_COLUMNS, 0))
+    for model in models:
+        tickets = select(*(getattr(model, field) for field in TICKET_FIELDS), Room.floor_id).join(
+            Room, Room.id == model.room_id
+        )
+        if days is not None:
+            tickets = tickets.where(_on_days(model, days))
+        for row in connection.execute(tickets):
+            for key, column, amount in ticket_contributions(row._mapping, row.floor_id):
+                if days is None or key[0] in days:
+                    counts[key][column] += amount
+    return dict(counts)
+
+
+# ==================== TRANSACTIONAL MAINTENANCE ====================
+
+def _floor_ids(session, connection, room_ids):
+    """{room_id: floor_id}, from rooms already in the session where possible."""
+    from .models import Room
+
+    floors = {}
+    mapper = inspect(Room)
+    for room_id in room_ids:
+        room = session.identity_map.get(mapper.identity_key_from_primary_key((room_id,)))
+        if room is not None and 'floor_id' in inspect(room).dict:
+            floors[room_id] = room.floor_id
+    missing = set(room_ids) - set(floors)
+    if missing:
+        floors.update(connection.execute(select(Room.id, Room.floor_id).where(Room.id.in_(missing))).all())
+    return floors
+
+
+def _count_deltas(session, connection):
+    """Collect {key: Counter(column -> delta)} for the tickets in this flush."""
+    from .models import Ticket
+
+    changes = []
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Ticket):
+            continue
+
+        state = inspect(obj)
+        before = None if obj in session.new else {field: committed_value(state, field) for field in TICKET_FIELDS}
+        after = None if obj in session.deleted else {field: state.dict.get(field) for field in TICKET_FIELDS}
+        if before != after:
+            changes.append((before, after))
+    if not changes:
+        return {}
+
+    room_ids = {values['room_id'] for change in changes for values in change if values is not None}
+    floors = _floor_ids(session, connection, room_ids - {None})
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None or values['room_id'] not in floors:
+                continue
+            for key, column, amount in ticket_contributions(values, floors[values['room_id']]):
+                deltas[key][column] += sign * amount
+    return {key: counts for key, counts in deltas.items() if any(counts.values())}
+
+
+def _apply_deltas(connection, deltas):
+    """Apply counter deltas; keys without a row yet get one recounted from scratch."""
+    table = TICKET_ROLLUP.table
+    now = datetime.utcnow()
+
+    def update_row(key, delta):
+        values = {column: table.c[column] + delta[column] for column in COUNT_COLUMNS if delta[column]}
+        return connection.execute(
+            update(table).where(*(table.c[name] == value for name, value in zip(KEY_COLUMNS, key))).values(
+                **values, updated_at=now
+            )
+        ).rowcount
+
+    TICKET_ROLLUP.write_deltas(
+        connection, deltas, update_row, lambda keys: count_ticket_rollup(connection, {key[0] for key in keys}), now=now
+    )
+    _bump_day_versions(connection, {key[0] for key in deltas})
+
+
+def _bump_day_versions(connection, days):
+    """Give each of `days` a new version, newer than both its last one and the clock."""
+    from .models import TicketDayVersion
+    table = TicketDayVersion.__table__
+
+    now_ns = time.time_ns()
+    version = case((table.c.version >= now_ns, table.c.version + 1), else_=now_ns)
+    statement = conflict_insert(connection, table)
+    if statement is not None:
+        # Upserts, so two transactions writing a day's first version cannot collide
+        for day in days:
+            connection.execute(statement.values(day=day, version=now_ns).on_conflict_do_update(
+                index_elements=['day'], set_={'version': version}
+            ))
+        return
+
+    missing = []
+    for day in days:
+        result = connection.execute(update(table).where(table.c.day == day).values(version=version))
+        if result.rowcount == 0:
+            missing.append({'day': day, 'version': now_ns})
+    if missing:
+        connection.execute(insert(table), missing)
+
+
+def day_versions(start_day, end_day=None):
+    """{day: version} for the days from `start_day` up to `end_day` (exclusive; None for no end)."""
+    from . import db
+    from .models import TicketDayVersion
+
+    query = select(TicketDayVersion.day, TicketDayVersion.version).where(TicketDayVersion.day >= start_day)
+    if end_day is not None:
+        query = query.where(TicketDayVersion.day < end_day)
+    return dict(db.session.execute(query).all())
+
+
+def versions_digest(versions, start_day, end_day):
+    """Digest of the `versions` of the days from `start_day` up to `end_day`; days without one are skipped."""
+    digest = hashlib.md5()
+    day = start_day
+    while day < end_day:
+        if day in versions:
+            digest.update(f'{day}={versions[day]};'.encode())
+        day += timedelta(days=1)
+    return digest.hexdigest()
+
+
+def _apply_flush(session, connection):
+    deltas = _count_deltas(session, connection)
+    if deltas:
+        _apply_deltas(connection, deltas)
+    return set(deltas)
+
+
+def _version_days(session, connection, keys):
+    if keys is not None:
+        _bump_day_versions(connection, {key[0] for key in keys})
+        return
+    # A rebuild may have changed any day, including days that no longer have tickets
+    from .models import TicketDailyRollup, TicketDayVersion
+    days = set(connection.execute(select(TicketDayVersion.day)).scalars())
+    days.update(connection.execute(select(TicketDailyRollup.day).distinct()).scalars())
+    _bump_day_versions(connection, days)
+
+
+TICKET_ROLLUP = MaterializedTable(
+    'ticket_daily_rollup', 'TicketDailyRollup', source='Ticket', columns=COUNT_COLUMNS,
+    recount=count_ticket_rollup, apply=_apply_flush, load={'Ticket': TICKET_FIELDS},
+    written=_version_days, zero_rows=True
+)
+check_ticket_rollup = TICKET_ROLLUP.check
+rebuild_ticket_rollup = TICKET_ROLLUP.rebuild
@@ -230,6 +230,17 @@ def send_password_reset_email(email, name, reset_link):
 # Web Push Utilities
 # ==============================================================================
 
+def record_push_result(sub, delivered):
+    """Track consecutive delivery failures so retention can drop dead subscriptions."""
+    from . import db
+    from datetime import datetime
+    if delivered:
+        sub.failure_count = 0
+    else:
+        sub.failure_count = (sub.failure_count or 0) + 1
+        sub.last_failure_at = datetime.utcnow()
+    db.session.commit()
+
 def send_web_push(user_id=None, professional_id=None, title="New Notification", body="", url="/"):
     """
     Sends a Web Push notification to a specific user or professional using pywebpush.
@@ -260,6 +271,8 @@ def send_web_push(user_id=None, professional_id=None, title="New Notification",
                     vapid_private_key=vapid_private_key,
                     vapid_claims=vapid_claims
                 )
+                if sub.failure_count:
+                    record_push_result(sub, delivered=True)
             except WebPushException as ex:
                 logger.error(f"WebPushException: {repr(ex)}")
                 # If Gone (unsubscribed), remove from DB
@@ -267,6 +280,8 @@ def send_web_push(user_id=None, professional_id=None, title="New Notification",
                     from . import db
                     db.session.delete(sub)
                     db.session.commit()
+                else:
+                    record_push_result(sub, delivered=False)
                 success = False
         return success
     except Exception as e:
@@ -0,0 +1,158 @@
+"""
+Cache Warmer for FixLink.
+Pre-builds the floor map snapshots (layout + occupancy) and admin floor
+payloads so the first users after a deploy, cache.clear() or a write do not
+pay for the cold queries.
+
+- Startup: every floor is warmed in a background thread.
+- After a commit invalidates floors, they are re-warmed after a short,
+  debounced delay.
+- On Vercel no background threads are started; pending floors are warmed a
+  few at a time after a response has been sent.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from .cache import register_commit_hook
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 2
+
+# Seconds to wait after an invalidation so a burst of writes is warmed once
+DEFAULT_DELAY = 2
+
+# Floors warmed per request when running lazily on Vercel
+LAZY_BATCH = 2
+
+
+def warm_floor(floor_id):
+    """Build and cache everything the map and admin views need for one floor."""
+    from .cache import get_cached_floor_info
+    from .floor_changes import get_floor_snapshot
+    get_cached_floor_info(floor_id)
+    get_floor_snapshot(floor_id)
+
+
+class CacheWarmer:
+    """Warms floors with bounded concurrency, in the background or lazily."""
+
+    def __init__(self, app, concurrency=DEFAULT_CONCURRENCY, delay=DEFAULT_DELAY, lazy=False):
+        self.app = app
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.lazy = lazy
+        self._pending = set()
+        self._pending_all = False
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _warm_one(self, floor_id):
+        with self.app.app_context():
+            try:
+                warm_floor(floor_id)
+            except Exception as e:
+                logger.warning(f"Cache warm failed for floor {floor_id}: {e}")
+
+    def warm_floors(self, floor_ids):
+        """Warm the given floors now, `concurrency` at a time, and wait for them."""
+        floor_ids = list(floor_ids)
+        if self.concurrency == 1 or len(floor_ids) <= 1:
+            for floor_id in floor_ids:
+                self._warm_one(floor_id)
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='cache-warmer') as executor:
+            list(executor.map(self._warm_one, floor_ids))
+
+    def all_floor_ids(self):
+        from .models import Floor
+        from . import db
+        with self.app.app_context():
+            return list(db.session.execute(db.select(Floor.id).order_by(Floor.level)).scalars())
+
+    def warm_all(self):
+        try:
+            floor_ids = self.all_floor_ids()
+        except Exception as e:
+            logger.warning(f"Cache warm skipped: {e}")
+            return
+        self.warm_floors(floor_ids)
+        logger.info(f"Cache warmed for {len(floor_ids)} floors.")
+
+    def schedule(self, floor_ids):
+        """Queue floors for re-warming; in background mode they are warmed after `delay`."""
+        with self._lock:
+            self._pending.update(floor_ids)
+            if self.lazy or self._timer is not None or not self._pending:
+                return
+            self._timer = threading.Timer(self.delay, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def take_pending(self, limit=None):
+        with self._lock:
+            floor_ids = sorted(self._pending)[:limit]
+            self._pending.difference_update(floor_ids)
+            self._timer = None
+            return floor_ids
+
+    def _flush(self):
+        self.warm_floors(self.take_pending())
+
+    def start(self):
+        """Warm every floor in a background thread, or on the first requests in lazy mode."""
+        if self.lazy:
+            self._pending_all = True
+            return
+        threading.Thread(target=self.warm_all, name='cache-warmer-startup', daemon=True).start()
+
+    def has_pending(self):
+        return self._pending_all or bool(self._pending)
+
+    def warm_lazily(self):
+        """Warm a small batch of pending floors; run after a response is sent."""
+        with self._lock:
+            resolve_all, self._pending_all = self._pending_all, False
+        if resolve_all:
+            try:
+                self.schedule(self.all_floor_ids())
+            except Exception as e:
+                logger.warning(f"Cache warm skipped: {e}")
+        for floor_id in self.take_pending(LAZY_BATCH):
+            self._warm_one(floor_id)
+
+
+def _rewarm_after_commit(session, bumped):
+    warmer = current_app.extensions.get('fixlink_cache_warmer')
+    if warmer and bumped:
+        warmer.schedule(bumped)
+
+
+def init_warmer(app):
+    """
+    Start the cache warmer for the app. Disabled under TESTING unless
+    CACHE_WARMER_ENABLED is set; concurrency comes from CACHE_WARM_CONCURRENCY.
+    """
+    app.config.setdefault('CACHE_WARMER_ENABLED', not app.config.get('TESTING'))
+    app.config.setdefault('CACHE_WARM_CONCURRENCY', int(os.environ.get('CACHE_WARM_CONCURRENCY', DEFAULT_CONCURRENCY)))
+    app.config.setdefault('CACHE_WARM_DELAY', DEFAULT_DELAY)
+    if not app.config['CACHE_WARMER_ENABLED']:
+        return None
+
+    lazy = bool(os.environ.get('VERCEL'))
+    warmer = CacheWarmer(app, app.config['CACHE_WARM_CONCURRENCY'], app.config['CACHE_WARM_DELAY'], lazy=lazy)
+    app.extensions['fixlink_cache_warmer'] = warmer
+    register_commit_hook(_rewarm_after_commit)
+
+    if lazy:
+        # Vercel freezes background threads between invocations
+        @app.after_request
+        def warm_after_response(response):
+            if warmer.has_pending():
+                response.call_on_close(warmer.warm_lazily)
+            return response
+
+    warmer.start()
+    return warmer
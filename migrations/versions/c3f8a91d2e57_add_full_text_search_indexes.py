@@ -0,0 +1,123 @@
+"""Add full-text search indexes for tickets, users and professionals
+
+Revision ID: c3f8a91d2e57
+Revises: b7c2e4f19a03
+Create Date: 2026-10-17 15:02:11.604873
+
+"""
+import sqlite3
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a91d2e57'
+down_revision = 'b7c2e4f19a03'
+branch_labels = None
+depends_on = None
+
+# The DDL is spelled out as it stood at this revision, independent of app/search.py
+
+TICKET_DOCUMENT = ("coalesce(reporter_name, '') || ' ' || coalesce(prn, '') || ' ' || coalesce(reporter_email, '') "
+                   "|| ' ' || coalesce(issue_type, '') || ' ' || coalesce(description, '')")
+USER_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(prn, '') || ' ' || coalesce(email, '')"
+PROFESSIONAL_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(phone, '') || ' ' || coalesce(email, '')"
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_room_number_trgm ON rooms USING gin (number gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_ticket_search_tsv ON tickets USING gin ((to_tsvector('simple', {TICKET_DOCUMENT})))",
+    f"CREATE INDEX IF NOT EXISTS idx_ticket_search_trgm ON tickets USING gin (({TICKET_DOCUMENT}) gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_user_search_tsv ON users USING gin ((to_tsvector('simple', {USER_DOCUMENT})))",
+    f"CREATE INDEX IF NOT EXISTS idx_user_search_trgm ON users USING gin (({USER_DOCUMENT}) gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_professional_search_tsv ON professionals "
+    f"USING gin ((to_tsvector('simple', {PROFESSIONAL_DOCUMENT})))",
+    f"CREATE INDEX IF NOT EXISTS idx_professional_search_trgm ON professionals "
+    f"USING gin (({PROFESSIONAL_DOCUMENT}) gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS idx_room_number_trgm",
+    *(f"DROP INDEX IF EXISTS idx_{name}_search_{kind}"
+      for name in ('ticket', 'user', 'professional') for kind in ('tsv', 'trgm')),
+]
+
+TICKET_REINDEX = ("INSERT INTO ticket_search(rowid, room_number, reporter_name, prn, reporter_email, issue_type, description) "
+                  "SELECT t.id, r.number, t.reporter_name, t.prn, t.reporter_email, t.issue_type, t.description "
+                  "FROM tickets t LEFT JOIN rooms r ON r.id = t.room_id")
+USER_REINDEX = "INSERT INTO user_search(rowid, name, prn, email) SELECT t.id, t.name, t.prn, t.email FROM users t"
+PROFESSIONAL_REINDEX = ("INSERT INTO professional_search(rowid, name, phone, email) "
+                        "SELECT t.id, t.name, t.phone, t.email FROM professionals t")
+
+FTS5_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search USING fts5("
+    "room_number, reporter_name, prn, reporter_email, issue_type, description, tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS ticket_search_ai AFTER INSERT ON tickets BEGIN {TICKET_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS ticket_search_au AFTER UPDATE OF "
+    "id, reporter_name, prn, reporter_email, issue_type, description, room_id ON tickets BEGIN "
+    f"DELETE FROM ticket_search WHERE rowid = OLD.id; {TICKET_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS ticket_search_ad AFTER DELETE ON tickets BEGIN "
+    "DELETE FROM ticket_search WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER IF NOT EXISTS ticket_search_rooms_au AFTER UPDATE OF number ON rooms BEGIN "
+    "DELETE FROM ticket_search WHERE rowid IN (SELECT id FROM tickets WHERE room_id = NEW.id); "
+    f"{TICKET_REINDEX} WHERE t.room_id = NEW.id; END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5(name, prn, email, tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON users BEGIN {USER_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF id, name, prn, email ON users BEGIN "
+    f"DELETE FROM user_search WHERE rowid = OLD.id; {USER_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON users BEGIN "
+    "DELETE FROM user_search WHERE rowid = OLD.id; END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS professional_search USING fts5(name, phone, email, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS professional_search_ai AFTER INSERT ON professionals BEGIN "
+    f"{PROFESSIONAL_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS professional_search_au AFTER UPDATE OF id, name, phone, email ON professionals BEGIN "
+    f"DELETE FROM professional_search WHERE rowid = OLD.id; {PROFESSIONAL_REINDEX} WHERE t.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS professional_search_ad AFTER DELETE ON professionals BEGIN "
+    "DELETE FROM professional_search WHERE rowid = OLD.id; END",
+    # Backfill rows that existed before the triggers
+    "DELETE FROM ticket_search", TICKET_REINDEX,
+    "DELETE FROM user_search", USER_REINDEX,
+    "DELETE FROM professional_search", PROFESSIONAL_REINDEX,
+]
+
+FTS5_DOWNGRADE = [
+    *(f"DROP TRIGGER IF EXISTS ticket_search_{suffix}" for suffix in ('ai', 'au', 'ad', 'rooms_au')),
+    "DROP TABLE IF EXISTS ticket_search",
+    *(f"DROP TRIGGER IF EXISTS user_search_{suffix}" for suffix in ('ai', 'au', 'ad')),
+    "DROP TABLE IF EXISTS user_search",
+    *(f"DROP TRIGGER IF EXISTS professional_search_{suffix}" for suffix in ('ai', 'au', 'ad')),
+    "DROP TABLE IF EXISTS professional_search",
+]
+
+
+def _fts5_available():
+    try:
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5(body, tokenize='trigram')")
+        finally:
+            connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _statements(postgres, fts5):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgres
+    if dialect == 'sqlite' and _fts5_available():
+        return fts5
+    # Other backends keep searching with ILIKE
+    return []
+
+
+def upgrade():
+    # Postgres: tsvector + pg_trgm GIN indexes; SQLite: FTS5 tables and triggers, backfilled
+    for statement in _statements(POSTGRES_UPGRADE, FTS5_UPGRADE):
+        op.execute(sa.text(statement))
+
+
+def downgrade():
+    for statement in _statements(POSTGRES_DOWNGRADE, FTS5_DOWNGRADE):
+        op.execute(sa.text(statement))
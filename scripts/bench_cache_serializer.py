@@ -0,0 +1,116 @@
+"""
+Benchmark the cache serializers on realistic floor payloads.
+
+Compares the old pickle path (cachelib's FileSystemSerializer) with the
+pickle-free CacheSerializer (JSON, msgpack if installed, each with and
+without zlib) on dump time, load time and bytes on disk.
+
+Usage:
+    python scripts/bench_cache_serializer.py [--rooms 20,80,160] [--iterations 2000]
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cachelib.serializers import FileSystemSerializer
+from app.cache_serializer import CacheSerializer, msgpack
+
+ROOM_TYPES = ['classroom', 'lab', 'faculty', 'washroom', 'management', 'lift']
+STATUSES = ['normal', 'normal', 'normal', 'issue', 'in-progress', 'assigned']
+
+
+def floor_layout_entry(room_count, level=4, seed=0):
+    """A tagged map_floor_ entry shaped like get_cached_floor_layout() output."""
+    rng = random.Random(seed)
+    rooms = [{
+        'id': level * 1000 + i,
+        'floor_id': level,
+        'number': f'VY{level}{i:02d}',
+        'name': f'{rng.choice(ROOM_TYPES).title()} {level}{i:02d}',
+        'room_type': rng.choice(ROOM_TYPES),
+        'status': rng.choice(STATUSES),
+        'has_open_tickets': rng.random() < 0.1,
+        'has_broken_assets': rng.random() < 0.05,
+    } for i in range(room_count)]
+    now_ns = time.time_ns()
+    return {
+        'value': rooms,
+        'tags': {'map': now_ns - 10**12, f'floor:{level}': now_ns},
+        'expires_at': time.time() + 24 * 3600,
+    }
+
+
+def floor_snapshot(room_count, level=4, seed=0):
+    """Rooms merged with the occupancy layer, as served by /api/rooms/floor/<id>."""
+    rng = random.Random(seed)
+    rooms = floor_layout_entry(room_count, level, seed)['value']
+    for room in rooms:
+        if rng.random() < 0.4:
+            room['occupancy'] = {
+                'status': 'occupied', 'id': rng.randint(1, 5000), 'type': 'scheduled',
+                'subject': 'Data Structures', 'faculty': 'Dr. A. Kulkarni',
+                'faculty_id': rng.randint(1, 300), 'end_time': '11:00 AM',
+            }
+        else:
+            room['occupancy'] = {'status': 'vacant'}
+    return rooms
+
+
+def measure(serializer, value, iterations):
+    buffer = io.BytesIO()
+    serializer.dump(value, buffer)
+    size = buffer.tell()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serializer.dump(value, io.BytesIO())
+    dump_us = (time.perf_counter() - start) / iterations * 1e6
+
+    data = buffer.getvalue()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serializer.load(io.BytesIO(data))
+    load_us = (time.perf_counter() - start) / iterations * 1e6
+    return size, dump_us, load_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rooms', default='20,80,160', help='Comma-separated rooms per floor')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    serializers = [
+        ('pickle (current)', FileSystemSerializer()),
+        ('json', CacheSerializer('json', compress_threshold=0)),
+        ('json+zlib', CacheSerializer('json')),
+    ]
+    if msgpack:
+        serializers += [
+            ('msgpack', CacheSerializer('msgpack', compress_threshold=0)),
+            ('msgpack+zlib', CacheSerializer('msgpack')),
+        ]
+    else:
+        print('msgpack not installed; skipping msgpack rows.\n')
+
+    for room_count in (int(n) for n in args.rooms.split(',')):
+        payloads = [
+            ('layout entry', floor_layout_entry(room_count)),
+            ('floor snapshot', floor_snapshot(room_count)),
+        ]
+        for label, value in payloads:
+            print(f'{label}, {room_count} rooms')
+            print(f"  {'serializer':<18}{'bytes':>9}{'dump us':>11}{'load us':>11}")
+            for name, serializer in serializers:
+                size, dump_us, load_us = measure(serializer, value, args.iterations)
+                print(f'  {name:<18}{size:>9}{dump_us:>11.1f}{load_us:>11.1f}')
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -17,7 +17,7 @@ import random
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
-from app.models import Building, Floor, Room, Asset
+from app.models import Building, Floor, Room, Asset, RoomStatus
 
 
 def create_vyas_data(app=None):
@@ -42,6 +42,7 @@ def create_vyas_data(app=None):
             # Clear existing data
             print("\n️  Clearing existing data...")
             Asset.query.delete()
+            RoomStatus.query.delete()
             Room.query.delete()
             Floor.query.delete()
             Building.query.delete()
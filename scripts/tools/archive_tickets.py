@@ -0,0 +1,34 @@
+"""
+Move fixed tickets closed more than --days ago into tickets_archive.
+
+The scheduler does this continuously; run it by hand for the first large
+backfill or after changing TICKET_ARCHIVE_AFTER_DAYS.
+
+Usage:
+    python scripts/tools/archive_tickets.py [--days 365] [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app
+from app.archive import archive_closed_tickets
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=None, help="archive tickets closed more than this many days ago")
+    parser.add_argument('--batch-size', type=int, default=None, help="tickets moved per transaction")
+    args = parser.parse_args()
+
+    with app.app_context():
+        moved = archive_closed_tickets(older_than_days=args.days, batch_size=args.batch_size)
+        print(f"Archived {moved} tickets.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Install the full-text search indexes and refill the SQLite FTS5 tables.
+
+Postgres maintains its tsvector/trigram indexes itself, so there the rebuild
+only makes sure they exist.
+
+Usage:
+    python scripts/tools/rebuild_search_index.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app, db
+from app.search import install_search, rebuild_search_index
+
+app = create_app()
+
+
+def main():
+    with app.app_context():
+        connection = db.session.connection()
+        install_search(connection)
+        indexed = rebuild_search_index(connection)
+        db.session.commit()
+        print(f"Search index rebuilt ({indexed} rows indexed).")
+
+
+if __name__ == "__main__":
+    main()
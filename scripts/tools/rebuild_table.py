@@ -0,0 +1,55 @@
+"""
+Backfill or check a materialized table (see app/materialized.py) against its source rows.
+
+Usage:
+    python scripts/tools/rebuild_table.py room_status            # rebuild every row from scratch
+    python scripts/tools/rebuild_table.py room_status --check    # report drifted rows
+    python scripts/tools/rebuild_table.py room_status --repair   # rewrite drifted rows
+    python scripts/tools/rebuild_table.py asset_health --decay   # rescore rows older than ASSET_HEALTH_DECAY_HOURS
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app
+from app.materialized import tables
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('table', choices=sorted(tables()), help='Materialized table to rebuild or check')
+    parser.add_argument('--check', action='store_true', help='Only report rows that differ from a recount')
+    parser.add_argument('--repair', action='store_true', help='Rewrite rows that differ from a recount')
+    parser.add_argument('--decay', action='store_true', help='Only rescore stale rows and source rows without one')
+    parser.add_argument('--hours', type=float, default=None, help='Staleness for --decay (default: the table\'s setting)')
+    args = parser.parse_args()
+    table = tables()[args.table]
+    if args.decay and table.decay is None:
+        parser.error(f"{table.name} has no clock-dependent columns to decay")
+
+    with app.app_context():
+        if args.decay:
+            print(f"Rescored {table.decay(max_age_hours=args.hours)} rows of {table.name}.")
+            return
+        if not args.check and not args.repair:
+            print(f"Rebuilt {table.name} with {table.rebuild()} rows.")
+            return
+
+        mismatches = table.check(repair=args.repair)
+        for mismatch in mismatches:
+            print(f"Row {mismatch['key']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+        if not mismatches:
+            print(f"{table.name} is consistent.")
+        elif args.repair:
+            print(f"Repaired {len(mismatches)} rows.")
+        else:
+            print(f"{len(mismatches)} rows differ; run with --repair to fix them.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch
 from app import create_app, db
+from app.cache import cache
 from app.models import User, Professional
 
 @pytest.fixture(autouse=True)
@@ -13,8 +14,10 @@ def mock_external_services():
         yield
 
 @pytest.fixture
-def app():
+def app(tmp_path, monkeypatch):
     """Create and configure a new app instance for each test using in-memory SQLite."""
+    # Keep the file cache (and its _locks directory) out of the source tree
+    monkeypatch.setenv('CACHE_DIR', str(tmp_path / 'cache'))
     # Override config for testing
     app = create_app('testing')
     app.config.update({
@@ -26,6 +29,8 @@ def app():
 
     # Create the database and the database table
     with app.app_context():
+        # Only clears this test's temporary directory, never the developer's cache
+        cache.clear()
         db.create_all()
         yield app
         db.session.remove()
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from app import db
+from app.archive import archive_closed_tickets, ticket_source
+from app.models import Building, Floor, HelpRequest, Room, Ticket, TicketArchive
+from app.professional_stats import check_professional_stats
+from app.search import search_filter
+from tests.test_serializers import _login_admin
+
+
+def _seed(professional):
+    b = Building(name="Archive Building")
+    f = Floor(level=2, name="2nd Floor", building=b)
+    room = Room(number="AR201", floor=f)
+    db.session.add_all([b, f, room])
+    db.session.commit()
+
+    long_ago, recently = datetime.utcnow() - timedelta(days=400), datetime.utcnow() - timedelta(days=3)
+    ticket = lambda description, status, at, **kw: Ticket(
+        room_id=room.id, issue_type="electrical", description=description, reporter_name="Meera Joshi",
+        prn="3051", reporter_email="meera@mitwpu.edu.in", status=status, created_at=at, updated_at=at, **kw)
+    tickets = {
+        'old': ticket("Old socket repair", Ticket.STATUS_FIXED, long_ago, fixed_at=long_ago, rating=4,
+                      assigned_professional_id=professional.id, job_started_at=long_ago, job_completed_at=long_ago),
+        'recent': ticket("Recent socket repair", Ticket.STATUS_FIXED, recently, fixed_at=recently),
+        'returned': ticket("Handed back", Ticket.STATUS_CANCELLED, long_ago, cancelled_at=long_ago,
+                           cancelled_by_professional_id=professional.id),
+        'helped': ticket("Needed a helper", Ticket.STATUS_FIXED, long_ago, fixed_at=long_ago),
+    }
+    db.session.add_all(tickets.values())
+    db.session.commit()
+    db.session.add(HelpRequest(ticket_id=tickets['helped'].id, requester_professional_id=professional.id))
+    db.session.commit()
+    return {name: t.id for name, t in tickets.items()}
+
+
+def test_archive_moves_only_old_fixed_tickets(app, professional_user):
+    with app.app_context():
+        ids = _seed(professional_user)
+        assert archive_closed_tickets(batch_size=1) == 1
+        assert archive_closed_tickets() == 0
+
+        assert db.session.get(Ticket, ids['old']) is None
+        archived = db.session.get(TicketArchive, ids['old'])
+        assert archived.description == "Old socket repair" and archived.closed_at is not None
+        assert {t.id for t in Ticket.query} == {ids['recent'], ids['returned'], ids['helped']}
+        assert check_professional_stats() == []
+
+        source, criteria = ticket_source(where=lambda t: [t.status == Ticket.STATUS_FIXED])
+        assert {t.id for t in db.session.query(source).filter(*criteria)} == {ids['old'], ids['recent'], ids['helped']}
+        assert ticket_source(since=datetime.utcnow() - timedelta(days=30))[0] is Ticket
+
+        source, criteria = ticket_source(where=lambda t: [search_filter('tickets', 'ar20 socket', model=t)])
+        assert {t.id for t in db.session.query(source).filter(*criteria)} == {ids['old'], ids['recent']}
+
+
+def test_history_views_read_archived_tickets(app, client, admin_user, professional_user):
+    with app.app_context():
+        ids = _seed(professional_user)
+        archive_closed_tickets()
+        _login_admin(client, admin_user)
+
+        assert b'Old socket repair' in client.get('/admin/history').data
+        assert b'Old socket repair' in client.get('/admin/history?search=socket').data
+        jobs = client.get(f'/admin/professionals/{professional_user.id}/history').data
+        assert f"#{ids['old']}<".encode() in jobs and f"#{ids['returned']}<".encode() in jobs
+
+        detail = client.get(f"/admin/ticket/{ids['old']}").get_json()
+        assert detail['data']['ticket']['room_number'] == "AR201"
+
+        start = (datetime.utcnow() - timedelta(days=500)).strftime('%Y-%m-%d')
+        end = datetime.utcnow().strftime('%Y-%m-%d')
+        assert b'Old socket repair' in client.get(f'/admin/reports/export/csv?start_date={start}&end_date={end}').data
+        assert client.get(f'/admin/reports/export/pdf?start_date={start}&end_date={end}').data.startswith(b'%PDF')
+        start = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d')
+        export = client.get(f'/admin/reports/export/csv?start_date={start}&end_date={end}').data
+        assert b'Recent socket repair' in export and b'Old socket repair' not in export
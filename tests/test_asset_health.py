@@ -0,0 +1,133 @@
+import datetime
+from types import SimpleNamespace
+from app import db
+from app.models import Building, Floor, Room, Asset, AssetHealth, Ticket
+from app.analytics import _compute_score_logic, calculate_asset_health, get_critical_assets, score_assets_bulk
+from app.asset_health import decay_asset_health, rebuild_asset_health
+
+
+def _seed_assets():
+    b = Building(name="Health Building")
+    f = Floor(level=1, name="1st Floor", building=b)
+    r = Room(number="AH101", floor=f)
+    two_years_ago = datetime.datetime.utcnow() - datetime.timedelta(days=730)
+    projector = Asset(room=r, name="Projector", asset_type="projector", installation_date=two_years_ago)
+    ac = Asset(room=r, name="AC", asset_type="ac")
+    db.session.add_all([b, f, r, projector, ac])
+    db.session.commit()
+    return r, projector, ac
+
+
+def _ticket(room, asset, **kwargs):
+    return Ticket(room_id=room.id, asset_id=asset.id, issue_type="Electrical", description="Flickering",
+                  reporter_name="Student", prn="1234", reporter_email="s@mitwpu.edu.in", **kwargs)
+
+
+def _live_score(asset):
+    window = datetime.datetime.utcnow() - datetime.timedelta(days=60)
+    tickets = Ticket.query.filter(Ticket.asset_id == asset.id, Ticket.created_at >= window).all()
+    return _compute_score_logic(asset, tickets)
+
+
+def test_asset_health_follows_tickets_and_status(app):
+    """Stored scores move with ticket creates, complexity, moves, deletes and asset status, and roll back with the write."""
+    with app.app_context():
+        r, projector, ac = _seed_assets()
+        assert db.session.get(AssetHealth, ac.id).score == 100
+        assert calculate_asset_health(projector.id) == _live_score(projector)
+
+        ticket = _ticket(r, projector)
+        db.session.add(ticket)
+        db.session.commit()
+        health = db.session.get(AssetHealth, projector.id)
+        assert (health.recent_ticket_count, health.ticket_penalty) == (1, 10)
+
+        ticket.complexity = Ticket.COMPLEXITY_HIGH
+        projector.status = Asset.STATUS_MAINTENANCE
+        db.session.commit()
+        assert (health.ticket_penalty, health.status_penalty) == (20, 20)
+        assert health.score == _live_score(projector)
+
+        # A rolled back write leaves the stored score untouched
+        db.session.add(_ticket(r, ac))
+        db.session.flush()
+        assert db.session.get(AssetHealth, ac.id).recent_ticket_count == 1
+        db.session.rollback()
+        assert db.session.get(AssetHealth, ac.id).recent_ticket_count == 0
+
+        ticket.asset_id = ac.id
+        db.session.commit()
+        assert (db.session.get(AssetHealth, projector.id).ticket_penalty, db.session.get(AssetHealth, ac.id).ticket_penalty) == (0, 20)
+
+        db.session.delete(ticket)
+        db.session.commit()
+        assert calculate_asset_health(ac.id) == 100
+
+        critical = get_critical_assets(5)
+        assert [(a['id'], a['room'], a['status']) for a in critical] == [(projector.id, 'AH101', 'maintenance')]
+        assert critical[0]['score'] == round(_live_score(projector), 1)
+
+        # The list is cached until asset_health, an asset or a room changes
+        projector.name = "Hall Projector"
+        db.session.commit()
+        assert get_critical_assets(5)[0]['name'] == "Hall Projector"
+        projector.status = Asset.STATUS_WORKING
+        db.session.commit()
+        assert [(a['status'], a['score']) for a in get_critical_assets(5)] == [('working', round(_live_score(projector), 1))]
+
+
+def test_decay_pass_ages_out_old_tickets(app):
+    """Tickets leaving the window only count again after the decay pass rescores stale rows."""
+    with app.app_context():
+        r, projector, ac = _seed_assets()
+        ticket = _ticket(r, ac, complexity=Ticket.COMPLEXITY_MEDIUM)
+        db.session.add(ticket)
+        db.session.commit()
+        assert db.session.get(AssetHealth, ac.id).score == 85
+
+        # Bulk writes bypass the listeners; the stored row keeps the old window until it decays
+        long_ago = datetime.datetime.utcnow() - datetime.timedelta(days=90)
+        Ticket.query.filter_by(id=ticket.id).update({'created_at': long_ago})
+        AssetHealth.query.update({'decayed_at': long_ago})
+        db.session.commit()
+        assert calculate_asset_health(ac.id) == 85
+
+        assert decay_asset_health(max_age_hours=24) == 2
+        assert calculate_asset_health(ac.id) == 100
+        assert decay_asset_health(max_age_hours=24) == 0
+
+        # Assets added behind the session's back are scored by the next pass
+        AssetHealth.query.filter_by(asset_id=projector.id).delete()
+        db.session.commit()
+        assert decay_asset_health(max_age_hours=24) == 1
+        assert db.session.get(AssetHealth, projector.id).score == _live_score(projector)
+        assert rebuild_asset_health() == 2
+
+
+def test_bulk_scoring_is_bit_for_bit_the_scalar_path():
+    """Every NumPy score, clamped ones included, has the exact bits of _compute_score_logic."""
+    now = datetime.datetime(2026, 10, 17, 9, 30, 15, 250)
+    assets = [
+        (1, None, Asset.STATUS_WORKING),
+        (2, now - datetime.timedelta(days=1234, seconds=7), Asset.STATUS_BROKEN),
+        (3, now - datetime.timedelta(days=3, hours=23), Asset.STATUS_MAINTENANCE),
+        (4, now + datetime.timedelta(days=400), Asset.STATUS_WORKING),   # installed in the future: clamps at 100
+        (5, now - datetime.timedelta(days=7000), Asset.STATUS_BROKEN),   # worn out: clamps at 0
+        (9, now - datetime.timedelta(days=365, microseconds=1), Asset.STATUS_WORKING),
+    ]
+    complexities = {2: [None, 'low', 'high'], 3: ['medium', 'medium'], 5: ['high'] * 4, 9: ['low']}
+    tickets = [(asset_id, c, 1) for asset_id, cs in complexities.items() for c in cs] + [(42, 'high', 3)]
+
+    columns = score_assets_bulk(assets, tickets, now)
+    expected = [
+        _compute_score_logic(SimpleNamespace(installation_date=installed, status=status),
+                             [SimpleNamespace(complexity=c) for c in complexities.get(asset_id, [])], now)
+        for asset_id, installed, status in assets
+    ]
+    assert columns['asset_id'] == [1, 2, 3, 4, 5, 9]
+    # The scalar path keeps integer arithmetic for assets without an installation date
+    assert [score.hex() for score in columns['score']] == [float(score).hex() for score in expected]
+    assert columns['recent_ticket_count'] == [0, 3, 2, 0, 4, 1]
+
+    grouped = [(2, None, 1), (2, 'low', 1), (2, 'high', 1), (3, 'medium', 2), (5, 'high', 4), (9, 'low', 1)]
+    assert score_assets_bulk(assets, grouped, now) == columns
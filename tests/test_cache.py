@@ -0,0 +1,403 @@
+import threading
+import time
+import pytest
+from app.cache import (
+    cache, cached_tagged, get_tagged, set_tagged, invalidate_tags, rebuild_lock,
+    invalidate_floor_cache, invalidate_all_map_cache, floor_tag, MAP_TAG
+)
+
+
+def test_tag_invalidation_is_scoped(app):
+    """Invalidating one floor's tag misses only the entries that depend on it."""
+    with app.app_context():
+        set_tagged('view_floor_1', ['a'], [MAP_TAG, floor_tag(1)])
+        set_tagged('view_floor_2', ['b'], [MAP_TAG, floor_tag(2)])
+        assert get_tagged('view_floor_1') == ['a']
+
+        invalidate_floor_cache(1)
+        assert get_tagged('view_floor_1') is None
+        assert get_tagged('view_floor_2') == ['b']
+
+        invalidate_all_map_cache()
+        assert get_tagged('view_floor_2') is None
+
+
+def test_cached_tagged_rebuilds_after_invalidation(app):
+    """cached_tagged only calls the builder on a miss."""
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'n': len(calls)}
+
+    with app.app_context():
+        assert cached_tagged('counter', ['ticket:5'], build) == {'n': 1}
+        assert cached_tagged('counter', ['ticket:5'], build) == {'n': 1}
+        invalidate_tags('ticket:5')
+        assert cached_tagged('counter', ['ticket:5'], build) == {'n': 2}
+
+
+def test_evicted_generation_invalidates_dependents(app):
+    """Losing a generation key must never resurrect an entry written under it."""
+    with app.app_context():
+        set_tagged('evictable', 'value', ['room:9'])
+        cache.delete('tag_gen_room:9')
+        assert get_tagged('evictable') is None
+
+
+def test_commit_invalidates_affected_floor_only(app):
+    """Writes to floor-scoped rows invalidate exactly their floor after commit."""
+    import datetime
+    from app import db
+    from app.models import Building, Floor, Room, User, RoomBooking
+
+    with app.app_context():
+        b = Building(name="Cache Building")
+        f1 = Floor(level=1, name="1st Floor", building=b)
+        f2 = Floor(level=2, name="2nd Floor", building=b)
+        r1 = Room(number="CA101", floor=f1)
+        r2 = Room(number="CA201", floor=f2)
+        faculty = User(name="Faculty", email="faculty@mitwpu.edu.in", role=User.ROLE_FACULTY)
+        db.session.add_all([b, f1, f2, r1, r2, faculty])
+        db.session.commit()
+
+        set_tagged('view_floor_1', 'one', [floor_tag(f1.id)])
+        set_tagged('view_floor_2', 'two', [floor_tag(f2.id)])
+
+        slot = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        booking = RoomBooking(room_id=r1.id, faculty_id=faculty.id, date=slot.date(), slot_start=slot)
+        db.session.add(booking)
+        db.session.flush()
+        # Nothing is invalidated until the transaction commits
+        assert get_tagged('view_floor_1') == 'one'
+
+        db.session.commit()
+        assert get_tagged('view_floor_1') is None
+        assert get_tagged('view_floor_2') == 'two'
+
+        # A rolled-back write leaves the cache untouched
+        set_tagged('view_floor_1', 'one', [floor_tag(f1.id)])
+        booking.status = RoomBooking.STATUS_CANCELLED
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        assert get_tagged('view_floor_1') == 'one'
+
+
+def test_concurrent_misses_rebuild_once(app):
+    """Callers missing the same key together share a single rebuild."""
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        return ['rooms']
+
+    def request():
+        with app.app_context():
+            results.append(cached_tagged('sf_floor_1', [floor_tag(1)], build, stale_ttl=0))
+
+    results = []
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [['rooms']] * 4
+    assert len(calls) == 1
+
+
+def test_stale_value_served_while_rebuilding(app):
+    """Within the stale window, a caller that finds the key locked gets the previous value."""
+    with app.app_context():
+        cached_tagged('swr_floor_1', [floor_tag(1)], lambda: 'old', stale_ttl=30)
+        invalidate_floor_cache(1)
+
+        with rebuild_lock('swr_floor_1'):
+            assert cached_tagged('swr_floor_1', [floor_tag(1)], lambda: 'new', stale_ttl=30) == 'old'
+        assert cached_tagged('swr_floor_1', [floor_tag(1)], lambda: 'new', stale_ttl=30) == 'new'
+
+
+def test_cache_stats_endpoint_reports_prefixes(app, client):
+    """Hits, misses and sets are counted per key prefix and exposed to super admins."""
+    with app.app_context():
+        cache.cache.stats.reset()
+        cache.get('map_floor_1')
+        cache.set('map_floor_1', ['room'])
+        cache.get('map_floor_1')
+
+    assert client.get('/developer/api/cache-stats').status_code == 302
+    with client.session_transaction() as sess:
+        sess['is_super_admin'] = True
+    data = client.get('/developer/api/cache-stats').get_json()['data']
+
+    floor_stats = data['prefixes']['map_floor_']
+    assert (floor_stats['hits'], floor_stats['misses'], floor_stats['sets']) == (1, 1, 1)
+    assert floor_stats['hit_ratio'] == 0.5
+    assert floor_stats['max_bytes'] > 0
+
+
+def test_evictions_counted_without_probing_keys(tmp_path, monkeypatch):
+    """Pruning writes count their evictions from the backend's file count alone."""
+    from cachelib import FileSystemCache
+    from app.cache_stats import InstrumentedCache
+
+    backend = FileSystemCache(str(tmp_path), threshold=2)
+    monkeypatch.setattr(backend, 'has', lambda key: pytest.fail('has() probed on set'))
+    instrumented = InstrumentedCache(backend)
+    for i in range(6):
+        instrumented.set(f'count_{i}', i)
+    # The third key puts the cache over its threshold; each later new key prunes one entry
+    assert instrumented.stats.evictions == 3
+    instrumented.set('count_5', 'again')
+    assert instrumented.stats.evictions == 4
+
+
+def test_floor_api_answers_matching_etag_with_304(app, client, student_user):
+    """A revalidation with the current ETag is a 304 without any SQL; writes change the ETag."""
+    from sqlalchemy import event
+    from app import db
+    from app.models import Building, Floor, Room, Asset
+
+    with app.app_context():
+        b = Building(name="ETag Building")
+        f = Floor(level=1, name="1st Floor", building=b)
+        r = Room(number="ET101", floor=f)
+        db.session.add_all([b, f, r])
+        db.session.commit()
+        floor_id, room_id = f.id, r.id
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = student_user.id
+
+    first = client.get(f'/api/rooms/floor/{floor_id}')
+    etag = first.headers['ETag']
+    assets_etag = client.get(f'/api/assets/{room_id}').headers['ETag']
+
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        revalidated = client.get(f'/api/rooms/floor/{floor_id}', headers={'If-None-Match': etag})
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert revalidated.status_code == 304
+    assert statements == []
+
+    with app.app_context():
+        db.session.add(Asset(room_id=room_id, name="Projector", asset_type="projector", status=Asset.STATUS_BROKEN))
+        db.session.commit()
+
+    changed = client.get(f'/api/rooms/floor/{floor_id}', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert client.get(f'/api/assets/{room_id}', headers={'If-None-Match': assets_etag}).status_code == 200
+
+
+def test_floor_changes_return_only_changed_rooms(app, client, student_user):
+    """The changes endpoint sends rooms changed since a version, or the full floor if unknown."""
+    from app import db
+    from app.models import Building, Floor, Room, Ticket
+
+    with app.app_context():
+        b = Building(name="Delta Building")
+        f = Floor(level=1, name="1st Floor", building=b)
+        rooms = [Room(number=f"DL10{i}", floor=f) for i in range(3)]
+        db.session.add_all([b, f, *rooms])
+        db.session.commit()
+        floor_id, room_id = f.id, rooms[0].id
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = student_user.id
+
+    snapshot = client.get(f'/api/rooms/floor/{floor_id}').get_json()['data']
+    version = snapshot['version']
+    assert len(snapshot['rooms']) == 3
+
+    with app.app_context():
+        db.session.add(Ticket(room_id=room_id, reporter_id=student_user.id, issue_type='electrical',
+                              description='Sparking socket', reporter_name='Test Student',
+                              reporter_email='student@mitwpu.edu.in', prn='1234567890',
+                              status=Ticket.STATUS_OPEN))
+        db.session.commit()
+
+    delta = client.get(f'/api/rooms/floor/{floor_id}/changes?since={version}').get_json()['data']
+    assert delta['full'] is False and delta['version'] > version
+    assert [room['id'] for room in delta['rooms']] == [room_id]
+    assert delta['rooms'][0]['has_open_tickets'] is True
+
+    unchanged = client.get(f"/api/rooms/floor/{floor_id}/changes?since={delta['version']}").get_json()['data']
+    assert unchanged['rooms'] == [] and unchanged['full'] is False
+
+    unknown = client.get(f'/api/rooms/floor/{floor_id}/changes?since=1').get_json()['data']
+    assert unknown['full'] is True and len(unknown['rooms']) == 3
+
+
+def test_warmer_prebuilds_floor_caches(app):
+    """The warmer fills the map and admin caches for every floor and re-warms invalidated ones."""
+    from app import db
+    from app.models import Building, Floor, Room
+    from app.warmer import CacheWarmer
+
+    with app.app_context():
+        b = Building(name="Warm Building")
+        floors = [Floor(level=level, name=f"Level {level}", building=b) for level in (1, 2)]
+        db.session.add_all([b, *floors, Room(number="WM101", floor=floors[0])])
+        db.session.commit()
+        floor_ids = [f.id for f in floors]
+
+        warmer = CacheWarmer(app, concurrency=2, delay=0.05)
+        warmer.warm_all()
+        for floor_id in floor_ids:
+            assert get_tagged(f'map_floor_{floor_id}') is not None
+            assert get_tagged(f'admin_floor_{floor_id}') is not None
+
+        invalidate_floor_cache(floor_ids[0])
+        assert get_tagged(f'map_floor_{floor_ids[0]}') is None
+        warmer.schedule([floor_ids[0]])
+        deadline = time.time() + 5
+        while get_tagged(f'map_floor_{floor_ids[0]}') is None and time.time() < deadline:
+            time.sleep(0.05)
+        assert get_tagged(f'map_floor_{floor_ids[0]}') is not None
+
+
+def test_serializer_round_trips_without_pickle(app):
+    """Entries are stored as JSON/msgpack (compressed when large) and pickled files read as misses."""
+    import io
+    import pickle
+    from app.cache_serializer import CacheSerializer
+
+    rooms = [{'id': i, 'number': f'VY4{i:02d}', 'status': 'normal', 'has_open_tickets': False} for i in range(60)]
+    for fmt in ('json', None):
+        serializer = CacheSerializer(fmt, compress_threshold=512)
+        small, large = io.BytesIO(), io.BytesIO()
+        serializer.dump({'value': rooms[:1]}, small)
+        serializer.dump({'value': rooms}, large)
+        assert small.getvalue()[:1] in (b'J', b'M')
+        assert large.getvalue()[:1] == b'Z'
+        assert serializer.load(io.BytesIO(large.getvalue())) == {'value': rooms}
+        assert serializer.load(io.BytesIO(pickle.dumps({'value': rooms}))) is None
+
+    with app.app_context():
+        set_tagged('map_floor_9', rooms, [floor_tag(9)])
+        with open(cache.cache._get_filename('map_floor_9'), 'rb') as f:
+            assert f.read()[4:5] in (b'J', b'M', b'Z')
+        assert get_tagged('map_floor_9') == rooms
+
+
+def test_l1_serves_hot_entries_and_follows_l2_generations(app):
+    """Repeat reads come from the in-process tier until the tag generation in L2 moves."""
+    from app.cache import get_cache_stats
+
+    with app.app_context():
+        set_tagged('map_floor_5', ['room'], [MAP_TAG, floor_tag(5)])
+        cache.cache.stats.reset()
+
+        assert get_tagged('map_floor_5') == ['room']
+        assert get_tagged('map_floor_5') == ['room']
+        stats = get_cache_stats()
+        assert stats['l1']['prefixes']['map_floor_']['hits'] == 2
+        assert 'map_floor_' not in stats['prefixes']
+
+        # Another worker invalidating the floor only touches the generation in L2
+        invalidate_tags(floor_tag(5))
+        assert get_tagged('map_floor_5') is None
+        stats = get_cache_stats()
+        assert stats['l1']['prefixes']['map_floor_']['misses'] == 1
+        assert stats['prefixes']['map_floor_']['hits'] == 1
+
+
+def test_l1_hits_do_no_l2_reads(app):
+    """A hot L1 entry is served from memory; other workers' bumps are picked up after CACHE_L1_CHECK_SECONDS."""
+    from flask import current_app
+    from app.cache import _generation_key
+
+    with app.app_context():
+        set_tagged('map_floor_6', ['room'], [MAP_TAG, floor_tag(6)])
+        assert get_tagged('map_floor_6') == ['room']
+        cache.cache.stats.reset()
+
+        for _ in range(3):
+            assert get_tagged('map_floor_6') == ['room']
+        assert cache.cache.stats.snapshot()['prefixes'] == {}
+
+        # Another worker bumps the generation straight in L2
+        cache.set(_generation_key(floor_tag(6)), time.time_ns(), timeout=0)
+        l1 = current_app.extensions['fixlink_cache_l1']
+        l1.check_seconds = 0.05
+        time.sleep(0.06)
+        assert get_tagged('map_floor_6') is None
+
+
+def test_serializer_keeps_datetimes_and_rejects_lossy_values():
+    """Datetimes read back as datetimes; in strict mode lossy values raise instead of caching a miss."""
+    import io
+    import datetime
+    from decimal import Decimal
+    from app.cache_serializer import CacheSerializer
+
+    value = {'at': datetime.datetime(2026, 10, 17, 9, 30, 5, 120), 'day': datetime.date(2026, 10, 17), 'n': [1, 'a']}
+    for fmt in ('json', None):
+        serializer = CacheSerializer(fmt, strict=True)
+        assert serializer.loads(serializer.dumps(value)) == value
+        for lossy in ({1: 'int key'}, {'pair': (1, 2)}, {(1, 2): 'tuple key'}, {'price': Decimal('1.50')}):
+            try:
+                serializer.dump(lossy, io.BytesIO())
+            except TypeError:
+                pass
+            else:
+                raise AssertionError(f'{lossy!r} was cached')
+
+    lenient = io.BytesIO()
+    CacheSerializer('json').dump({'price': Decimal('1.50')}, lenient)
+    assert CacheSerializer('json').load(io.BytesIO(lenient.getvalue())) is None
+
+
+def test_every_cached_payload_round_trips(app, monkeypatch):
+    """Each value the app caches reads back from L2 equal to what was written."""
+    import datetime
+    from app import db
+    from app.analytics import get_critical_assets, get_ticket_summary
+    from app.cache import get_cached_floor_data, get_cached_floor_info, get_tag_generation
+    from app.models import Building, Floor, Room, Asset, Ticket
+    from app.pagination import approximate_count
+
+    with app.app_context():
+        serializer = cache.cache.serializer
+        assert serializer.strict
+        written = {}
+        for method in ('set', 'add'):
+            original = getattr(cache.cache, method)
+
+            def spy(key, value, timeout=None, original=original):
+                written[key] = value
+                return original(key, value, timeout=timeout)
+            monkeypatch.setattr(cache.cache, method, spy)
+
+        b = Building(name="Cache Building")
+        f = Floor(level=2, name="2nd Floor", building=b)
+        r = Room(number="CB201", floor=f)
+        projector = Asset(room=r, name="Projector", asset_type="projector", status=Asset.STATUS_BROKEN)
+        db.session.add_all([b, f, r, projector])
+        db.session.commit()
+        week_ago = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        db.session.add(Ticket(room_id=r.id, asset_id=projector.id, issue_type="electrical", description="Dead",
+                              reporter_name="Student", prn="1234", reporter_email="s@mitwpu.edu.in",
+                              created_at=week_ago))
+        db.session.commit()
+
+        get_cached_floor_data(f.id)
+        get_cached_floor_info(f.id)
+        get_critical_assets()
+        for period in ('daily', 'weekly', 'monthly'):
+            get_ticket_summary(week_ago - datetime.timedelta(days=40), period=period)
+        approximate_count(Ticket.query, 'tickets')
+        get_tag_generation(MAP_TAG)
+
+        prefixes = {key.split('_')[0] for key in written}
+        assert {'map', 'admin', 'analytics', 'count', 'tag'} <= prefixes, prefixes
+        for key, value in written.items():
+            assert serializer.loads(serializer.dumps(value)) == value, key
+            assert cache.cache.backend.get(key) == value, key
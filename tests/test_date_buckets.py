@@ -0,0 +1,36 @@
+import datetime
+import pytest
+from sqlalchemy import column, select
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.date_buckets import date_bucket
+
+# Days around ISO year boundaries: 2020-W53, 2021-W01 starting on the 4th, 2025-W01 starting in 2024
+DAYS = [datetime.date(2020, 12, 31), datetime.date(2021, 1, 3), datetime.date(2021, 1, 4),
+        datetime.date(2024, 12, 29), datetime.date(2024, 12, 30), datetime.date(2026, 10, 17),
+        datetime.date(2026, 12, 28), datetime.date(2027, 1, 1), datetime.date(2027, 1, 4)]
+
+
+@pytest.mark.parametrize('period, expected', [
+    ('daily', lambda d: d.strftime('%Y-%m-%d')),
+    ('weekly', lambda d: '{}-W{:02d}'.format(*d.isocalendar()[:2])),
+    ('monthly', lambda d: d.strftime('%Y-%m')),
+])
+def test_sqlite_buckets_match_python_calendar(app, period, expected):
+    """SQLite labels, ISO weeks across year boundaries included, match Python's calendar."""
+    with app.app_context():
+        for day in DAYS:
+            for value in (day, datetime.datetime.combine(day, datetime.time(23, 59, 59))):
+                label = db.session.execute(select(date_bucket(db.literal(value), period))).scalar()
+                assert label == expected(day), (period, value)
+
+
+def test_postgresql_buckets_use_to_char():
+    """PostgreSQL renders to_char with the ISO year and week."""
+    def sql(period):
+        return str(select(date_bucket(column('day'), period)).compile(dialect=postgresql.dialect()))
+
+    assert "to_char(day, 'YYYY-MM-DD')" in sql('daily')
+    assert """to_char(day, 'IYYY-"W"IW')""" in sql('weekly')
+    assert "to_char(day, 'YYYY-MM')" in sql('monthly')
+    assert sql('quarterly') == sql('monthly')
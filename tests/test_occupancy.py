@@ -0,0 +1,72 @@
+import datetime
+from app import db
+from app.models import Building, Floor, Room, User, RoomBooking, Timetable
+from app.occupancy import get_floor_occupancy, get_occupancy_index, occupancy_bucket
+
+
+def _seed_floor():
+    b = Building(name="Occupancy Building")
+    f = Floor(level=3, name="3rd Floor", building=b)
+    r = Room(number="OC301", floor=f)
+    faculty = User(name="Dr. Slot", email="slot@mitwpu.edu.in", role=User.ROLE_FACULTY)
+    db.session.add_all([b, f, r, faculty])
+    db.session.commit()
+    return f, r, faculty
+
+
+def test_occupancy_layer_follows_slot_boundaries(app):
+    """A cached occupancy layer must not outlive the slot it was computed for."""
+    with app.app_context():
+        f, r, faculty = _seed_floor()
+        slot = datetime.datetime(2026, 10, 14, 8, 0)
+        db.session.add(RoomBooking(room_id=r.id, faculty_id=faculty.id, date=slot.date(),
+                                   slot_start=slot, subject="Seminar"))
+        db.session.commit()
+
+        during = get_floor_occupancy(f.id, slot + datetime.timedelta(minutes=10))
+        assert during[r.id]['status'] == 'occupied'
+        assert during[r.id]['subject'] == 'Seminar'
+
+        after = get_floor_occupancy(f.id, slot + datetime.timedelta(hours=1, minutes=10))
+        assert r.id not in after or after[r.id]['status'] == 'vacant'
+
+
+def test_timetable_occupancy_uses_ist_hours(app):
+    """Timetable slots are stored in IST and switch on UTC half-hours."""
+    with app.app_context():
+        f, r, faculty = _seed_floor()
+        # Wednesday 10:00-11:00 IST == 04:30-05:30 UTC
+        db.session.add(Timetable(room_id=r.id, faculty_id=faculty.id, day_of_week=2,
+                                 start_time=datetime.time(10, 0), end_time=datetime.time(11, 0),
+                                 subject="Compilers"))
+        db.session.commit()
+
+        before = datetime.datetime(2026, 10, 14, 4, 15)
+        during = datetime.datetime(2026, 10, 14, 4, 45)
+        assert occupancy_bucket(before) != occupancy_bucket(during)
+        assert get_floor_occupancy(f.id, before).get(r.id, {'status': 'vacant'})['status'] == 'vacant'
+        assert get_floor_occupancy(f.id, during)[r.id]['subject'] == 'Compilers'
+
+
+def test_occupancy_index_applies_commits_incrementally(app):
+    """Booking writes update a loaded floor in place instead of forcing a reload."""
+    with app.app_context():
+        f, r, faculty = _seed_floor()
+        index = get_occupancy_index()
+        now = datetime.datetime.utcnow()
+        slot = now.replace(minute=0, second=0, microsecond=0)
+        assert index.room_status(f.id, r.id, now)['status'] == 'vacant'
+        loaded = index.floor(f.id, now)
+
+        booking = RoomBooking(room_id=r.id, faculty_id=faculty.id, date=slot.date(),
+                              slot_start=slot, subject="Viva")
+        db.session.add(booking)
+        db.session.commit()
+        assert index.floor(f.id, now) is loaded
+        assert r.current_occupancy_status['subject'] == 'Viva'
+        assert r.time_until_next_lecture is None
+
+        booking.status = RoomBooking.STATUS_CANCELLED
+        db.session.commit()
+        assert index.floor(f.id, now) is loaded
+        assert r.current_occupancy_status['status'] == 'vacant'
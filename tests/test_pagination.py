@@ -0,0 +1,100 @@
+import datetime
+from app import db
+from app.models import Building, Floor, Room, Ticket, User
+from app.pagination import keyset_paginate
+from tests.test_serializers import count_queries, _login_admin
+
+
+def _seed_fixed_tickets(count):
+    b = Building(name="Pager Building")
+    f = Floor(level=1, name="1st Floor", building=b)
+    r = Room(number="PG101", floor=f)
+    db.session.add_all([b, f, r])
+    db.session.commit()
+    base = datetime.datetime(2026, 9, 1, 9, 0)
+    # Every third ticket shares a fixed_at and one has none, to exercise ties and NULLs
+    tickets = [
+        Ticket(room_id=r.id, issue_type="electrical", description=f"Issue {i}", reporter_name="Student",
+               prn="1234", reporter_email="s@mitwpu.edu.in", status=Ticket.STATUS_FIXED,
+               fixed_at=None if i == 4 else base + datetime.timedelta(hours=i // 3))
+        for i in range(count)
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return tickets
+
+
+def _walk(query, keys, per_page):
+    """Follow next cursors to the end, then prev cursors back, returning both id sequences."""
+    forward, pages, cursor = [], [], None
+    while True:
+        page = keyset_paginate(query, keys, cursor=cursor, per_page=per_page, scope='test')
+        pages.append(page)
+        forward.extend(item.id for item in page.items)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    backward = []
+    page = pages[-1]
+    while page.has_prev:
+        page = keyset_paginate(query, keys, cursor=page.prev_cursor, per_page=per_page, scope='test')
+        backward[:0] = [item.id for item in page.items]
+    return forward, backward, pages
+
+
+def test_keyset_walk_matches_offset_order(app):
+    """Pages cover every row once, in ORDER BY order with NULLs largest, forwards and backwards."""
+    with app.app_context():
+        tickets = _seed_fixed_tickets(11)
+        by_fixed = lambda t: (t.fixed_at is not None, t.fixed_at or datetime.datetime.min, t.id)
+        query = Ticket.query.filter_by(status=Ticket.STATUS_FIXED)
+
+        forward, backward, pages = _walk(query, [(Ticket.fixed_at, True), (Ticket.id, True)], 4)
+        expected = [t.id for t in sorted(tickets, key=by_fixed)]
+        expected = [tickets[4].id] + [i for i in reversed(expected) if i != tickets[4].id]
+        assert forward == expected
+        assert backward == expected[:len(backward)] and len(backward) == 8
+        assert [(p.first_index, p.last_index, p.total) for p in pages] == [(1, 4, 11), (5, 8, 11), (9, 11, 11)]
+
+        forward, _, _ = _walk(query, [(Ticket.fixed_at, False), (Ticket.id, False)], 3)
+        assert forward == list(reversed(expected))
+
+
+def test_invalid_or_foreign_cursor_reads_first_page(app):
+    with app.app_context():
+        _seed_fixed_tickets(11)
+        keys = [(Ticket.fixed_at, True), (Ticket.id, True)]
+        first = keyset_paginate(Ticket.query, keys, per_page=4, scope='test')
+        other = keyset_paginate(Ticket.query, keys, per_page=4, scope='other')
+        for cursor in (first.next_cursor + 'x', 'garbage', other.next_cursor):
+            page = keyset_paginate(Ticket.query, keys, cursor=cursor, per_page=4, scope='test')
+            assert [t.id for t in page.items] == [t.id for t in first.items]
+            assert not page.has_prev
+
+
+def test_admin_lists_page_in_constant_queries(app, client, admin_user):
+    """Every list renders with cursors, and a deeper page reuses the cached total instead of recounting."""
+    with app.app_context():
+        _seed_fixed_tickets(11)
+        db.session.add_all([User(name=f"Pager {i}", email=f"pager{i}@mitwpu.edu.in") for i in range(25)])
+        db.session.commit()
+    _login_admin(client, admin_user)
+
+    for url in ('/admin/history', '/admin/history?search=student', '/admin/booking-history', '/admin/professionals', '/admin/users?sort=name'):
+        assert client.get(url).status_code == 200
+
+    with app.app_context(), count_queries() as statements:
+        first = client.get('/admin/users')
+    assert first.status_code == 200 and b'~26' in first.data
+    assert any('count(' in s.lower() for s in statements)
+
+    with app.app_context():
+        cursor = keyset_paginate(User.query, [(User.created_at, True), (User.id, True)], per_page=20,
+                                 scope='users_newest').next_cursor
+    with app.app_context(), count_queries() as deeper:
+        second = client.get('/admin/users', query_string={'cursor': cursor})
+    assert second.status_code == 200 and b'21' in second.data
+    assert not any('count(' in s.lower() for s in deeper)
+
+    response = client.get('/admin/professionals/analytics', headers={'X-Requested-With': 'XMLHttpRequest'})
+    assert response.get_json()['has_next'] is False
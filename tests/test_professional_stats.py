@@ -0,0 +1,88 @@
+import datetime
+from sqlalchemy import event
+from app import db
+from app.models import Building, Floor, Room, Ticket, Professional, ProfessionalStats
+from app.professional_stats import check_professional_stats, rebuild_professional_stats
+
+
+def _seed(professional):
+    b = Building(name="Stats Building")
+    f = Floor(level=1, name="1st Floor", building=b)
+    r = Room(number="PS101", floor=f)
+    db.session.add_all([b, f, r])
+    db.session.commit()
+    tickets = [
+        Ticket(room_id=r.id, issue_type="Electrical", description=f"Issue {i}", reporter_name="Student",
+               prn="1234", reporter_email="s@mitwpu.edu.in", assigned_professional_id=professional.id,
+               status=Ticket.STATUS_ASSIGNED)
+        for i in range(3)
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return tickets
+
+
+def test_professional_stats_follow_complete_cancel_and_rate(app, professional_user):
+    """Counters move on complete, cancel, rate and delete, and match a recount."""
+    with app.app_context():
+        prof = db.session.get(Professional, professional_user.id)
+        fixed, cancelled, other = _seed(prof)
+        assert (prof.jobs_completed, prof.jobs_cancelled, prof.avg_resolution_time_str) == (0, 0, "N/A")
+
+        started = datetime.datetime(2026, 10, 1, 9, 0)
+        fixed.job_started_at = started
+        fixed.status = Ticket.STATUS_FIXED
+        fixed.fixed_at = started + datetime.timedelta(hours=2, minutes=30)
+        cancelled.cancelled_by_professional_id = prof.id
+        cancelled.assigned_professional_id = None
+        cancelled.status = Ticket.STATUS_OPEN
+        db.session.commit()
+
+        fixed.rating = 4
+        db.session.commit()
+        other.status = Ticket.STATUS_FIXED
+        other.rating = 2
+        db.session.commit()
+
+        assert (prof.jobs_completed, prof.jobs_cancelled) == (2, 1)
+        assert prof.overall_rating == 3.0
+        assert prof.avg_resolution_time_str == "2h 30m"
+        assert check_professional_stats() == []
+
+        db.session.delete(other)
+        db.session.commit()
+        assert (prof.jobs_completed, prof.overall_rating) == (1, 4.0)
+        assert check_professional_stats() == []
+
+
+def test_professional_to_dict_is_constant_time(app, professional_user):
+    """Serializing a loaded professional runs no queries, whatever its history."""
+    with app.app_context():
+        _seed(db.session.get(Professional, professional_user.id))
+        db.session.expire_all()
+        prof = Professional.query.get(professional_user.id)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            data = prof.to_dict()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert statements == []
+        assert data['jobs_completed'] == 0
+
+
+def test_backfill_rebuilds_missing_stats(app, professional_user):
+    with app.app_context():
+        prof = db.session.get(Professional, professional_user.id)
+        fixed = _seed(prof)[0]
+        fixed.status = Ticket.STATUS_FIXED
+        fixed.rating = 5
+        db.session.commit()
+
+        db.session.execute(db.delete(ProfessionalStats))
+        db.session.commit()
+        assert len(check_professional_stats()) == 1
+        assert rebuild_professional_stats() == 1
+        assert (prof.jobs_completed, prof.overall_rating) == (1, 5.0)
@@ -0,0 +1,304 @@
+"""
+Query budgets for every read route.
+
+Each route below is requested as the role that uses it against a seeded
+campus, and the SQL it emits is counted. A route over its budget fails with
+the statements listed; budgets do not grow with the data, so an N+1 shows up
+as soon as the seeded lists have more than one row. Routes flagged `plan`
+also have their SQLite EXPLAIN QUERY PLAN compared with the snapshot in
+tests/query_plans/, and may not scan a large table without an index.
+
+Regenerate the snapshots after an intended change with
+    UPDATE_QUERY_PLANS=1 python -m pytest tests/test_query_budgets.py
+"""
+import os
+import re
+from datetime import datetime, time, timedelta
+from pathlib import Path
+import pytest
+from sqlalchemy import event
+from app import db
+from app.cache import cache
+from app.models import (Asset, BugReport, Building, ChatMessage, Floor, HelpRequest, Notification,
+                        Professional, Room, RoomBooking, Ticket, Timetable, User)
+from app.occupancy import get_occupancy_index
+
+PLAN_DIR = Path(__file__).parent / 'query_plans'
+
+# Tables that grow without bound: a plan may only reach them through an index
+LARGE_TABLES = {'tickets', 'tickets_archive', 'ticket_daily_rollup', 'notifications', 'chat_messages',
+                'room_bookings', 'help_requests'}
+
+# How many of each listed thing the seed creates; any per-row query costs at least this many statements
+ROWS = 4
+
+# Read routes that need no budget, and why
+UNBUDGETED = {
+    'static': 'serves files',
+    'auth.logout': 'clears the session',
+    'professional.logout': 'clears the session',
+    'superadmin.logout': 'clears the session',
+    'auth.verify_email': 'writes (verifies the account)',
+    'superadmin.view_bug_attachment': 'streams an uploaded file',
+    'professional.task_detail': 'renders professional/task_detail.html, which does not exist',
+}
+
+
+class Route:
+    def __init__(self, role, path, budget, method='GET', json=None, plan=False, status=200):
+        self.role = role
+        self.path = path
+        self.budget = budget
+        self.method = method
+        self.json = json
+        self.plan = plan
+        self.status = status
+
+    def __repr__(self):
+        return f'{self.method} {self.path}'
+
+
+def _window():
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    return {'floor_ids': ['{floor}'], 'room_type': 'all',
+            'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=2)).isoformat()}
+
+
+ROUTES = [
+    # Sign-in pages
+    Route(None, '/login', 0),
+    Route(None, '/signup', 0),
+    Route(None, '/forgot-password', 0),
+    Route(None, '/reset-password/invalid-token', 0, status=302),
+    Route(None, '/professional/login', 0, status=302),
+    Route(None, '/developer/login', 0),
+    # Students
+    Route('student', '/', 0, status=302),
+    Route('student', '/report', 3),
+    Route('student', '/api/buildings', 1),
+    Route('student', '/api/floors/{building}', 1),
+    Route('student', '/api/rooms/floor/{floor}', 3),
+    Route('student', '/api/rooms/floor/{floor}/changes', 3),
+    Route('student', '/api/room/{room_number}', 4),
+    Route('student', '/api/assets/{room}', 1),
+    Route('student', '/setup-password', 0, status=302),
+    Route('student', '/report-bug', 0),
+    Route('student', '/api/me', 1),
+    Route('admin', '/api/notifications', 2, plan=True),
+    Route('admin', '/api/chat/unread_total', 1),
+    # Faculty
+    Route('faculty', '/faculty/dashboard', 9),
+    Route('faculty', '/faculty/api/map/status/{floor}', 4),
+    Route('faculty', '/faculty/api/map/status_for_time', 3, method='POST', json=_window(), plan=True),
+    # Professionals
+    Route('professional', '/professional/dashboard', 5, plan=True),
+    Route('professional', '/professional/history', 2, plan=True),
+    Route('professional', '/professional/chat', 1),
+    Route('professional', '/professional/api/chat/history', 2),
+    Route('professional', '/professional/api/task/{task}', 1),
+    # Admin
+    Route('admin', '/admin/', 9, plan=True),
+    Route('admin', '/admin/map', 5),
+    Route('admin', '/admin/floor-data/{floor}', 4),
+    Route('admin', '/admin/api/room-status/{room_number}', 6),
+    Route('admin', '/admin/history', 3, plan=True),
+    Route('admin', '/admin/booking-history', 2, plan=True),
+    Route('admin', '/admin/users', 4, plan=True),
+    Route('admin', '/admin/professionals', 2),
+    Route('admin', '/admin/professionals/add', 0),
+    Route('admin', '/admin/professionals/analytics', 0),
+    Route('admin', '/admin/professionals/{professional}/history', 5, plan=True),
+    Route('admin', '/admin/ticket/{task}', 1),
+    Route('admin', '/admin/ticket/{open_ticket}/assign', 5),
+    Route('admin', '/admin/help-requests', 2, plan=True),
+    Route('admin', '/admin/chat', 0),
+    Route('admin', '/admin/api/chat/professionals', 1),
+    Route('admin', '/admin/api/chat/history/{professional}', 4),
+    Route('admin', '/admin/api/search?q=projector', 1, plan=True),
+    Route('admin', '/admin/analytics', 4, plan=True),
+    Route('admin', '/admin/api/analytics', 4),
+    Route('admin', '/admin/reports/export/csv', 2, plan=True),
+    # Developer dashboard
+    Route('super_admin', '/developer', 5),
+    Route('super_admin', '/developer/admins', 1),
+    Route('super_admin', '/developer/users', 1),
+    Route('super_admin', '/developer/professionals', 1),
+    Route('super_admin', '/developer/add-admin', 0, status=302),
+    Route('super_admin', '/developer/add-user', 0),
+    Route('super_admin', '/developer/add-professional', 0),
+    Route('super_admin', '/developer/api/cache-stats', 0),
+    Route('super_admin', '/developer/api/retention', 0),
+]
+
+
+def _seed():
+    """A building with two floors of rooms, their bookings and timetable, people, tickets at every stage and chat."""
+    now = datetime.utcnow()
+    building = Building(name="Vyas")
+    floors = [Floor(level=level, name=f"Floor {level}", building=building) for level in (1, 2)]
+    rooms = [Room(number=f"BG{floor.level}0{i}", floor=floor) for floor in floors for i in range(ROWS)]
+    admin = User(name="Budget Admin", email="admin@mitwpu.edu.in", is_admin=True, role=User.ROLE_ADMIN, is_verified=True)
+    faculty = [User(name=f"Faculty {i}", email=f"faculty{i}@mitwpu.edu.in", role=User.ROLE_FACULTY, is_verified=True)
+               for i in range(ROWS)]
+    students = [User(name=f"Student {i}", email=f"student{i}@mitwpu.edu.in", is_verified=True) for i in range(ROWS)]
+    professionals = [Professional(name=f"Pro {i}", email=f"pro{i}@mitwpu.edu.in", phone=f"98765432{i:02d}",
+                                  category=Professional.CATEGORY_ELECTRICIAN) for i in range(ROWS)]
+    for professional in professionals:
+        professional.set_password("password")
+    db.session.add_all([building, *floors, *rooms, admin, *faculty, *students, *professionals])
+    db.session.commit()
+
+    db.session.add_all([Asset(room_id=room.id, name=f"Projector {room.number}", asset_type="projector")
+                        for room in rooms])
+    pro = professionals[0]
+    tickets = []
+    for i, room in enumerate(rooms):
+        for status in (Ticket.STATUS_OPEN, Ticket.STATUS_ASSIGNED, Ticket.STATUS_IN_PROGRESS, Ticket.STATUS_FIXED):
+            done = status == Ticket.STATUS_FIXED
+            tickets.append(Ticket(
+                room_id=room.id, issue_type="projector", description=f"Projector {status} in {room.number}",
+                reporter_id=students[i % ROWS].id, reporter_name=students[i % ROWS].name, prn="1032",
+                reporter_email=students[i % ROWS].email, status=status,
+                assigned_professional_id=professionals[i % ROWS].id if status != Ticket.STATUS_OPEN else None,
+                job_started_at=now - timedelta(hours=3) if done or status == Ticket.STATUS_IN_PROGRESS else None,
+                job_completed_at=now - timedelta(hours=1) if done else None,
+                fixed_at=now - timedelta(hours=1) if done else None, rating=4 if done else None,
+                created_at=now - timedelta(days=i + 1)))
+    db.session.add_all(tickets)
+    db.session.commit()
+
+    active = [t for t in tickets if t.assigned_professional_id == pro.id and t.status == Ticket.STATUS_IN_PROGRESS]
+    db.session.add_all(
+        [HelpRequest(ticket_id=active[0].id, requester_professional_id=pro.id, message=f"Need a hand {i}")
+         for i in range(ROWS)]
+        + [HelpRequest(ticket_id=t.id, requester_professional_id=professionals[1].id, helper_professional_id=pro.id,
+                       status=HelpRequest.STATUS_APPROVED)
+           for t in tickets if t.status == Ticket.STATUS_IN_PROGRESS and t.assigned_professional_id != pro.id]
+        + [RoomBooking(room_id=room.id, faculty_id=faculty[i % ROWS].id, date=now.date(),
+                       slot_start=now.replace(minute=0, second=0, microsecond=0), subject=f"Booking {i}")
+           for i, room in enumerate(rooms)]
+        + [Timetable(room_id=room.id, faculty_id=faculty[i % ROWS].id, day_of_week=day,
+                     start_time=time(9), end_time=time(10), subject=f"Lecture {i}")
+           for i, room in enumerate(rooms) for day in range(5)]
+        + [ChatMessage(sender_type=ChatMessage.SENDER_TYPE_PROFESSIONAL, sender_id=p.id,
+                       receiver_type=ChatMessage.SENDER_TYPE_ADMIN, receiver_id=admin.id, message=f"Hello {i}")
+           for p in professionals for i in range(ROWS)]
+        + [Notification(user_id=admin.id, title=f"Notice {i}", message="Something happened") for i in range(ROWS)]
+        + [BugReport(title=f"Bug {i}", description="Broken") for i in range(ROWS)]
+    )
+    db.session.commit()
+
+    open_ticket = next(t for t in tickets if t.status == Ticket.STATUS_OPEN)
+    task = next(t for t in tickets if t.assigned_professional_id == pro.id and t.status == Ticket.STATUS_IN_PROGRESS)
+    return {
+        'ids': {'building': building.id, 'floor': floors[0].id, 'room': rooms[0].id, 'room_number': rooms[0].number,
+                'professional': pro.id, 'task': task.id, 'open_ticket': open_ticket.id},
+        'sessions': {
+            'admin': {'user_id': admin.id, 'is_admin': True, 'user_role': User.ROLE_ADMIN},
+            'student': {'user_id': students[0].id, 'is_admin': False, 'user_role': User.ROLE_STUDENT},
+            'faculty': {'user_id': faculty[0].id, 'is_admin': False, 'user_role': User.ROLE_FACULTY},
+            'professional': {'professional_id': pro.id},
+            'super_admin': {'is_super_admin': True},
+        },
+    }
+
+
+@pytest.fixture
+def campus(app):
+    with app.app_context():
+        seeded = _seed()
+        db.session.remove()
+        yield seeded
+
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def _request(app, campus, route):
+    """Issue `route` cold (no cache, no loaded occupancy) and return (response, [(statement, parameters)])."""
+    client = app.test_client()
+    if route.role:
+        with client.session_transaction() as sess:
+            sess.update(campus['sessions'][route.role])
+    cache.clear()
+    get_occupancy_index().clear()
+    db.session.remove()
+
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        json = _fill(route.json, campus['ids'])
+        if isinstance(json, dict) and 'floor_ids' in json:
+            json['floor_ids'] = [int(floor_id) for floor_id in json['floor_ids']]
+        response = client.open(_fill(route.path, campus['ids']), method=route.method, json=json)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+        db.session.remove()
+    return response, statements
+
+
+def _query_plan(statements):
+    """
+    EXPLAIN QUERY PLAN lines of each SELECT, numbered by statement. Index
+    names are dropped: create_all() emits a table's indexes in set order,
+    so which of two equally good indexes SQLite picks changes between runs.
+    """
+    lines = []
+    connection = db.session.connection()
+    for number, (statement, parameters) in enumerate(statements):
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            continue
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            detail = re.sub(r'INDEX \w+', 'INDEX', row[-1])
+            lines.append(f"{number}: {detail}")
+    return lines
+
+
+def _plan_file(route):
+    name = re.sub(r'[^a-z0-9]+', '_', route.path.split('?')[0].lower()).strip('_') or 'index'
+    return PLAN_DIR / f"{route.method.lower()}_{name}.txt"
+
+
+@pytest.mark.parametrize('route', ROUTES, ids=repr)
+def test_route_stays_within_query_budget(app, campus, route):
+    response, statements = _request(app, campus, route)
+    assert response.status_code == route.status, response.data[:500]
+    listing = '\n'.join(f"  {statement}" for statement, _ in statements)
+    assert len(statements) <= route.budget, \
+        f"{route} ran {len(statements)} queries (budget {route.budget}):\n{listing}"
+
+    if not route.plan:
+        return
+    plan = _query_plan(statements)
+    full_scans = [line for line in plan
+                  if re.match(r'\d+: SCAN (\w+)$', line) and line.split()[-1] in LARGE_TABLES]
+    assert not full_scans, f"{route} scans without an index:\n" + '\n'.join(full_scans)
+
+    snapshot = _plan_file(route)
+    if os.environ.get('UPDATE_QUERY_PLANS') or not snapshot.exists():
+        snapshot.parent.mkdir(exist_ok=True)
+        snapshot.write_text('\n'.join(plan) + '\n')
+    assert snapshot.read_text().splitlines() == plan, \
+        f"Query plan of {route} changed; rerun with UPDATE_QUERY_PLANS=1 if intended"
+
+
+def test_every_read_route_has_a_budget(app):
+    adapter = app.url_map.bind('localhost')
+    budgeted = set()
+    for route in ROUTES:
+        endpoint, _ = adapter.match(re.sub(r'\{\w+\}', '1', route.path.split('?')[0]), method=route.method)
+        budgeted.add(endpoint)
+
+    missing = sorted(
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if 'GET' in rule.methods and rule.endpoint not in budgeted and rule.endpoint not in UNBUDGETED
+    )
+    assert not missing, f"Add these routes to ROUTES with a query budget: {missing}"
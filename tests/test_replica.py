@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import insert
+from app import create_app, db
+from app.cache import cache
+from app.models import Building, Floor, Room, Ticket, User
+from app.replica import read_replica
+
+
+@pytest.fixture
+def replicated_app(tmp_path, monkeypatch):
+    """Two SQLite files stand in for the primary and its replica."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv('DATABASE_REPLICA_URL', f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setenv('CACHE_DIR', str(tmp_path / 'cache'))
+    app = create_app('testing')
+    app.config.update({"WTF_CSRF_ENABLED": False, "SECRET_KEY": "test_secret_key"})
+    with app.app_context():
+        cache.clear()
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica'])
+    # init_app registered a 'replica' metadata on the shared db; later apps have no such bind
+    db.metadatas.pop('replica', None)
+
+
+def _seed_replica_only():
+    """A fixed ticket that exists on the replica but not on the primary."""
+    with db.engines['replica'].begin() as connection:
+        connection.execute(insert(Building.__table__), {'id': 1, 'name': 'Replica Building'})
+        connection.execute(insert(Floor.__table__), {'id': 1, 'building_id': 1, 'level': 1, 'name': '1st Floor'})
+        connection.execute(insert(Room.__table__), {'id': 1, 'floor_id': 1, 'number': 'RP101'})
+        connection.execute(insert(Ticket.__table__), {
+            'id': 1, 'room_id': 1, 'issue_type': 'electrical', 'description': 'Only on the replica',
+            'reporter_name': 'Replica Reader', 'prn': '1234', 'reporter_email': 's@mitwpu.edu.in',
+            'status': Ticket.STATUS_FIXED,
+        })
+
+
+def test_reads_route_to_replica_until_the_session_writes(replicated_app):
+    with replicated_app.app_context():
+        _seed_replica_only()
+        assert Ticket.query.count() == 0
+        with read_replica():
+            assert Ticket.query.count() == 1
+            db.session.add(User(name="Writer", email="writer@mitwpu.edu.in"))
+            db.session.flush()
+            assert Ticket.query.count() == 0  # read-your-writes: pinned to the primary
+        assert User.query.filter_by(email="writer@mitwpu.edu.in").count() == 1
+
+
+def test_history_uses_replica_except_right_after_a_write(replicated_app):
+    client = replicated_app.test_client()
+    with replicated_app.app_context():
+        _seed_replica_only()
+        admin = User(name="Test Admin", email="admin@mitwpu.edu.in", is_admin=True)
+        other = User(name="Unverified", email="new@mitwpu.edu.in")
+        db.session.add_all([admin, other])
+        db.session.commit()
+        admin_id, other_id = admin.id, other.id
+    db.session.remove()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+        sess['is_admin'] = True
+
+    assert b'Replica Reader' in client.get('/admin/history').data
+
+    assert client.post(f'/admin/users/{other_id}/verify').status_code == 200
+    db.session.remove()
+    assert b'Replica Reader' not in client.get('/admin/history').data
+
+    # Requests here share the fixture's app context; end its session as a real request would
+    db.session.remove()
+    replicated_app.config['REPLICA_MAX_LAG_SECONDS'] = 0
+    assert b'Replica Reader' in client.get('/admin/history').data
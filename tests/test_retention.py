@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import ChatMessage, Notification, PushSubscription, User
+from app.retention import run_retention
+
+
+def _seed():
+    admin = User(name="Retention Admin", email="retention@mitwpu.edu.in", is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+
+    old, recent = datetime.utcnow() - timedelta(days=90), datetime.utcnow() - timedelta(days=2)
+    notification = lambda title, is_read, at: Notification(user_id=admin.id, title=title, message=title,
+                                                           is_read=is_read, created_at=at)
+    db.session.add_all([notification(f"Old read {i}", True, old) for i in range(5)] + [
+        notification("Old unread", False, old),
+        notification("Recent read", True, recent),
+        ChatMessage(sender_type='admin', sender_id=admin.id, receiver_type='professional', receiver_id=1,
+                    message="Ancient", timestamp=datetime.utcnow() - timedelta(days=400)),
+        ChatMessage(sender_type='admin', sender_id=admin.id, receiver_type='professional', receiver_id=1,
+                    message="Fresh", timestamp=recent),
+        PushSubscription(user_id=admin.id, endpoint="https://push.example/dead", p256dh="k", auth="a",
+                         failure_count=6, last_failure_at=datetime.utcnow() - timedelta(days=10)),
+        PushSubscription(user_id=admin.id, endpoint="https://push.example/flaky", p256dh="k", auth="a",
+                         failure_count=6, last_failure_at=recent),
+        PushSubscription(user_id=admin.id, endpoint="https://push.example/ok", p256dh="k", auth="a"),
+    ])
+    db.session.commit()
+
+
+def test_retention_deletes_expired_rows_in_batches(app):
+    with app.app_context():
+        _seed()
+        reports = {r['policy']: r for r in run_retention(batch_size=2, pause=0)}
+
+        assert reports['notifications']['deleted'] == 5 and reports['notifications']['batches'] == 3
+        assert reports['chat_messages']['deleted'] == 1
+        assert reports['push_subscriptions']['deleted'] == 1
+        assert all(r['complete'] and r['seconds'] >= 0 for r in reports.values())
+
+        assert sorted(n.title for n in Notification.query) == ["Old unread", "Recent read"]
+        assert [m.message for m in ChatMessage.query] == ["Fresh"]
+        assert sorted(s.endpoint for s in PushSubscription.query) == [
+            "https://push.example/flaky", "https://push.example/ok"]
+        assert sum(r['deleted'] for r in run_retention(pause=0)) == 0
+
+
+def test_retention_policies_can_be_disabled_and_reported(app, client):
+    with app.app_context():
+        _seed()
+        app.config['RETENTION_NOTIFICATION_DAYS'] = 0
+        run_retention(pause=0)
+        assert Notification.query.count() == 7
+
+        with client.session_transaction() as sess:
+            sess['is_super_admin'] = True
+        policies = client.get('/developer/api/retention').get_json()['data']['policies']
+        assert {p['policy']: p['deleted'] for p in policies}['chat_messages'] == 1
@@ -0,0 +1,73 @@
+from app import db
+from app.models import Building, Floor, Room, Asset, Ticket, RoomStatus
+from app.room_status import check_room_status, rebuild_room_status
+
+
+def _seed_rooms():
+    b = Building(name="Status Building")
+    f = Floor(level=2, name="2nd Floor", building=b)
+    r1 = Room(number="ST201", floor=f)
+    r2 = Room(number="ST202", floor=f)
+    db.session.add_all([b, f, r1, r2])
+    db.session.commit()
+    return r1, r2
+
+
+def _ticket(room, **kwargs):
+    return Ticket(room_id=room.id, issue_type="Electrical", description="Fan broken",
+                  reporter_name="Student", prn="1234", reporter_email="s@mitwpu.edu.in", **kwargs)
+
+
+def test_room_status_follows_ticket_and_asset_transitions(app):
+    """room_status counts move with every status change, move and delete, and roll back with the write."""
+    with app.app_context():
+        r1, r2 = _seed_rooms()
+        assert r1.status_record.to_dict()['status'] == RoomStatus.STATUS_NORMAL
+
+        ticket = _ticket(r1)
+        asset = Asset(room_id=r1.id, name="Projector", asset_type="projector")
+        db.session.add_all([ticket, asset])
+        db.session.commit()
+        assert (r1.status_record.open_count, r1.status) == (1, 'issue')
+
+        ticket.status = Ticket.STATUS_IN_PROGRESS
+        db.session.commit()
+        assert (r1.status_record.open_count, r1.status_record.in_progress_count, r1.status) == (0, 1, 'in-progress')
+
+        asset.status = Asset.STATUS_BROKEN
+        ticket.room_id = r2.id
+        ticket.status = Ticket.STATUS_ASSIGNED
+        db.session.commit()
+        assert (r1.status, r1.has_broken_assets, r1.has_in_progress_tickets) == ('issue', True, False)
+        assert (r2.status, r2.has_assigned_tickets) == ('assigned', True)
+
+        # A rolled back write leaves the materialized row untouched
+        db.session.add(_ticket(r2))
+        db.session.flush()
+        assert r2.status_record.open_count == 1
+        db.session.rollback()
+        assert (r2.status_record.open_count, r2.status) == (0, 'assigned')
+
+        db.session.delete(ticket)
+        db.session.delete(asset)
+        db.session.commit()
+        assert (r1.status, r2.status) == ('normal', 'normal')
+        assert check_room_status() == []
+
+
+def test_consistency_check_repairs_drift(app):
+    """The checker recounts from scratch and rewrites only rows that drifted."""
+    with app.app_context():
+        r1, r2 = _seed_rooms()
+        db.session.add(_ticket(r1))
+        db.session.commit()
+
+        db.session.execute(db.delete(RoomStatus).where(RoomStatus.room_id == r1.id))
+        db.session.execute(db.update(RoomStatus).where(RoomStatus.room_id == r2.id).values(open_count=5))
+        db.session.commit()
+
+        mismatches = check_room_status(repair=True)
+        assert [(m['key'], m['actual'] and m['actual']['open_count']) for m in mismatches] == [(r1.id, None), (r2.id, 5)]
+        assert check_room_status() == []
+        assert (r1.status, r2.status) == ('issue', 'normal')
+        assert rebuild_room_status() == 2
@@ -0,0 +1,119 @@
+import os
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.models import Building, Floor, Room, Ticket, User
+from app.search import ensure_search_index, fts5_available, search_filter, search_indexes, ranked_search, uninstall_search
+from tests.test_serializers import _login_admin
+
+
+def _seed():
+    b = Building(name="Search Building")
+    f = Floor(level=4, name="4th Floor", building=b)
+    rooms = [Room(number="VY401", floor=f), Room(number="VY502", floor=f)]
+    db.session.add_all([b, f, *rooms])
+    db.session.commit()
+    tickets = [
+        Ticket(room_id=rooms[0].id, issue_type="projector", description="Projector flickers",
+               reporter_name="Ankita Sharma", prn="1032", reporter_email="ankita@mitwpu.edu.in",
+               status=Ticket.STATUS_FIXED),
+        Ticket(room_id=rooms[1].id, issue_type="electrical", description="Fan broken near projector screen",
+               reporter_name="Rahul Patil", prn="2041", reporter_email="rahul@mitwpu.edu.in",
+               status=Ticket.STATUS_OPEN),
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return rooms, tickets
+
+
+def _ids(query):
+    return [item.id for item in query]
+
+
+def test_ticket_search_tracks_writes(app):
+    """Partial room numbers, names and emails match; updates, room renames and deletes reindex."""
+    assert fts5_available()
+    with app.app_context():
+        rooms, (projector, fan) = _seed()
+        search = lambda q: _ids(Ticket.query.filter(search_filter('tickets', q)).order_by(Ticket.id))
+
+        assert search('vy40') == [projector.id]
+        assert search('VY projector') == [projector.id, fan.id]
+        assert search('vy50 sharma') == []
+        assert search('mitwpu') == [projector.id, fan.id]
+
+        fan.reporter_name = "Zoya Khan"
+        rooms[0].number = "LAB11"
+        db.session.commit()
+        assert search('rahul') == [fan.id]  # still in the email
+        assert search('zoya') == [fan.id]
+        assert search('vy40') == [] and search('lab1') == [projector.id]
+
+        db.session.delete(fan)
+        db.session.commit()
+        assert db.session.execute(text("SELECT count(*) FROM ticket_search")).scalar() == 1
+
+
+def test_ranked_search_orders_by_relevance_and_combines_with_filters(app):
+    with app.app_context():
+        _, (projector, fan) = _seed()
+        ranked = _ids(ranked_search('tickets', Ticket.query, 'projector'))
+        assert ranked == [projector.id, fan.id]  # issue_type outweighs description
+        open_only = Ticket.query.filter(Ticket.status == Ticket.STATUS_OPEN)
+        assert _ids(ranked_search('tickets', open_only, 'projector')) == [fan.id]
+
+
+def test_search_endpoints_and_backfill(app, client, admin_user):
+    with app.app_context():
+        _seed()
+        db.session.add(User(name="Ankita Rao", email="arao@mitwpu.edu.in", prn="9988"))
+        db.session.commit()
+
+        # A database from before the index existed is backfilled on startup
+        uninstall_search(db.session.connection())
+        db.session.commit()
+        ensure_search_index()
+        assert _ids(User.query.filter(search_filter('users', 'ankita'))) != []
+    _login_admin(client, admin_user)
+
+    history = client.get('/admin/history', query_string={'search': 'sharma'})
+    assert history.status_code == 200 and b'Ankita Sharma' in history.data
+    assert b'Ankita Rao' in client.get('/admin/users', query_string={'q': 'ank'}).data
+
+    data = client.get('/admin/api/search', query_string={'q': 'projector', 'status': 'open'}).get_json()['data']
+    assert [row['reporter_name'] for row in data['results']] == ['Rahul Patil']
+    data = client.get('/admin/api/search', query_string={'q': 'vy4', 'type': 'tickets'}).get_json()['data']
+    assert [row['room_number'] for row in data['results']] == ['VY401']
+    assert client.get('/admin/api/search', query_string={'q': 'x', 'type': 'rooms'}).status_code == 400
+
+
+def _pg_search_sql(search_text):
+    query = select(Ticket.id).where(search_indexes()['tickets'].filter(search_text, 'postgresql'))
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def test_postgres_terms_only_use_indexed_expressions(app):
+    """Substrings are matched against the indexed document and room ids, never column by column."""
+    sql = _pg_search_sql('vy40')
+    document = search_indexes()['tickets']._document('tickets.')
+    assert f"({document}) ILIKE '%%vy40%%'" in sql
+    assert "tickets.room_id = ANY ((SELECT array_agg(rooms.id)" in sql
+    assert "tickets.reporter_name ILIKE" not in sql and "tickets.description ILIKE" not in sql
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason="TEST_POSTGRES_URL not set")
+def test_postgres_search_plan_uses_indexes(app):
+    """EXPLAIN on Postgres: every term is answered from the search and room trigram indexes."""
+    engine = create_engine(os.environ['TEST_POSTGRES_URL'])
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = '\n'.join(row[0] for row in connection.execute(text('EXPLAIN ' + _pg_search_sql('vy40 sharma'))))
+        assert 'Seq Scan on tickets' not in plan, plan
+        assert 'idx_ticket_search_trgm' in plan and 'idx_room_number_trgm' in plan, plan
+    finally:
+        db.metadata.drop_all(engine)
+        engine.dispose()
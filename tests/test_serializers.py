@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+from app.models import Building, Floor, Room, Asset, Ticket, Professional
+from app.serializers import TICKET_DETAIL, PROFESSIONAL_HISTORY_JOB
+
+
+@contextmanager
+def count_queries():
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def _seed_tickets(professional, count):
+    b = Building(name="Projection Building")
+    f = Floor(level=5, name="5th Floor", building=b)
+    rooms = [Room(number=f"PJ50{i}", floor=f) for i in range(count)]
+    db.session.add_all([b, f, *rooms])
+    db.session.commit()
+    assets = [Asset(room_id=room.id, name=f"Projector {i}", asset_type="projector") for i, room in enumerate(rooms)]
+    db.session.add_all(assets)
+    db.session.commit()
+    tickets = [
+        Ticket(room_id=room.id, asset_id=asset.id, issue_type="projector", description=f"Issue {i}",
+               reporter_name="Student", prn="1234", reporter_email="s@mitwpu.edu.in",
+               assigned_professional_id=professional.id, status=Ticket.STATUS_FIXED)
+        for i, (room, asset) in enumerate(zip(rooms, assets))
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return tickets
+
+
+def _login_admin(client, admin_user):
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_user.id
+        sess['is_admin'] = True
+
+
+def test_ticket_projection_matches_to_dict_in_one_query(app, professional_user):
+    """Rows from the column-only select equal Ticket.to_dict(), for any number of tickets, in one query."""
+    with app.app_context():
+        prof = db.session.get(Professional, professional_user.id)
+        tickets = _seed_tickets(prof, 4)
+        expected = {t.id: t.to_dict() for t in tickets}
+        db.session.expire_all()
+
+        with count_queries() as statements:
+            rows = TICKET_DETAIL.all(TICKET_DETAIL.select().order_by(Ticket.id))
+        assert len(statements) == 1
+        assert [list(row) for row in rows] == [list(expected[row['id']]) for row in rows]
+        assert {row['id']: row for row in rows} == expected
+
+
+def test_export_and_history_query_counts_do_not_grow_with_tickets(app, client, admin_user, professional_user):
+    """export_report, professional_history, get_ticket_detail and the dashboards cost the same for 1 or 6 tickets."""
+    with app.app_context():
+        prof = db.session.get(Professional, professional_user.id)
+        tickets = _seed_tickets(prof, 1)
+        ticket_id, prof_id = tickets[0].id, prof.id
+    _login_admin(client, admin_user)
+
+    def measure():
+        counts = {}
+        for name, url in (('export', '/admin/reports/export/csv'),
+                          ('history', f'/admin/professionals/{prof_id}/history'),
+                          ('detail', f'/admin/ticket/{ticket_id}'),
+                          ('dashboard', '/admin/')):
+            with app.app_context(), count_queries() as statements:
+                assert client.get(url).status_code == 200
+            counts[name] = len(statements)
+        return counts
+
+    before = measure()
+    with app.app_context():
+        prof = db.session.get(Professional, prof_id)
+        b = Building(name="More Tickets")
+        f = Floor(level=6, name="6th Floor", building=b)
+        r = Room(number="PJ601", floor=f)
+        db.session.add_all([b, f, r])
+        db.session.commit()
+        db.session.add_all([
+            Ticket(room_id=r.id, issue_type="electrical", description=f"Extra {i}", reporter_name="Student",
+                   prn="1234", reporter_email="s@mitwpu.edu.in", assigned_professional_id=prof.id,
+                   status=Ticket.STATUS_FIXED)
+            for i in range(5)
+        ])
+        db.session.commit()
+    assert measure() == before
+
+    with client.session_transaction() as sess:
+        sess['professional_id'] = prof_id
+    for url in ('/professional/dashboard', '/professional/history'):
+        with app.app_context(), count_queries() as statements:
+            assert client.get(url).status_code == 200
+        assert len(statements) <= 6, statements
+
+    detail = client.get(f'/admin/ticket/{ticket_id}').get_json()['data']['ticket']
+    assert (detail['room_number'], detail['asset_name'], detail['floor_name']) == ('PJ500', 'Projector 0', '5th Floor')
+    assert client.get('/admin/ticket/999999').status_code == 404
+
+
+def test_projection_keeps_datetimes_for_templates(app, professional_user):
+    with app.app_context():
+        prof = db.session.get(Professional, professional_user.id)
+        _seed_tickets(prof, 1)
+        job = PROFESSIONAL_HISTORY_JOB.first(PROFESSIONAL_HISTORY_JOB.select())
+        assert set(job) == set(PROFESSIONAL_HISTORY_JOB.fields)
+        assert job['room_number'] == 'PJ500'
+        assert job['job_completed_at'] is None or hasattr(job['job_completed_at'], 'strftime')
@@ -0,0 +1,210 @@
+import struct
+import datetime
+from app import db
+from app.models import Building, Floor, Room, Ticket, TicketDailyRollup
+from app.analytics import get_system_trends
+from app.ticket_rollup import check_ticket_rollup, rebuild_ticket_rollup
+
+
+def _seed_rooms():
+    b = Building(name="Rollup Building")
+    f1 = Floor(level=1, name="1st Floor", building=b)
+    f2 = Floor(level=2, name="2nd Floor", building=b)
+    r1 = Room(number="RU101", floor=f1)
+    r2 = Room(number="RU201", floor=f2)
+    db.session.add_all([b, f1, f2, r1, r2])
+    db.session.commit()
+    return r1, r2
+
+
+def _ticket(room, issue_type="electrical", **kwargs):
+    return Ticket(room_id=room.id, issue_type=issue_type, description="Fan broken",
+                  reporter_name="Student", prn="1234", reporter_email="s@mitwpu.edu.in", **kwargs)
+
+
+def _rows():
+    return {
+        (row.day, row.floor_id, row.issue_type, row.status): (row.created_count, row.fixed_count, row.resolution_count)
+        for row in TicketDailyRollup.query.all()
+        if row.created_count or row.fixed_count
+    }
+
+
+def test_rollup_follows_ticket_transitions(app):
+    """Rollup rows move with creates, fixes, room moves and deletes, and roll back with the write."""
+    with app.app_context():
+        r1, r2 = _seed_rooms()
+        monday = datetime.datetime(2026, 10, 12, 9, 0)
+        ticket = _ticket(r1, created_at=monday)
+        db.session.add(ticket)
+        db.session.commit()
+        assert _rows() == {(monday.date(), r1.floor_id, 'electrical', 'open'): (1, 0, 0)}
+
+        ticket.status = Ticket.STATUS_FIXED
+        ticket.job_completed_at = monday + datetime.timedelta(hours=30)
+        ticket.fixed_at = monday + datetime.timedelta(hours=31)
+        db.session.commit()
+        tuesday = ticket.fixed_at.date()
+        assert _rows() == {
+            (monday.date(), r1.floor_id, 'electrical', 'fixed'): (1, 0, 1),
+            (tuesday, r1.floor_id, 'electrical', 'fixed'): (0, 1, 0),
+        }
+        row = db.session.get(TicketDailyRollup, (monday.date(), r1.floor_id, 'electrical', 'fixed'))
+        assert row.resolution_seconds == 30 * 3600
+
+        # A rolled back write leaves the rollup untouched
+        db.session.add(_ticket(r2, created_at=monday))
+        db.session.flush()
+        assert (monday.date(), r2.floor_id, 'electrical', 'open') in _rows()
+        db.session.rollback()
+        assert (monday.date(), r2.floor_id, 'electrical', 'open') not in _rows()
+
+        ticket.room_id = r2.id
+        db.session.commit()
+        assert {key[1] for key in _rows()} == {r2.floor_id}
+
+        db.session.delete(ticket)
+        db.session.commit()
+        assert _rows() == {}
+        assert check_ticket_rollup() == []
+
+
+
+def test_row_inserted_by_another_transaction_gets_the_delta(app, monkeypatch):
+    """When a concurrent first write inserts the row between UPDATE and INSERT, this flush adds its delta to it."""
+    from app.ticket_rollup import TICKET_ROLLUP
+
+    with app.app_context():
+        r1, _ = _seed_rooms()
+        monday = datetime.datetime(2026, 10, 12, 9, 0)
+        db.session.add(_ticket(r1, created_at=monday))
+        db.session.commit()
+
+        # The first UPDATE misses, as if the row did not exist yet
+        write_deltas = TICKET_ROLLUP.write_deltas
+        def racing(connection, deltas, update, recount, missing=(), now=None):
+            missed = []
+            def update_after_race(key, delta):
+                if not missed:
+                    missed.append(key)
+                    return 0
+                return update(key, delta)
+            return write_deltas(connection, deltas, update_after_race, recount, missing, now)
+        monkeypatch.setattr(TICKET_ROLLUP, 'write_deltas', racing)
+
+        db.session.add(_ticket(r1, created_at=monday + datetime.timedelta(hours=1)))
+        db.session.commit()
+        assert _rows() == {(monday.date(), r1.floor_id, 'electrical', 'open'): (2, 0, 0)}
+        assert check_ticket_rollup() == []
+
+def test_analytics_reads_the_rollup(app, client, admin_user):
+    """The dashboard totals, categories, resolution time and trend come from the rollup."""
+    with app.app_context():
+        r1, r2 = _seed_rooms()
+        now = datetime.datetime.utcnow()
+        fixed = _ticket(r1, 'plumbing', created_at=now - datetime.timedelta(days=3), status=Ticket.STATUS_FIXED,
+                        job_completed_at=now - datetime.timedelta(days=2), fixed_at=now - datetime.timedelta(days=2))
+        db.session.add_all([fixed, _ticket(r2, 'ac', created_at=now), _ticket(r2, 'projector', created_at=now - datetime.timedelta(days=40))])
+        db.session.commit()
+
+        # Bulk writes bypass the listeners until the rollup is rebuilt
+        Ticket.query.filter_by(issue_type='ac').update({'issue_type': 'lighting'})
+        assert len(check_ticket_rollup()) == 2
+        assert rebuild_ticket_rollup() == 4
+        assert check_ticket_rollup() == []
+
+        trends = get_system_trends(7)
+        assert trends['labels'][-1] == now.strftime('%Y-%m-%d') and len(trends['labels']) == 7
+        assert trends['values'][-1] == 1 and sum(trends['values']) == 2
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_user.id
+        sess['is_admin'] = True
+
+    data = client.get('/admin/api/analytics', query_string={'period': 'daily'}).get_json()['data']
+    assert (data['total_tickets'], data['completed_tickets'], data['open_tickets']) == (2, 1, 1)
+    assert data['category_data'] == {'Plumbing': 1, 'Electrical & Utilities': 1}
+    assert data['avg_resolution_time'] == 24.0
+    today = datetime.datetime.utcnow()
+    assert data['monthly_trend'][-1] == [today.strftime('%Y-%m-%d'), 1]
+
+    data = client.get('/admin/api/analytics', query_string={'period': 'monthly'}).get_json()['data']
+    assert data['total_tickets'] == 3
+
+
+def test_summary_cache_follows_day_versions(app, monkeypatch):
+    """Closed units are summed once per version; today's window is always recomputed."""
+    from app import analytics
+    computed = []
+    summarize = analytics._summarize_units
+    monkeypatch.setattr(analytics, '_summarize_units', lambda units, period: computed.append(sorted(units)) or summarize(units, period))
+
+    with app.app_context():
+        r1, r2 = _seed_rooms()
+        now = datetime.datetime.utcnow()
+        today = now.date()
+        week_ago = now - datetime.timedelta(days=7)
+        old = _ticket(r1, 'plumbing', created_at=week_ago)
+        db.session.add_all([old, _ticket(r2, created_at=now)])
+        db.session.commit()
+
+        start = now - datetime.timedelta(days=14)
+        first = analytics.get_ticket_summary(start, period='weekly')
+        assert first['total_tickets'] == 2 and len(computed) == 2
+        assert analytics.get_ticket_summary(start, period='weekly') == first
+        assert computed[2:] == [[(today, None)]]
+
+        # A new ticket today only touches today's window
+        db.session.add(_ticket(r1, created_at=now))
+        db.session.commit()
+        computed.clear()
+        assert analytics.get_ticket_summary(start, period='weekly')['total_tickets'] == 3
+        assert computed == [[(today, None)]]
+
+        # A late edit to a closed day recomputes only the unit holding that day
+        old.status = Ticket.STATUS_FIXED
+        old.fixed_at = now
+        db.session.commit()
+        computed.clear()
+        assert analytics.get_ticket_summary(start, period='weekly')['fixed_count'] == 1
+        (unit,), today_units = computed
+        assert unit[0] <= week_ago.date() < unit[1] and today_units == [(today, None)]
+
+        # The next day the rolling window reuses everything but the day that just closed
+        tomorrow = now + datetime.timedelta(days=1)
+        monkeypatch.setattr(analytics, 'datetime', type('FrozenDatetime', (datetime.datetime,), {
+            'utcnow': classmethod(lambda cls: tomorrow)
+        }))
+        computed.clear()
+        rolled = analytics.get_ticket_summary(start + datetime.timedelta(days=1), period='weekly')
+        assert rolled['total_tickets'] == 3
+        (unit,), today_units = computed
+        assert unit[0] <= today < unit[1] == tomorrow.date() and today_units == [(tomorrow.date(), None)]
+
+        # A closed custom range is served from the cache alone
+        end = now - datetime.timedelta(days=1)
+        assert analytics.get_ticket_summary(start, end, 'daily')['trend'] == [[week_ago.strftime('%Y-%m-%d'), 1]]
+        computed.clear()
+        assert analytics.get_ticket_summary(start, end, 'daily')['total_tickets'] == 1
+        assert computed == []
+
+        # Each closed unit is its own entry, kept without expiry
+        from app.cache import cache
+        day = week_ago.date()
+        key = f'analytics_unit_daily_{day.isoformat()}_{(day + datetime.timedelta(days=1)).isoformat()}'
+        assert cache.get(key)['summary']['total_tickets'] == 1
+        with open(cache.cache._get_filename(key), 'rb') as f:
+            assert struct.unpack('I', f.read(4))[0] == 0
+
+
+def test_closed_units_split_at_bucket_edges():
+    """Whole buckets are one unit; partly covered buckets split into days."""
+    from app.analytics import _closed_units
+    day = datetime.date
+    units = _closed_units(day(2026, 9, 29), day(2026, 10, 14), 'weekly')   # Tue .. Tue (exclusive)
+    first_week = [day(2026, 9, 29) + datetime.timedelta(days=i) for i in range(7)]
+    assert units[:6] == list(zip(first_week, first_week[1:]))
+    assert units[6:] == [(day(2026, 10, 5), day(2026, 10, 12)), (day(2026, 10, 12), day(2026, 10, 13)),
+                         (day(2026, 10, 13), day(2026, 10, 14))]
+    assert _closed_units(day(2026, 8, 1), day(2026, 10, 1), 'monthly') == [
+        (day(2026, 8, 1), day(2026, 9, 1)), (day(2026, 9, 1), day(2026, 10, 1))]